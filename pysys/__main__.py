@@ -30,6 +30,11 @@ def main(args=None):
 	
 	if args is None: args = sys.argv[1:]
 
+	if args and args[0] == 'run' and os.getenv('PYSYS_SERVER') and os.name != 'nt':
+		from pysys.internal.server import runClient
+		exitStatus = runClient(os.environ['PYSYS_SERVER'], args)
+		if exitStatus is not None: sys.exit(exitStatus)
+
 	import pysys.launcher.console
 	return pysys.launcher.console.main(args)
 if __name__ == "__main__": 
@@ -51,6 +51,9 @@ from pysys.utils.pycompat import *
 from pysys.internal.initlogging import _UnicodeSafeStreamWrapper, pysysLogHandler
 from pysys.writer import ConsoleSummaryResultsWriter, ConsoleProgressResultsWriter, BaseSummaryResultsWriter, BaseProgressResultsWriter, ArtifactPublisher
 import pysys.utils.allocport
+from pysys.internal.testscheduler import TestDurationHistory, TestScheduler, predictMakespan, getDefaultResourceBudgets, selectShard
+from pysys.internal.testdependencies import TestDependencyMap, getTestDependencies
+from pysys.config.descriptor import parseResources, formatResources
 
 if IS_WINDOWS:
 	import win32event
@@ -188,6 +191,13 @@ class BaseRunner(ProcessUser):
 	
 	"""
 	
+	DEFAULT_TEST_DURATIONS_FILE = '__pysys_performance/testDurations_${hostname}.json'
+	"""The file used to persist the duration of each test (and mode) when running with ``--sort duration``, if not 
+	overridden by the ``testDurationsFile`` project property. This is relative to the testRootDir. 
+
+	.. versionadded:: 2.3
+	"""
+
 	def __init__(self, record, purge, cycle, mode, threads, outsubdir, descriptors, xargs):
 		# we call this here so it's before any user code that should need to allocate ports, but after the 
 		# user's custom runner has been imported, making it possible to monkey-patch getEphemeralTCPPortRange() 
@@ -215,6 +225,7 @@ class BaseRunner(ProcessUser):
 		self.record = record
 		self.purge = purge
 		self.cycle = self.cycles = cycle
+		self._purgedOutputDirs = set() # only used when cycle>1
 		self.threads = threads
 		self._initThreadPoolMaxWorkers(self.runner.threads)
 		self.outsubdir = outsubdir
@@ -237,12 +248,39 @@ class BaseRunner(ProcessUser):
 		
 		self.setKeywordArgs(xargs)
 
+		self.__randomlyShuffleTests = extraOptions['sort']=='random'
+		self.__testDurations = None # used for ordering and scheduling tests
+		self.__testDurationsToRecord = None # the history that the durations of this run are added to
+		shard = extraOptions.get('shard') # (shard, shardCount)
+		if extraOptions['sort']=='duration' or shard:
+			history = TestDurationHistory(os.path.normpath(os.path.join(self.project.testRootDir, 
+				self.project.expandProperties(self.project.getProperty('testDurationsFile', self.DEFAULT_TEST_DURATIONS_FILE)))))
+			# sharding uses the history to balance the shards, but doesn't change the order tests are executed in
+			if extraOptions['sort']=='duration': self.__testDurations = history
+			self.__testDurationsToRecord = history
+		if shard:
+			log.info('Selected tests for shard {shard}/{shardCount} from {total:,} tests, based on historical durations for {known:,} of them'.format(
+				shard=shard[0], shardCount=shard[1], total=len(descriptors), known=sum(1 for d in descriptors if history.getDuration(d) is not None)))
+			self.descriptors = descriptors = selectShard(descriptors, shard[0], shard[1], history=history)
+
+		self.__testDependencies = None
+		dependenciesFile = self.project.expandProperties(self.project.getProperty('testDependenciesFile', ''))
+		if dependenciesFile:
+			self.__testDependencies = TestDependencyMap(os.path.normpath(os.path.join(self.project.testRootDir, dependenciesFile)))
+
 		if len(descriptors)*cycle == 1: self.threads = 1
+		self.__extraRunnerOptions = extraOptions
+		self.__processWorkerPool = None
+		self.__useProcessWorkers = extraOptions.get('workers') == 'processes' and self.threads > 1
+		if self.__useProcessWorkers:
+			# the worker processes use the first N partitions, and this process uses the last one
+			pysys.utils.allocport._partitionPortPool(self.threads, self.threads+1)
 		log.info('Running {numDescriptors:,} tests with {threads} test threads{cpus} using PySys {pysysVersion} in Python {pythonVersion} and encoding {encoding}\n'.format(
 			numDescriptors=len(self.descriptors), threads=self.threads, pysysVersion=pysys.__version__, pythonVersion='%s.%s.%s'%
 			sys.version_info[0:3], encoding=PREFERRED_ENCODING, 
 			cpus=' (OS CPUs=%d)'%os.cpu_count() if os.cpu_count() > self.threads else '', # if using fewer threads than CPUs, make it explicit
 			))
+		if self.__useProcessWorkers: log.info('Tests will be executed in %d worker processes', self.threads)
 		self.writers = []
 		summarywriters = []
 		progresswriters = []
@@ -250,8 +288,6 @@ class BaseRunner(ProcessUser):
 		self.__printLogsDefault = extraOptions['printLogsDefault']
 		self.__preserveEmptyOutputs = extraOptions.get('preserveEmptyOutputs', False)
 		
-		self.__randomlyShuffleTests = extraOptions['sort']=='random'
-		
 		def initWriter(writerclass, writerprops, kwargs={}):
 			writer = writerclass(**kwargs) # invoke writer's constructor
 			writer.runner = self
@@ -342,7 +378,17 @@ class BaseRunner(ProcessUser):
 		
 		# (initially) undocumented hook for customizing which jobs the threadpool takes 
 		# off the queue and when. Standard implementation is a simple blocking queue. 
-		self._testScheduler = queue.Queue()
+		resourceBudgets = None
+		if self.threads > 1 and any(d.resources for d in self.descriptors):
+			resourceBudgets = getDefaultResourceBudgets()
+			try:
+				resourceBudgets.update(parseResources(self.project.getProperty('testResourceBudgets', '')))
+			except ValueError as ex:
+				raise UserError('Invalid testResourceBudgets project property: %s'%ex)
+			if 'exclusive' in resourceBudgets: raise UserError('The testResourceBudgets project property cannot contain exclusive mutexes')
+			log.info('Scheduling tests within resource budgets: %s', formatResources(resourceBudgets))
+		self._testScheduler = queue.Queue() if (self.__testDurations is None and resourceBudgets is None) else TestScheduler(
+			history=self.__testDurations, resourceBudgets=resourceBudgets)
 
 		# Only do wrapping if we're outputting to console (to avoid making life difficult for tools parsing the output 
 		# and because it's not very useful); remove 16chars which is how wide a typical 
@@ -354,12 +400,13 @@ class BaseRunner(ProcessUser):
 			self.runDetails[p] = self.project.properties[p]
 		self.runDetails['cpuCount'] = str(os.cpu_count())
 		if threads>1: self.runDetails['testThreads'] = str(threads)
+		if shard: self.runDetails['shard'] = '%d/%d'%shard
 		self.runDetails['os'] = platform.platform().replace('-',' ')
 
 		# escape windows \ chars (which does limit the expressive power, but is likely to be more helpful than not)
 		commitCmd = shlex.split(self.project.properties.get('versionControlGetCommitCommand','').replace('\\', '\\\\'))
 		import subprocess
-		if commitCmd:
+		if commitCmd and not extraOptions.get('processWorker'):
 			try:
 				vcsProcess = subprocess.Popen(commitCmd, cwd=self.project.testRootDir, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 				(stdoutdata, stderrdata) = vcsProcess.communicate()
@@ -449,11 +496,13 @@ class BaseRunner(ProcessUser):
 		except Exception as ex: # pragma: no cover
 			log.warning('Failed to signal isRunnerAborting event/handle during termination: %r', ex)
 		
+		if self.__processWorkerPool is not None: self.__processWorkerPool.abort()
+
 		inProgressTests = self.getInProgressTests()
 		if inProgressTests:
 			# Inherits log handlers from current thread
 			loghandlers = pysysLogHandler.getLogHandlersForCurrentThread()
-			if stdoutHandler not in loghandlers: loghandler = loghandler+[stdoutHandler]
+			if stdoutHandler not in loghandlers: loghandlers = loghandlers+[stdoutHandler]
 
 			def handleRunnerAbortExecute(**kwargs):
 				pysysLogHandler.setLogHandlersForCurrentThread(loghandlers)
@@ -654,6 +703,21 @@ class BaseRunner(ProcessUser):
 
 
 	# perform a test run
+	def _createPerformanceReporters(self):
+		# Constructs the configured performance reporters (without calling setup)
+		reporters = []
+		for perfcls, perfOptionsDict in self.project.perfReporterConfig:
+			p = perfcls(self.project, perfOptionsDict.get('summaryfile',''), self.outsubdir, runner=self)
+			p.pluginProperties = perfOptionsDict
+			pysys.utils.misc.setInstanceVariablesFromDict(p, perfOptionsDict)
+			
+			# for backwards compat permit "summaryfile" as well as summaryFile
+			p.summaryfile = p.summaryfile or getattr(p, 'summaryFile', '')
+			p.summaryFile = p.summaryfile
+			
+			reporters.append(p)
+		return reporters
+
 	def start(self, printSummary=True):
 		"""Starts the execution of a set of testcases.
 		
@@ -680,17 +744,7 @@ class BaseRunner(ProcessUser):
 		
 		# must construct perf reporters here in start(), since if we did it in baserunner constructor, runner 
 		# might not be fully constructed yet
-		self.performanceReporters = []
-		for perfcls, perfOptionsDict in self.project.perfReporterConfig:
-			p = perfcls(self.project, perfOptionsDict.get('summaryfile',''), self.outsubdir, runner=self)
-			p.pluginProperties = perfOptionsDict
-			pysys.utils.misc.setInstanceVariablesFromDict(p, perfOptionsDict)
-			
-			# for backwards compat permit "summaryfile" as well as summaryFile
-			p.summaryfile = p.summaryfile or getattr(p, 'summaryFile', '')
-			p.summaryFile = p.summaryfile
-			
-			self.performanceReporters.append(p)
+		self.performanceReporters = self._createPerformanceReporters()
 				
 		class PySysPrintRedirector(object):
 			def __init__(self):
@@ -769,8 +823,18 @@ class BaseRunner(ProcessUser):
 		# create the thread pool if running with more than one thread
 		if self.threads > 1: 
 			threadPool = ThreadPool(self.threads, requests_queue=self._testScheduler)
+		if self.__useProcessWorkers:
+			from pysys.internal.processworker import ProcessWorkerPool, ProcessTestContainer
+			self.__processWorkerPool = ProcessWorkerPool(self, self.threads, self.__extraRunnerOptions)
 
 		log.debug('Starting test execution') # since we don't get immediate feedback in multi-threaded mode, indicate we've completed the runner setup phase
+		executionStartTime = time.monotonic()
+		if self.__testDurations is not None:
+			self.__testDurations.prepareEstimates(self.descriptors)
+			expectedDurations = sorted((self.__testDurations.estimateDuration(d) for d in self.descriptors), reverse=True)
+			self.__predictedDuration = predictMakespan(expectedDurations*self.cycle, self.threads)
+			log.info('Predicted duration of test execution is %.1f secs, based on historical durations for %d of %d tests', 
+				self.__predictedDuration, sum(1 for d in self.descriptors if self.__testDurations.getDuration(d) is not None), len(self.descriptors))
 
 		# loop through each cycle
 		
@@ -800,9 +864,14 @@ class BaseRunner(ProcessUser):
 					if self.__randomlyShuffleTests: # must re-shuffle within each cycle to be useful for perf testing etc
 						descriptors = list(descriptors)
 						random.shuffle(descriptors)
+					elif self.__testDurations is not None: # longest first; this is a stable sort so ties retain their executionOrderHint order
+						descriptors = sorted(descriptors, key=lambda d: -self.__testDurations.estimateDuration(d))
 					
 					for descriptor in descriptors:
-						container = TestContainer(descriptor, cycle, self)
+						if self.__processWorkerPool is not None:
+							container = ProcessTestContainer(descriptor, cycle, self, self.__processWorkerPool)
+						else:
+							container = TestContainer(descriptor, cycle, self)
 						if self.threads > 1:
 							request = WorkRequest(container, callback=self.containerCallback, exc_callback=self.containerExceptionCallback)
 							threadPool.putRequest(request)
@@ -851,6 +920,19 @@ class BaseRunner(ProcessUser):
 				else:
 					threadPool.dismissWorkers(self.threads, do_join=True)
 
+			if self.__testDurations is not None:
+				log.info('Test execution took %.1f secs (predicted %.1f secs)', time.monotonic()-executionStartTime, self.__predictedDuration)
+			if self.__testDurationsToRecord is not None:
+				try:
+					self.__testDurationsToRecord.save()
+				except Exception as ex: # not fatal, since it only affects the scheduling of future runs
+					log.warning('Failed to save test durations to %s: %s', self.__testDurationsToRecord.path, ex)
+			if self.__testDependencies is not None:
+				try:
+					self.__testDependencies.save()
+				except Exception as ex: # not fatal, since it only affects the selection of tests by future runs
+					log.warning('Failed to save test dependencies to %s: %s', self.__testDependencies.path, ex)
+
 			# perform clean on the performance reporters - before the writers, in case the writers want to do something 
 			# with the perf output
 			for perfreporter in self.performanceReporters:
@@ -885,6 +967,9 @@ class BaseRunner(ProcessUser):
 				fatalerrors.append('Failed to process coverage data: %s'%ex)
 
 		finally:
+			if self.__processWorkerPool is not None:
+				self.__processWorkerPool.close()
+
 			# call the hook to cleanup after running tests
 			try:
 				self.cleanup()
@@ -964,6 +1049,13 @@ class BaseRunner(ProcessUser):
 			testDurationSecs=container.testTime,
 			runLogOutput=container.testFileHandlerStdoutBuffer.getvalue())
 		
+		if self.__testDurationsToRecord is not None and not (container.kbrdInt or ProcessUser.isRunnerAborting or self.validateOnly
+				or container.testObj.getOutcome() == SKIPPED):
+			self.__testDurationsToRecord.record(container.descriptor, container.testTime)
+		if self.__testDependencies is not None and not (container.kbrdInt or ProcessUser.isRunnerAborting or self.validateOnly
+				or container.testObj.getOutcome() == SKIPPED):
+			self.__testDependencies.record(container.descriptor, container._getTestDependencies())
+
 		if container.kbrdInt == True: self.handleKbrdInt()
 		
 		# call the hook for end of test execution
@@ -1239,7 +1331,7 @@ class TestContainer(object):
 	:meta private:
 	"""
 
-	__purgedOutputDirs = set() # static field
+	__testModuleCache = {} # static field; key=path of a test module, value=((mtime, size), namespace from executing it)
 
 	_inProgressTests = set()
 	"""
@@ -1271,6 +1363,10 @@ class TestContainer(object):
 		self.kbrdInt = False
 		""" Deprecated, do not use. """
 
+	def _getTestDependencies(self):
+		# The files outside the test directory that this test depends on; see TestDependencyMap
+		return getTestDependencies(self.testObj)
+
 	def __repr__(self): return 'container<%s>'% (self.descriptor.id+('' if self.runner.cycle <= 1 else '.cycle%03d'%(self.cycle+1)))
 	
 	@staticmethod
@@ -1284,6 +1380,59 @@ class TestContainer(object):
 		else:
 			raise excinfo[1] # re-raise the original error
 	
+	def _getOutputDir(self):
+		# The output directory for this test, excluding any cycle subdirectory
+		if os.path.isabs(self.runner.outsubdir):
+			# don't need to add mode to this path as it's already in the id
+			return os.path.join(self.runner.outsubdir, self.descriptor.id)
+		outsubdir = os.path.join(self.descriptor.testDir, self.descriptor.output, self.runner.outsubdir)
+		if self.descriptor.mode:
+			outsubdir += '~'+self.descriptor.mode
+		return outsubdir
+
+	def _purgeOutputDir(self, outsubdir):
+		# Deletes the output directory left over from any previous run
+		if self.runner.cycle <= 1: 
+			deletedir(outsubdir, onerror=TestContainer.__onDeleteOutputDirError)
+		else:
+			# must use lock to avoid deleting the parent dir after we've started creating outdirs for some cycles
+			with global_lock:
+				if outsubdir not in self.runner._purgedOutputDirs:
+					deletedir(outsubdir, onerror=TestContainer.__onDeleteOutputDirError)
+					self.runner._purgedOutputDirs.add(outsubdir)
+
+	@staticmethod
+	def _loadTestClass(descriptor):
+		"""
+		Returns the test class for the specified descriptor. 
+		
+		Each test module is compiled and executed once per process (rather than for every mode and cycle), unless the 
+		file changes during the run, in which case the cached namespace is replaced (so that repeated edits when 
+		using ``--watch`` do not keep old versions in memory). This is thread-safe, and does not require the global_lock. 
+		"""
+		if descriptor.module == 'PYTHONPATH': # get a shared test class from the sys.path
+			classname = descriptor.classname.split('.')
+			assert len(classname)>1, 'Please specify a fully qualified classname (e.g. mymodule.classname): %s'%descriptor.classname
+			module_name, classname = '.'.join(classname[:-1]), classname[-1]
+			return getattr(importlib.import_module(module_name), classname)
+
+		assert descriptor.module, repr(descriptor.module)
+		runpypath = os.path.join(descriptor.testDir, descriptor.module)
+		st = os.stat(toLongPathSafe(runpypath))
+		version = (st.st_mtime_ns, st.st_size)
+		cached = TestContainer.__testModuleCache.get(runpypath)
+		if cached is None or cached[0] != version:
+			with open(toLongPathSafe(runpypath), 'rb') as runpyfile:
+				runpycode = compile(runpyfile.read(), runpypath, 'exec')
+			runpy_namespace = {}
+			exec(runpycode, runpy_namespace)
+			# if another thread loaded the same version at the same time, use whichever got there first; but replace 
+			# any entry for an older version of the file
+			cached = TestContainer.__testModuleCache.setdefault(runpypath, (version, runpy_namespace))
+			if cached[0] != version:
+				cached = TestContainer.__testModuleCache[runpypath] = (version, runpy_namespace)
+		return cached[1][descriptor.classname]
+
 	def __call__(self, *args, **kwargs):
 		"""Over-ridden call builtin to allow the class instance to be called directly.
 		
@@ -1305,25 +1454,11 @@ class TestContainer(object):
 				pysysLogHandler.setLogHandlersForCurrentThread(defaultLogHandlersForCurrentThread+[self.testFileHandlerStdout])
 
 				# set the output subdirectory and purge contents; must be unique per mode (but not per cycle)
-
-				if os.path.isabs(self.runner.outsubdir):
-					self.outsubdir = os.path.join(self.runner.outsubdir, self.descriptor.id)
-					# don't need to add mode to this path as it's already in the id
-				else:
-					self.outsubdir = os.path.join(self.descriptor.testDir, self.descriptor.output, self.runner.outsubdir)
-					if self.descriptor.mode:
-						self.outsubdir += '~'+self.descriptor.mode
+				self.outsubdir = self._getOutputDir()
 
 				try:
 					if not self.runner.validateOnly: 
-						if self.runner.cycle <= 1: 
-							deletedir(self.outsubdir, onerror=TestContainer.__onDeleteOutputDirError)
-						else:
-							# must use lock to avoid deleting the parent dir after we've started creating outdirs for some cycles
-							with global_lock:
-								if self.outsubdir not in TestContainer.__purgedOutputDirs:
-									deletedir(self.outsubdir, onerror=TestContainer.__onDeleteOutputDirError)
-									TestContainer.__purgedOutputDirs.add(self.outsubdir)
+						self._purgeOutputDir(self.outsubdir)
 				except Exception as ex:
 					raise Exception('Failed to clean test output directory before starting test: %s'%ex)
 				
@@ -1356,29 +1491,50 @@ class TestContainer(object):
 				
 			logHandlers = pysysLogHandler.getLogHandlersForCurrentThread()
 				
-			# import the test class
-			
+			# import the test class; this is done outside the global_lock since loading can be slow and different 
+			# threads can safely load different test classes at the same time
+			clazz = None
+			try:
+				clazz = self._loadTestClass(self.descriptor)
+			except KeyboardInterrupt: # pragma: no cover
+				self.runner.handleKbrdInt()
+				raise
+			except Exception:
+				exc_info.append(sys.exc_info())
+
 			with global_lock:
 				BaseTest._currentTestCycle = (self.cycle+1) if (self.runner.cycle > 1) else 0 # backwards compatible way of passing cycle to BaseTest constructor; safe because of global_lock
 				try:
-					outsubdir = self.outsubdir
-					if self.descriptor.module == 'PYTHONPATH': # get a shared test class from the sys.path
-						classname = self.descriptor.classname.split('.')
-						assert len(classname)>1, 'Please specify a fully qualified classname (e.g. mymodule.classname): %s'%self.descriptor.classname
-						module_name, classname = '.'.join(classname[:-1]), classname[-1]
-						clazz = getattr(importlib.import_module(module_name), classname)
-					else:
-						assert self.descriptor.module, repr(self.descriptor.module)
-						runpypath = os.path.join(self.descriptor.testDir, self.descriptor.module)
-						with open(toLongPathSafe(runpypath), 'rb') as runpyfile:
-							runpycode = compile(runpyfile.read(), runpypath, 'exec')
-						runpy_namespace = {}
-						exec(runpycode, runpy_namespace)
-						clazz = runpy_namespace[self.descriptor.classname]
-						del runpy_namespace
-					self.testObj = clazz(self.descriptor, outsubdir, self.runner)
+					if clazz is not None:
+						try:
+							self.testObj = clazz(self.descriptor, self.outsubdir, self.runner)
+						except KeyboardInterrupt: # pragma: no cover
+							self.runner.handleKbrdInt()
+							raise
+						except Exception:
+							exc_info.append(sys.exc_info())
+					testObjCreated = self.testObj is not None
 					
-					self.testObj.testPlugins = []
+					if self.testObj is None:
+						# We need a BaseTest object, so if the real one failed, we assume/hope there should be no exception 
+						# from the PySys BaseTest class and we can use it to hold the error for reporting purposes
+						self.testObj = BaseTest(self.descriptor, self.outsubdir, self.runner)
+				finally:
+					# can't set this in constructor without breaking compatibility, but set it asap after construction
+					del BaseTest._currentTestCycle
+
+				TestContainer._inProgressTests.add(self.testObj) # lock prevents races with code that iterates over the in-progress tests
+
+			# drop the global_lock here
+
+			self.testStart = self.testObj.testStartTime # ensure these are in sync. Give priority to the one from testObj. 
+
+			# Check for test run abort here - to reduce/avoid races where it gets started just after we get an interruption and iterate over the in-progress list
+			if ProcessUser.isRunnerAborting: raise KeyboardInterrupt()
+
+			self.testObj.testPlugins = []
+			if testObjCreated:
+				try:
 					for pluginClass, pluginAlias, pluginProperties in self.runner.project.testPlugins:
 						plugin = pluginClass()
 						plugin.runner = self
@@ -1396,31 +1552,11 @@ class TestContainer(object):
 								raise UserError('Alias "%s" for test-plugin conflicts with a field that already exists on this test object; please select a different name'%(pluginAlias))
 						else:
 							setattr(self.testObj, pluginAlias, plugin)
-
-
-		
 				except KeyboardInterrupt: # pragma: no cover
 					self.runner.handleKbrdInt()	
 					raise		
 				except Exception:
 					exc_info.append(sys.exc_info())
-				
-				if self.testObj is None:
-					# We need a BaseTest object, so if the real one failed, we assume/hope there should be no exception 
-					# from the PySys BaseTest class and we can use it to hold the error for reporting purposes
-					self.testObj = BaseTest(self.descriptor, self.outsubdir, self.runner)
-					
-				# can't set this in constructor without breaking compatibility, but set it asap after construction
-				del BaseTest._currentTestCycle
-
-				self.testStart = self.testObj.testStartTime # ensure these are in sync. Give priority to the one from testObj. 
-
-				TestContainer._inProgressTests.add(self.testObj) # doesn't technically need the global lock but might as well do it here for added protection
-
-				# Check for test run abort here - to reduce/avoid races where it gets started just after we get an interruption and iterate over the in-progress list
-				if ProcessUser.isRunnerAborting: raise KeyboardInterrupt()
-
-			# drop the global_lock here
 
 			for writer in self.runner.writers:
 				try: 
@@ -22,7 +22,7 @@ class allows customization of the test discovery process.
 """
 
 from __future__ import print_function
-import os.path, logging, xml.dom.minidom
+import os.path, sys, logging, ast
 import collections
 import copy
 import locale
@@ -35,6 +35,7 @@ from pysys.constants import *
 from pysys.exceptions import UserError
 from pysys.utils.fileutils import toLongPathSafe, fromLongPathSafe, pathexists
 from pysys.utils.pycompat import isstring
+import pysys.internal.xmldom
 
 log = logging.getLogger('pysys.config.descriptor')
 
@@ -109,12 +110,22 @@ class TestDescriptor(object):
 	:ivar dict[str,obj] ~.userData: A Python dictionary that can be used for storing user-defined data 
 		in the descriptor. In a pysystest.py, this can be populated by a ``__pysys_user_data__`` dictionary, e.g. 
 		``__pysys_user_data__ = {"key": "val ${projectProperty}"}`` or ``__pysys_user_data.key__ = "val"``.
+
+	:ivar dict[str,obj] ~.resources: A dictionary of the resources this test needs while it is executing, which the 
+		runner uses to avoid executing tests concurrently if together they would exceed the available budget. 
+		Keys are resource names such as ``cpus`` or ``memMB`` with float values, except for ``exclusive`` which is a 
+		list of named mutexes that no other concurrently executing test may hold. 
+		In a pysystest.py this is populated by ``__pysys_resources__ = "cpus=4, memMB=2000, exclusive=db"``, and 
+		in XML by ``<resources>cpus=4, memMB=2000, exclusive=db</resources>``. Values from ``pysysdirconfig.xml`` 
+		files are inherited, with the test's own values taking precedence. 
+
+		.. versionadded:: 2.3
 	"""
 
 	__slots__ = 'isDirConfig', 'file', 'testDir', 'id', 'type', 'state', 'title', 'purpose', 'groups', 'modes', 'mode', \
 		'classname', 'module', 'input', 'output', 'reference', 'traceability', 'executionOrderHint', 'executionOrderHintsByMode', \
 		'authors', 'created', \
-		'skippedReason', 'idWithoutMode', '_defaultSortKey', 'userData', '_makeTestTemplates', '_descriptorLoaderPlugins',
+		'skippedReason', 'idWithoutMode', '_defaultSortKey', 'userData', 'resources', '_makeTestTemplates', '_descriptorLoaderPlugins',
 
 	def __init__(self, file, id, 
 		type="auto", state="runnable", title=u'', purpose=u'', groups=[], modes=[], 
@@ -123,7 +134,7 @@ class TestDescriptor(object):
 		traceability=[], executionOrderHint=0.0, skippedReason=None, 
 		authors=[], created=None,
 		testDir=None, 
-		isDirConfig=False, userData=None
+		isDirConfig=False, userData=None, resources=None
 		):
 
 		self.isDirConfig = isDirConfig
@@ -180,6 +191,7 @@ class TestDescriptor(object):
 		# cloning for each supported mode 
 		
 		self.userData = collections.OrderedDict() if userData is None else userData
+		self.resources = {} if resources is None else resources
 	
 	def setId(self, id):
 		"""
@@ -220,7 +232,13 @@ class TestDescriptor(object):
 		"""
 		assert mode, 'Mode must be specified'
 		assert not hasattr(self, 'mode'), 'Cannot create a mode descriptor from a descriptor that already has its mode set'
-		newdescr = copy.deepcopy(self) # nb: the mode can't be deep copied accurately but of course it's not set yet so no problem!
+		# Rather than a deep copy, this is a lightweight view that shares field values with this descriptor, including the 
+		# (immutable) TestMode objects in the modes list, which can contain hundreds of modes for some tests. 
+		# The top-level mutable containers are copied so that changing one mode's groups/userData etc does not affect 
+		# the others. 
+		newdescr = copy.copy(self)
+		for field in ['groups', 'traceability', 'authors', 'userData', 'resources']:
+			setattr(newdescr, field, copy.copy(getattr(self, field)))
 		newdescr.mode = mode # we assume the passed in mode is the TestMode object (not just a str) if TestMode is what's in the descriptor
 		newdescr.id = self.id+'~'+mode
 		newdescr._defaultSortKey = self._defaultSortKey+'~'+mode
@@ -260,6 +278,7 @@ class TestDescriptor(object):
 		d['output'] = self.output
 		d['reference'] = self.reference
 		d['userData'] = self.userData
+		if self.resources: d['resources'] = self.resources
 		
 		return d
 		
@@ -326,6 +345,8 @@ class TestDescriptor(object):
 			s=s+"Test traceability: %s\n" % (u', '.join((u"'%s'"%x if u' ' in x else x) for x in self.traceability) or u'<none>')
 		if self.userData:
 			s=s+"Test user data:    %s\n" % ', '.join('%s=%s'%(k,self.__userDataValueToString(v)) for k,v in (self.userData.items()))
+		if self.resources:
+			s=s+"Test resources:    %s\n" % formatResources(self.resources)
 		s=s+""
 		return s
 	
@@ -570,7 +591,7 @@ class TestMode(str): # subclasses string to retain compatibility for tests that
 	
 	def __new__(cls,s,params=None, isPrimary=False):
 		self = str.__new__(cls,s)
-		self.__name = s
+		self.__name = sys.intern(str(s)) # the same mode name is typically used by many tests, so share a single copy
 		if params is None: params = {}
 		self.__params = params
 		assert 'isPrimary' not in params, repr(params)
@@ -591,7 +612,53 @@ class TestMode(str): # subclasses string to retain compatibility for tests that
 	
 	def __repr__(self):
 		return self.name+str(self.__params)+('[PRIMARY]' if self.__isPrimary else '')
+
+	def __reduce__(self):
+		# more compact than the default pickling for str subclasses, and ensures the name is interned after unpickling
+		return (TestMode, (self.__name, self.__params, self.__isPrimary))
 	
+def parseResources(value):
+	"""
+	Parses a string describing the resources needed by a test (or available to the runner) into a dictionary.
+
+	The string is a comma-separated list of ``name=value`` items, e.g. ``"cpus=4, memMB=2000, exclusive=db"``. 
+	All values must be numbers, except for ``exclusive`` which gives the name of a mutex that no other concurrently 
+	executing test may hold (it can be specified more than once). 
+
+	:param str value: The string to parse. 
+	:return: A dict where ``exclusive`` (if present) is a list of strings, and every other value is a float.
+	:raises ValueError: If the string is not valid. 
+
+	.. versionadded:: 2.3
+	"""
+	result = {}
+	for item in value.split(','):
+		item = item.strip()
+		if not item: continue
+		if '=' not in item: raise ValueError('Expected name=value but got "%s"'%item)
+		k, v = (x.strip() for x in item.split('=', 1))
+		if not k or not v: raise ValueError('Expected name=value but got "%s"'%item)
+		if k == 'exclusive':
+			result.setdefault(k, []).append(v)
+		else:
+			try:
+				v = float(v)
+			except ValueError:
+				raise ValueError('Invalid number for resource "%s": "%s"'%(k, v))
+			if v < 0: raise ValueError('Resource "%s" cannot be negative'%k)
+			result[k] = v
+	return result
+
+def formatResources(resources):
+	"""
+	Converts a resources dictionary (see `parseResources`) back to a string. 
+
+	.. versionadded:: 2.3
+	"""
+	return ', '.join(
+		', '.join('exclusive=%s'%x for x in v) if k == 'exclusive' else '%s=%s'%(k, ('%g'%v))
+		for k, v in resources.items())
+
 class _XMLDescriptorParser(object):
 	'''NOT PUBLIC API - use L{DescriptorLoader._parseTestDescriptor} instead. 
 	
@@ -600,9 +667,9 @@ class _XMLDescriptorParser(object):
 	Helper class to parse an XML test descriptor - either for a testcase, 
 	or for defaults for a (sub-)directory of testcases.
 
-	If the file is/contains XML the class uses the minidom DOM (Document Object Model) non-validating
-	parser to provide accessor methods to return element attributes	and character
-	data from the test descriptor file. The class is instantiated with the filename
+	If the file is/contains XML the class uses a lightweight minidom-compatible DOM (Document Object Model) 
+	non-validating parser (see `pysys.internal.xmldom`) to provide accessor methods to return element attributes and 
+	character data from the test descriptor file. The class is instantiated with the filename
 	of the test descriptor. It is the responsibility of the user of the class to
 	call the unlink() method of the class on completion in order to free the memory
 	used in the parsing.
@@ -619,6 +686,20 @@ class _XMLDescriptorParser(object):
 	__PYTHON_PYSYS_DUNDER_EXPR = b'\n__pysys_' if os.linesep.endswith('\n') else b'\r__pysys_'
 	__DISABLE_PYTHON_DESCRIPTOR_PARSING = os.getenv('PYSYS_DISABLE_PYTHON_DESCRIPTOR_PARSING','').lower()=='true' # undocumented, just for testing 
 
+	# The start of a top-level __pysys_XXX__ assignment of a literal string/number/boolean/None (or a modes lambda) 
+	# that can be read without executing any code
+	__PYTHON_LITERAL_ASSIGNMENT = re.compile(r'''__pysys_(?P<key>\w*?)__[ \t]*=[ \t]*(?:
+			(?P<prefix>[rRuU]?)(?P<quote>\"\"\"|\'\'\'|"|\')
+			|(?P<float>[-+]?[0-9]+\.[0-9]*(?:[eE][-+]?[0-9]+)?)
+			|(?P<int>[-+]?(?:0|[1-9][0-9]*))
+			|(?P<constant>True|False|None)
+			|(?P<lambda>lambda\b)
+		)''', flags=re.VERBOSE)
+	__PYTHON_LAMBDA_LINES = re.compile(r'[^\n]*(?:\n(?:[ \t)\]}\#][^\n]*)?)*') # indented continuation lines
+	__PYTHON_END_OF_LINE = re.compile(r'[ \t]*(?:\#[^\n]*)?(?:\n|$)')
+	__PYTHON_IGNORABLE = re.compile(r'(?:[ \t\f\n]|\#[^\n]*)*')
+	__PYTHON_CODING_DECLARATION = re.compile(b'^[ \t\f]*#.*?coding[:=]', flags=re.MULTILINE)
+
 	parseTimeXML = 0.0
 	parseTimePython = 0.0
 
@@ -665,18 +746,24 @@ class _XMLDescriptorParser(object):
 				# we could also search for "from XXX import ..." but that's harder to match without regex's so don't bother as it would slow down the common case
 				
 				firstImportIndex = pythonHeader.find(_XMLDescriptorParser.__IMPORT_EXPR) # the first "\nimport " is a pretty clear sign of the imports beginning
-				# nb: give up on optimization if there are "__pysys_" lines below the imports
-				if firstImportIndex > 0 and _XMLDescriptorParser.__PYTHON_PYSYS_DUNDER_EXPR not in fileContents[firstImportIndex:]:
-					pythonHeader = pythonHeader[:firstImportIndex]
 				
-				runpycode = compile(pythonHeader, xmlfile, 'exec')
-				runpy_namespace = {}
-				exec(runpycode, runpy_namespace)
-				for k in runpy_namespace:
-					if k.startswith('__pysys_'):
-						if not k.endswith('__'): raise UserError(f'Incorrect key format for "{k}" (should end with "__") in "{self.file}"')
-						self.kvDict[k[len('__pysys_'):].rstrip('_')] = runpy_namespace[k]
-				del runpy_namespace
+				# Usually the header contains only literal assignments, which can be read much faster without compiling it
+				kvDict = self.__parsePythonLiterals(fileContents, firstImportIndex)
+				if kvDict is not None:
+					self.kvDict = kvDict
+				else:
+					# nb: give up on optimization if there are "__pysys_" lines below the imports
+					if firstImportIndex > 0 and _XMLDescriptorParser.__PYTHON_PYSYS_DUNDER_EXPR not in fileContents[firstImportIndex:]:
+						pythonHeader = pythonHeader[:firstImportIndex]
+					
+					runpycode = compile(pythonHeader, xmlfile, 'exec')
+					runpy_namespace = {}
+					exec(runpycode, runpy_namespace)
+					for k in runpy_namespace:
+						if k.startswith('__pysys_'):
+							if not k.endswith('__'): raise UserError(f'Incorrect key format for "{k}" (should end with "__") in "{self.file}"')
+							self.kvDict[k[len('__pysys_'):].rstrip('_')] = runpy_namespace[k]
+					del runpy_namespace
 			else: # non-Python files, fall back to a general purpsoe Python-like syntax
 			
 				# must be at the start of a line, i.e. not after a comment
@@ -711,9 +798,9 @@ class _XMLDescriptorParser(object):
 		
 		try:
 			if xmlcontents:
-				self.doc = xml.dom.minidom.parseString(xmlcontents)
+				self.doc = pysys.internal.xmldom.parseString(xmlcontents)
 			elif xmlcontents == None:
-				self.doc = xml.dom.minidom.parse(xmlfile)
+				self.doc = pysys.internal.xmldom.parse(xmlfile)
 			else:
 				self.doc = self.root = None
 				return
@@ -730,6 +817,81 @@ class _XMLDescriptorParser(object):
 		else:
 			_XMLDescriptorParser.parseTimePython += time.monotonic()-starttime
 
+	@staticmethod
+	def __parsePythonLiterals(fileContents, firstImportIndex):
+		"""
+		Returns a dict of the ``__pysys_XXX__`` values in a Python descriptor, or None if it cannot be determined 
+		without executing the file. 
+
+		This succeeds if everything before the first import is a literal assignment, comment or blank line, and any 
+		other top-level ``__pysys_XXX__`` lines are literal assignments. A ``__pysys_modes__`` lambda is returned as a 
+		string containing its source, which is evaluated when the modes are needed. 
+		"""
+		header, tail = (fileContents[:firstImportIndex], fileContents[firstImportIndex:]) if firstImportIndex > 0 else (fileContents, b'')
+		secondLineEnd = fileContents.find(b'\n', fileContents.find(b'\n')+1)
+		if _XMLDescriptorParser.__PYTHON_CODING_DECLARATION.search(fileContents, 0, len(fileContents) if secondLineEnd < 0 else secondLineEnd):
+			return None # non-default encodings are rare, so leave Python to deal with them
+		try:
+			header = header.decode('utf-8')
+			if '\r' in header: header = header.replace('\r\n', '\n').replace('\r', '\n')
+		except UnicodeDecodeError:
+			return None
+		if header.startswith('\ufeff'): header = header[1:]
+		
+		result = {}
+		def readAssignment(text, pos, allowLambda):
+			# returns the position of the next line, or -1 if this is not a literal assignment
+			m = _XMLDescriptorParser.__PYTHON_LITERAL_ASSIGNMENT.match(text, pos)
+			if m is None: return -1
+			key, pos, kind = m.group('key').rstrip('_'), m.end(), m.lastgroup
+			if kind == 'quote':
+				quote = m.group('quote')
+				end = text.find(quote, pos)
+				if end < 0: return -1
+				value = text[pos:end]
+				pos = end+len(quote)
+				if '\\' in value or (len(quote)==1 and '\n' in value):
+					try:
+						value = ast.literal_eval(m.group('prefix')+quote+value+quote)
+					except Exception: # e.g. a string containing an escaped quote, which find() doesn't handle
+						return -1
+			elif kind == 'float':
+				value = float(m.group('float'))
+			elif kind == 'int':
+				value = int(m.group('int'))
+			elif kind == 'constant':
+				value = {'True':True, 'False':False, 'None':None}[m.group('constant')]
+			else:
+				if key != 'modes' or not allowLambda: return -1
+				end = _XMLDescriptorParser.__PYTHON_LAMBDA_LINES.match(text, pos).end()
+				result[key] = text[m.start('lambda'):end].strip()
+				return end
+			m = _XMLDescriptorParser.__PYTHON_END_OF_LINE.match(text, pos)
+			if m is None: return -1
+			result[key] = value
+			return m.end()
+
+		pos, end = 0, len(header)
+		while True:
+			pos = _XMLDescriptorParser.__PYTHON_IGNORABLE.match(header, pos).end()
+			if pos == end: break
+			if pos > 0 and header[pos-1] != '\n': return None # indented (or other) code
+			pos = readAssignment(header, pos, allowLambda=True)
+			if pos < 0: return None
+		
+		if _XMLDescriptorParser.__PYTHON_PYSYS_DUNDER_EXPR in tail:
+			try:
+				tail = tail.decode('utf-8')
+			except UnicodeDecodeError:
+				return None
+			if '\r' in tail: tail = tail.replace('\r\n', '\n').replace('\r', '\n')
+			pos = tail.find('\n__pysys_')
+			while pos >= 0:
+				pos = readAssignment(tail, pos+1, allowLambda=False)
+				if pos < 0: return None
+				pos = tail.find('\n__pysys_', pos-1)
+		return result
+
 	@staticmethod
 	def parse(xmlfile, istest=True, parentDirDefaults=None, project=None, **kwargs):
 		"""
@@ -782,7 +944,7 @@ class _XMLDescriptorParser(object):
 		# some elements that are mandatory for an individual test and not used for dir config
 		t = TestDescriptor(self.getFile(), self.getID(), self.getType(), self.getState(),
 										self.getTitle() if self.istest else '', self.getPurpose() if self.istest else '',
-										self.getGroups(), self.getModes(), 
+										[sys.intern(g) for g in self.getGroups()], self.getModes(), 
 										self.project.expandProperties(cls),
 										self.project.expandProperties(pymodule),
 										self.project.expandProperties(self.getTestInput()),
@@ -793,6 +955,7 @@ class _XMLDescriptorParser(object):
 										skippedReason=self.getSkippedReason(), 
 										testDir=self.dirname,
 										userData={k:self.project.expandProperties(v) for k,v in self.getUserData().items()},
+										resources=self.getResources(),
 										authors=[x.strip() for x in 
 											(self.kvDict.pop('authors', None) or (self.root.getAttribute('authors') if self.root else '') 
 											).split(',') if x.strip()],
@@ -1187,6 +1350,18 @@ class _XMLDescriptorParser(object):
 		return result
 
 			
+	def getResources(self):
+		value = self.kvDict.pop('resources', None)
+		if value is None: value = self.getElementTextOrDefault('resources', optionalParents=['data'])
+		
+		result = dict(self.defaults.resources)
+		if value:
+			try:
+				result.update(parseResources(self.project.expandProperties(str(value))))
+			except ValueError as ex:
+				raise UserError('Invalid resources in "%s": %s'%(self.file, ex))
+		return result
+
 	def getTestInput(self):
 		value = self.kvDict.pop('input_dir', None)
 		if value: return value
@@ -1300,6 +1475,18 @@ class DescriptorLoader(object):
 
 	This class may use multi-threading to improve performance, so any extensions 
 	must be thread-safe. 
+
+	If the ``descriptorIndexFile`` project property is set, the descriptors parsed by `_parseTestDescriptor` are 
+	stored in the specified file (relative to the testRootDir), and reused in later runs unless the descriptor file, 
+	any parent ``pysysdirconfig.xml`` or the project configuration has changed. 
+
+	If there are a large number of test descriptors to parse (and `_parseTestDescriptor` is not overridden), they are 
+	parsed in a pool of worker processes, since parsing is CPU-bound. The number of descriptors needed to use 
+	processes can be configured with the ``pysysDescriptorLoaderProcessThreshold`` project property (default 5000; 
+	0 disables this). 
+
+	.. versionchanged:: 2.3
+		Added ``descriptorIndexFile`` and ``pysysDescriptorLoaderProcessThreshold``. 
 	
 	:ivar pysys.config.project.Project ~.project: The `pysys.config.project.Project` instance. 
 	
@@ -1313,6 +1500,7 @@ class DescriptorLoader(object):
 		import pysys.basetest
 
 		self.__descriptorPluginCache = {}
+		self.__descriptorIndex = None
 		
 	def loadDescriptors(self, dir, **kwargs):
 		"""Find all descriptors located under the specified directory (including its children), and 
@@ -1346,6 +1534,15 @@ class DescriptorLoader(object):
 		
 		"""
 		assert not kwargs, 'reserved for future use: %s'%kwargs.keys()
+		return self._loadDescriptors(dir)
+
+	def _loadDescriptors(self, dir, onDescriptorLoaded=None):
+		"""
+		Implementation of `loadDescriptors` which can optionally call ``onDescriptorLoaded(descriptor)`` as soon as 
+		each descriptor has been loaded, allowing callers to start using them before the whole tree has been parsed. 
+		
+		:meta private: Not public API. Only used when loadDescriptors has not been overridden. 
+		"""
 		assert self.project, 'project must be specified'
 		assert dir, 'dir must be specified'
 		assert os.path.isabs(dir), 'dir must be an absolute path: %s'%dir
@@ -1372,6 +1569,13 @@ class DescriptorLoader(object):
 		if project.projectFile:
 			projectroot = toLongPathSafe(os.path.normpath(os.path.dirname(project.projectFile)))
 
+		indexFile = project.expandProperties(project.getProperty('descriptorIndexFile', ''))
+		if indexFile:
+			from pysys.internal.descriptorindex import DescriptorIndex
+			self.__descriptorIndex = DescriptorIndex(os.path.normpath(os.path.join(project.testRootDir, indexFile)), project)
+			for defaultDirConfig in [project._defaultDirConfig, _XMLDescriptorParser.DEFAULT_DESCRIPTOR]:
+				if defaultDirConfig is not None: self.__descriptorIndex.setFingerprint(defaultDirConfig, self.__descriptorIndex.rootFingerprint)
+
 		def fastdirname(path): 
 			# This is much faster than os.path.dirname
 			# The "or" is to account for minor difference fastdirname('/foo')='' whereas os.path.dirname='/'
@@ -1460,11 +1664,43 @@ class DescriptorLoader(object):
 		# end of visitDir() definition
 		visitDir(dir)
 		
-		# Tried using multithreading with Python 3.9.5 but limited benefit approx 10%, probably due to GIL
-		descriptors.extend(p for p in 
-				map(lambda element: self._parseTestDescriptor(descriptorfile=element[0], parentDirDefaults=element[1]),
-					descriptorsToParse)
-			if p)
+		if onDescriptorLoaded is not None: # any added by _handleSubDirectory
+			for p in descriptors: onDescriptorLoaded(p)
+		def loaded(p):
+			if p and onDescriptorLoaded is not None: onDescriptorLoaded(p)
+			return p
+
+		# Tried using multithreading with Python 3.9.5 but limited benefit approx 10%, probably due to GIL, so 
+		# use processes instead if there are enough descriptors to make it worthwhile (and parsing is not customized)
+		if type(self)._parseTestDescriptor is DescriptorLoader._parseTestDescriptor:
+			from pysys.internal.descriptorindex import DescriptorIndex
+			from pysys.internal import descriptorpool
+			index = self.__descriptorIndex
+			parsed = [index.lookup(f, parent) for (f, parent) in descriptorsToParse] if index is not None else [DescriptorIndex.MISSING]*len(descriptorsToParse)
+			missing = []
+			for i, p in enumerate(parsed):
+				if p is DescriptorIndex.MISSING: missing.append(i)
+				else: loaded(p)
+			processes = descriptorpool.getProcessCount(project, len(missing))
+			if processes > 1:
+				for i, p in zip(missing, descriptorpool.parseDescriptors(project, [descriptorsToParse[i] for i in missing], processes)):
+					parsed[i] = loaded(p)
+					if index is not None: index.add(descriptorsToParse[i][0], descriptorsToParse[i][1], p)
+			else:
+				for i in missing: # already looked up in the index, so no need to do it again
+					p = self.__parseTestDescriptor(descriptorsToParse[i][0], descriptorsToParse[i][1], useIndex=False)
+					if index is not None: index.add(descriptorsToParse[i][0], descriptorsToParse[i][1], p)
+					parsed[i] = loaded(p)
+			descriptors.extend(p for p in parsed if p)
+		else:
+			descriptors.extend(p for p in 
+					map(lambda element: loaded(self._parseTestDescriptor(descriptorfile=element[0], parentDirDefaults=element[1])),
+						descriptorsToParse)
+				if p)
+
+		if self.__descriptorIndex is not None:
+			self.__descriptorIndex.save(fromLongPathSafe(dir))
+			self.__descriptorIndex = None
 
 		return descriptors
 		
@@ -1536,7 +1772,13 @@ class DescriptorLoader(object):
 			The exception message must contain the path of the descriptorfile.
 		"""
 		assert len(kwargs)==0 or list(kwargs.keys())==['fileContents'], 'reserved for future use: %s'%kwargs.keys()
+		return self.__parseTestDescriptor(descriptorfile, parentDirDefaults, isDirConfig, useIndex=True, **kwargs)
+
+	def __parseTestDescriptor(self, descriptorfile, parentDirDefaults, isDirConfig=False, useIndex=True, **kwargs):
 		try:
+			if useIndex and self.__descriptorIndex is not None and not kwargs:
+				return self.__descriptorIndex.parse(descriptorfile, parentDirDefaults, lambda: 
+					_XMLDescriptorParser.parse(descriptorfile, parentDirDefaults=parentDirDefaults, istest=not isDirConfig, project=self.project))
 			return _XMLDescriptorParser.parse(descriptorfile, parentDirDefaults=parentDirDefaults, istest=not isDirConfig, project=self.project, **kwargs)
 		except UserError:
 			raise # no stack trace needed, will already include descriptorfile name
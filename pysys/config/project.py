@@ -23,13 +23,14 @@ user-defined project properties.
 
 __all__ = ['Project'] # Project is the only member we expose/document from this module
 
-import os.path, logging, xml.dom.minidom, collections, codecs, time
+import os.path, logging, collections, codecs, time
 import platform
 import locale
 import getpass
 
 import pysys
 import pysys.utils.misc
+import pysys.internal.xmldom
 from pysys.constants import *
 from pysys import __version__
 from importlib import import_module
@@ -44,6 +45,8 @@ class _XMLProjectParser(object):
 	"""
 	:meta private: Not public API. 
 	"""
+	_startTimestamp = None # if set, used instead of the current time, so that worker processes get the same start time as the main process
+
 	def __init__(self, dirname, file, outdir):
 		self.dirname = toLongPathSafe(dirname, onlyIfNeeded=True) # main reason for this is to capitalize (normalize) drive letter on windows to match other toLongPathSafe invocations
 		self.xmlfile = os.path.join(dirname, file)
@@ -52,7 +55,7 @@ class _XMLProjectParser(object):
 		
 		# project load time is a reasonable proxy for test start time, 
 		# and we might want to substitute the date/time into property values
-		self.startTimestamp = time.time()
+		self.startTimestamp = _XMLProjectParser._startTimestamp or time.time()
 		
 		try:
 			username = os.getenv('PYSYS_USERNAME') or getpass.getuser().lower() # getpass throws if no env var is set to help with this
@@ -90,7 +93,7 @@ class _XMLProjectParser(object):
 			raise Exception("Unable to find supplied project file \"%s\"" % self.xmlfile)
 		
 		try:
-			self.doc = xml.dom.minidom.parse(self.xmlfile)
+			self.doc = pysys.internal.xmldom.parse(self.xmlfile)
 		except Exception:
 			raise Exception(sys.exc_info()[1])
 		else:
@@ -104,7 +107,7 @@ class _XMLProjectParser(object):
 			for extraXMLFile in extraProjectXMLs.split(','):
 				extraXMLFile = extraXMLFile.strip()
 				log.info('Loading additional project file: %s', extraXMLFile)
-				extra = xml.dom.minidom.parse(extraXMLFile).getElementsByTagName('pysysproject')
+				extra = pysys.internal.xmldom.parse(extraXMLFile).getElementsByTagName('pysysproject')
 				assert extra, 'Cannot find <pysysproject> in %s'%extraXMLFile
 
 				for extraNode in list(extra[0].childNodes):
@@ -190,8 +193,7 @@ class _XMLProjectParser(object):
 				raise UserError('Found <property> with no name= or file=')
 			
 			if permittedAttributes is not None:
-				for att in range(propertyNode.attributes.length):
-					attName = propertyNode.attributes.item(att).name
+				for attName in propertyNode.attributes.keys():
 					if attName not in permittedAttributes: 
 						# not an error, to allow for adding new ones in future pysys versions, but worth warning about
 						log.warning('Unknown <property> attribute "%s" in project configuration'%attName)
@@ -503,10 +505,10 @@ class _XMLProjectParser(object):
 		"""
 		optionsDict = {}
 		if node:
-			for att in range(node.attributes.length):
-				name = node.attributes.item(att).name.strip()
+			for name, value in node.attributes.items():
+				name = name.strip()
 				if name in optionsDict: raise UserError('Duplicate property "%s" in <%s> configuration'%(name, node.tagName))
-				optionsDict[name] = expandPropertiesImpl(node.attributes.item(att).value, default=None, name=name)
+				optionsDict[name] = expandPropertiesImpl(value, default=None, name=name)
 			for tag in node.getElementsByTagName('property'):
 				name = tag.getAttribute('name')
 				assert name
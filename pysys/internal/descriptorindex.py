@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# PySys System Test Framework, Copyright (C) 2006-2023 M.B. Grieve
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+
+"""
+Non-public API - for internal use only, may change at any time.
+
+An on-disk index of parsed test descriptors, which allows test discovery to avoid re-parsing descriptor files that
+have not changed since the previous run (see the ``descriptorIndexFile`` project property).
+"""
+
+import os, sys, hashlib, pickle, threading, logging
+
+import pysys
+from pysys.utils.fileutils import mkdir, toLongPathSafe
+
+log = logging.getLogger('pysys.descriptorindex')
+
+class DescriptorIndex(object):
+	"""
+	Holds parsed descriptors (pickled) keyed by the descriptor file path and the fingerprint of its parent directory
+	configuration, and validated against the file's modification time and size.
+
+	A fingerprint identifies the exact inputs used to parse a descriptor: the project (file, properties and PySys/Python
+	versions) for the root, and for each ``pysysdirconfig.xml`` the fingerprint of its parent plus its own file
+	details. So a change to a dirconfig file (or the project) automatically invalidates everything beneath it.
+
+	This class is thread-safe.
+
+	:param str path: The index file, which is loaded if it exists.
+	:param pysys.config.project.Project project: The project.
+	"""
+	FORMAT_VERSION = 1
+
+	IGNORED_PROJECT_PROPERTIES = {'startDate', 'startTime', 'startTimeSecs', 'outDirName'}
+	"""Properties that can change on every run, and are not expected to be used in descriptors."""
+
+	_preloaded = {} # key=path, value=(mtime_ns, size, entries); populated by preload() in long-lived processes
+
+	def __init__(self, path, project):
+		self.path = path
+		self.__lock = threading.Lock()
+		self.__entries = {} # key=(descriptorfile, parentFingerprint), value=(mtime_ns, size, fingerprint, pickled descriptor)
+		self.__used = set() # keys used by this process
+		self.__fingerprints = {} # key=id(dirconfig descriptor), value=(descriptor, fingerprint)
+		self.__changed = False
+		self.hits = self.misses = 0
+
+		projectStat = os.stat(project.projectFile) if project.projectFile else None
+		self.rootFingerprint = self.__hash(repr((self.FORMAT_VERSION, pysys.__version__, sys.version, project.projectFile,
+			projectStat and (projectStat.st_mtime_ns, projectStat.st_size),
+			sorted((k, str(v)) for k, v in project.properties.items() if k not in self.IGNORED_PROJECT_PROPERTIES),
+		)))
+
+		if os.path.exists(path):
+			preloaded = DescriptorIndex._preloaded.get(path)
+			st = os.stat(toLongPathSafe(path))
+			if preloaded is not None and preloaded[:2] == (st.st_mtime_ns, st.st_size):
+				self.__entries = dict(preloaded[2])
+			else:
+				self.__entries = self.__load(path)
+
+	@staticmethod
+	def __load(path):
+		try:
+			with open(toLongPathSafe(path), 'rb') as f:
+				data = pickle.load(f)
+			if data.get('formatVersion') == DescriptorIndex.FORMAT_VERSION:
+				return data['entries']
+		except Exception as ex:
+			log.debug('Ignoring descriptor index file %s as it could not be loaded: %r', path, ex)
+		return {}
+
+	@staticmethod
+	def preload(path):
+		"""
+		Loads the specified index file (unless it is unchanged since the last call) and keeps it in memory, so that 
+		`DescriptorIndex` instances created later in this process (or in child processes forked from it) do not need to 
+		load it again. This is used by the ``pysys server`` process. 
+		"""
+		try:
+			st = os.stat(toLongPathSafe(path))
+		except OSError:
+			DescriptorIndex._preloaded.pop(path, None)
+			return
+		preloaded = DescriptorIndex._preloaded.get(path)
+		if preloaded is None or preloaded[:2] != (st.st_mtime_ns, st.st_size):
+			DescriptorIndex._preloaded[path] = (st.st_mtime_ns, st.st_size, DescriptorIndex.__load(path))
+
+	@staticmethod
+	def __hash(s):
+		return hashlib.sha1(s.encode('utf-8', errors='replace')).hexdigest()
+
+	def setFingerprint(self, dirconfig, fingerprint):
+		"""
+		Records the fingerprint of a parent directory descriptor. The root directory descriptor(s) should be given the
+		`rootFingerprint`.
+		"""
+		with self.__lock:
+			self.__fingerprints[id(dirconfig)] = (dirconfig, fingerprint)
+
+	MISSING = object()
+	"""Returned by `lookup` if the descriptor needs to be parsed."""
+
+	def lookup(self, descriptorfile, parentDirDefaults):
+		"""
+		Returns the parsed descriptor for the specified file from the index if it is up to date, or `MISSING` if 
+		it needs to be parsed (and then passed to `add`).
+
+		The returned descriptor is always a new object, so the caller can safely modify it.
+		"""
+		parent = self.__fingerprints.get(id(parentDirDefaults))
+		if parent is None or parent[0] is not parentDirDefaults: # not a descriptor we know the origin of
+			return self.MISSING
+
+		key = (descriptorfile, parent[1])
+		entry = self.__entries.get(key)
+		if entry is None: return self.MISSING
+		st = os.stat(toLongPathSafe(descriptorfile))
+		if entry[0] != st.st_mtime_ns or entry[1] != st.st_size: return self.MISSING
+		try:
+			descriptor = pickle.loads(entry[3])
+		except Exception as ex: # e.g. if a class it references no longer exists
+			log.debug('Failed to load %s from descriptor index: %r', descriptorfile, ex)
+			return self.MISSING
+		with self.__lock:
+			self.__used.add(key)
+			self.hits += 1
+		if descriptor is not None and descriptor.isDirConfig: self.setFingerprint(descriptor, entry[2])
+		return descriptor
+
+	def add(self, descriptorfile, parentDirDefaults, descriptor):
+		"""
+		Adds a newly parsed descriptor (or None if the file did not produce a descriptor) to the index. 
+
+		Must be called before the descriptor is modified. 
+		"""
+		with self.__lock:
+			self.misses += 1
+		parent = self.__fingerprints.get(id(parentDirDefaults))
+		if parent is None or parent[0] is not parentDirDefaults: return
+
+		st = os.stat(toLongPathSafe(descriptorfile))
+		key = (descriptorfile, parent[1])
+		fingerprint = self.__hash(repr((parent[1], descriptorfile, st.st_mtime_ns, st.st_size)))
+		try:
+			entry = (st.st_mtime_ns, st.st_size, fingerprint, pickle.dumps(descriptor, protocol=pickle.HIGHEST_PROTOCOL))
+		except Exception as ex: # e.g. if a custom descriptor property is not picklable
+			log.debug('Cannot add %s to the descriptor index: %r', descriptorfile, ex)
+			return
+		with self.__lock:
+			self.__entries[key] = entry
+			self.__used.add(key)
+			self.__changed = True
+		if descriptor is not None and descriptor.isDirConfig: self.setFingerprint(descriptor, fingerprint)
+
+	def parse(self, descriptorfile, parentDirDefaults, parseFunction):
+		"""
+		Returns the parsed descriptor for the specified file from the index if it is up to date, otherwise calls
+		``parseFunction()`` and adds the result to the index.
+		"""
+		descriptor = self.lookup(descriptorfile, parentDirDefaults)
+		if descriptor is self.MISSING:
+			descriptor = parseFunction()
+			self.add(descriptorfile, parentDirDefaults, descriptor)
+		return descriptor
+
+	def save(self, searchedDir):
+		"""
+		Writes the index file, if it has changed. Entries for files under the searched directory that were not used
+		(because they were deleted, or their parent directory configuration changed) are removed.
+		"""
+		log.debug('Loaded %d descriptors from the descriptor index and parsed %d others', self.hits, self.misses)
+		prefix = searchedDir.rstrip(os.sep)+os.sep
+		with self.__lock:
+			unused = [k for k in self.__entries if k not in self.__used and k[0].startswith(prefix)]
+			for k in unused: del self.__entries[k]
+			if not (unused or self.__changed): return
+			self.__changed = False
+			entries = dict(self.__entries)
+
+		log.debug('Writing descriptor index %s with %d entries (%d removed)', self.path, len(entries), len(unused))
+		mkdir(os.path.dirname(self.path))
+		tmp = '%s.%d.tmp'%(self.path, os.getpid())
+		try:
+			with open(toLongPathSafe(tmp), 'wb') as f:
+				pickle.dump({'formatVersion': self.FORMAT_VERSION, 'entries': entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+			os.replace(toLongPathSafe(tmp), toLongPathSafe(self.path)) # atomic, in case several processes are using it
+		except Exception as ex: # not fatal, since this is just an optimization
+			log.warning('Failed to write descriptor index %s: %s', self.path, ex)
+			if os.path.exists(tmp): os.remove(tmp)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# PySys System Test Framework, Copyright (C) 2006-2023 M.B. Grieve
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+
+"""
+Non-public API - for internal use only, may change at any time.
+
+Parses test descriptors using a pool of processes, since parsing is CPU-bound and so gains little from threads due
+to the GIL.
+"""
+
+import os, math, logging
+import multiprocessing
+
+log = logging.getLogger('pysys.descriptorpool')
+
+DESCRIPTORS_PER_PROCESS = 1000
+"""The minimum number of descriptors to parse per process, to make it worth the cost of starting a process."""
+
+MAX_PROCESSES = 8
+
+_workerLoader = None
+
+def _initWorker(projectRoot, projectFile, outDirName, startTimestamp, properties):
+	import pysys.launcher # needed for parsing modes
+	from pysys.config.project import Project, _XMLProjectParser
+	from pysys.config.descriptor import DescriptorLoader
+	from pysys.utils.pycompat import makeReadOnlyDict
+	_XMLProjectParser._startTimestamp = startTimestamp # so that any date/time properties match the main process
+	project = Project(projectRoot, projectFile, outdir=outDirName)
+	if properties != project.properties:
+		# the properties were changed in memory after the project was loaded, so use the same values as the main process
+		log.debug('Using project properties from the main process in descriptor loader worker')
+		for key, value in properties.items():
+			# as in the Project constructor, properties never overwrite other fields of the project
+			if getattr(project, key) is project.properties[key] if key in project.properties else not hasattr(project, key):
+				object.__setattr__(project, key, value)
+		object.__setattr__(project, 'properties', makeReadOnlyDict(properties))
+	global _workerLoader
+	_workerLoader = DescriptorLoader(project)
+
+def _parseChunk(chunk):
+	parents, items = chunk
+	return [_workerLoader._parseTestDescriptor(descriptorfile, parentDirDefaults=parents[parentIndex])
+		for descriptorfile, parentIndex in items]
+
+def getProcessCount(project, descriptorCount):
+	"""
+	Returns the number of processes to use for parsing the specified number of descriptors, or 1 if they should be
+	parsed in the current process.
+
+	Processes are only used if there are at least ``pysysDescriptorLoaderProcessThreshold`` descriptors to parse
+	(default 5000; set to 0 to disable).
+	"""
+	if not project.projectFile: return 1 # workers need to load the project from its file
+	threshold = int(project.getProperty('pysysDescriptorLoaderProcessThreshold', 5000))
+	if threshold <= 0 or descriptorCount < max(threshold, 2*DESCRIPTORS_PER_PROCESS): return 1
+	cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+	return max(1, min(cpus or 1, MAX_PROCESSES, descriptorCount // DESCRIPTORS_PER_PROCESS))
+
+def parseDescriptors(project, descriptorsToParse, processes):
+	"""
+	Parses the specified descriptors using a pool of processes.
+
+	:param list[tuple[str,TestDescriptor]] descriptorsToParse: The (descriptorfile, parentDirDefaults) of each
+		descriptor to parse.
+	:return: A generator yielding the parsed descriptors (or None) in the same order as ``descriptorsToParse``, as soon 
+		as each chunk has been parsed.
+	"""
+	# send the (usually few) distinct parent dirconfigs just once with each chunk rather than with every item
+	chunkSize = max(1, int(math.ceil(len(descriptorsToParse) / (processes*4.0))))
+	chunks = []
+	for i in range(0, len(descriptorsToParse), chunkSize):
+		parents, parentIndexes, items = [], {}, []
+		for descriptorfile, parent in descriptorsToParse[i:i+chunkSize]:
+			if id(parent) not in parentIndexes:
+				parentIndexes[id(parent)] = len(parents)
+				parents.append(parent)
+			items.append((descriptorfile, parentIndexes[id(parent)]))
+		chunks.append((parents, items))
+
+	log.debug('Parsing %d descriptors using %d processes', len(descriptorsToParse), processes)
+	# using spawn since it is not safe to fork a process with many threads
+	with multiprocessing.get_context('spawn').Pool(processes, initializer=_initWorker, initargs=(
+			project.root, os.path.basename(project.projectFile), project.outDirName, project.startTimestamp, 
+			dict(project.properties))) as pool:
+		for result in pool.imap(_parseChunk, chunks, chunksize=1):
+			yield from result
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+# PySys System Test Framework, Copyright (C) 2006-2023 M.B. Grieve
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+
+"""
+Non-public API - for internal use only, may change at any time.
+
+In-memory capture of the stdout and stderr of processes started with ``startProcess(inMemoryOutput=True)``.
+
+The output of each process is read from a pipe by a single shared reader thread into a `CapturedOutput` buffer that is
+registered under the path of the stdout/stderr file the process would otherwise have written. The file APIs that
+PySys uses to read output files (`pysys.utils.fileutils.pathexists`, `pysys.utils.pycompat.openfile` and
+`pysys.utils.filegrep.FileTailer`) check this registry first, so grep, assert and wait methods read the buffer
+directly. A buffer is written ("spilled") to its file if it grows beyond its maximum size (after which further output
+is appended to the file), or if the test fails so that the output is available for triage.
+"""
+
+import os, io, time, logging, selectors, threading
+
+log = logging.getLogger('pysys.process')
+
+_captured = {} # key=normcased absolute path, value=CapturedOutput
+_capturedLock = threading.Lock()
+
+def getCapturedOutput(path):
+	"""
+	Returns the in-memory buffer for the specified path, or None if it is not captured in memory (or has been
+	spilled to disk).
+	"""
+	if not _captured: return None # fast path for the usual case
+	capture = _captured.get(os.path.normcase(os.path.abspath(path)))
+	return None if capture is None or capture.spilled else capture
+
+class CapturedOutput(object):
+	"""
+	A memory-bounded buffer holding the output written by a process to one of its pipes.
+
+	:param str path: The path of the file this output would have been written to.
+	:param int maxBytes: The maximum number of bytes to hold in memory before spilling to the file.
+	"""
+	def __init__(self, path, maxBytes):
+		self.path = path
+		self.maxBytes = maxBytes
+		self.spilled = False
+		self.__data = bytearray()
+		self.__file = None
+		self.__lock = threading.Lock()
+		self.__closed = threading.Event()
+
+	def __repr__(self): return 'CapturedOutput<%s, %d bytes>'%(self.path, len(self.__data))
+
+	def register(self):
+		"""
+		Makes this buffer visible to the file APIs, replacing any file or buffer previously registered for this path
+		(just as the file would be truncated if the process was writing directly to it).
+		"""
+		key = os.path.normcase(os.path.abspath(self.path))
+		with _capturedLock:
+			_captured[key] = self
+		if os.path.exists(self.path): os.remove(self.path)
+
+	def unregister(self):
+		key = os.path.normcase(os.path.abspath(self.path))
+		with _capturedLock:
+			if _captured.get(key) is self: del _captured[key]
+
+	def getvalue(self):
+		"""
+		Returns a snapshot of the bytes captured so far.
+		"""
+		with self.__lock:
+			return bytes(self.__data)
+
+	def readFrom(self, offset):
+		"""
+		Returns the bytes captured after the specified offset, together with the total number of bytes captured so
+		far (both from the same snapshot), so that a reader can consume new output without copying the whole buffer.
+
+		:return: A tuple ``(data, length)``.
+		"""
+		with self.__lock:
+			return bytes(self.__data[offset:]), len(self.__data)
+
+	def open(self, mode='r', encoding=None, errors=None, **kwargs):
+		"""
+		Returns a stream for reading a snapshot of the captured output, with the same semantics as
+		`pysys.utils.pycompat.openfile`.
+		"""
+		assert 'r' in mode and not any(c in mode for c in 'wax+'), 'Cannot write to in-memory output %s'%self.path
+		stream = io.BytesIO(self.getvalue())
+		if 'b' in mode: return stream
+		return io.TextIOWrapper(stream, encoding=encoding, errors=errors, newline=kwargs.get('newline'))
+
+	def _append(self, data):
+		with self.__lock:
+			if self.__file is not None:
+				self.__write(self.__file, data)
+				return
+			self.__data += data
+			if len(self.__data) > self.maxBytes:
+				log.debug('In-memory output exceeded %d bytes so will be written to %s', self.maxBytes, self.path)
+				self.__spill(keepOpen=True)
+
+	def _close(self):
+		with self.__lock:
+			if self.__file is not None:
+				self.__file.close()
+				self.__file = None
+		self.__closed.set()
+
+	def waitUntilClosed(self, timeout):
+		"""
+		Waits until the process (and any child processes that inherited its pipe) has closed its end of the pipe,
+		so that all its output has been captured.
+
+		:return: True if the pipe has been closed.
+		"""
+		return self.__closed.wait(timeout)
+
+	def spill(self):
+		"""
+		Writes the output captured so far to the file (if not already done), after which any further output is
+		appended to the file, and the file APIs read the file instead of this buffer.
+		"""
+		with self.__lock:
+			if not self.spilled: self.__spill(keepOpen=not self.__closed.is_set())
+
+	def __spill(self, keepOpen):
+		# must be called with the lock held
+		from pysys.utils.fileutils import toLongPathSafe # import here to avoid circular dependency
+		# unbuffered, so that anything waiting for output sees each chunk as soon as it has been read from the pipe
+		f = io.open(toLongPathSafe(self.path, onlyIfNeeded=True), 'wb', buffering=0)
+		self.__write(f, self.__data)
+		self.__data = bytearray()
+		if keepOpen:
+			self.__file = f
+		else:
+			f.close()
+		self.spilled = True # file APIs will now read from the file instead
+
+	@staticmethod
+	def __write(f, data):
+		# an unbuffered file may not write everything in one call
+		data = memoryview(data)
+		while data:
+			data = data[f.write(data):]
+
+class OutputReader(object):
+	"""
+	A single thread that reads from the stdout/stderr pipes of all processes whose output is captured in memory.
+
+	Use `getInstance` rather than constructing this directly.
+	"""
+	READ_CHUNK_SIZE = 64*1024
+
+	__instance = None
+	__instanceLock = threading.Lock()
+
+	@staticmethod
+	def getInstance():
+		"""
+		Returns the reader for this process, starting its thread if needed.
+		"""
+		instance = OutputReader.__instance
+		if instance is not None: return instance
+		with OutputReader.__instanceLock:
+			if OutputReader.__instance is None: OutputReader.__instance = OutputReader()
+			return OutputReader.__instance
+
+	@staticmethod
+	def _resetAfterFork():
+		OutputReader.__instance = None
+		OutputReader.__instanceLock = threading.Lock()
+
+	def __init__(self):
+		self.__lock = threading.Lock()
+		self.__pending = [] # (fd, capture) registered since the thread last woke up
+		self.__wakeupRead, self.__wakeupWrite = os.pipe()
+		os.set_blocking(self.__wakeupRead, False)
+		os.set_blocking(self.__wakeupWrite, False)
+		self.__thread = threading.Thread(target=self.__run, name='pysys.outputreader', daemon=True)
+		self.__thread.start()
+
+	def register(self, fd, capture):
+		"""
+		Starts reading from the specified pipe into the specified buffer. The reader takes ownership of the file
+		descriptor and will close it when the other end of the pipe is closed.
+		"""
+		os.set_blocking(fd, False)
+		with self.__lock:
+			self.__pending.append((fd, capture))
+		try:
+			os.write(self.__wakeupWrite, b'x')
+		except BlockingIOError: # the pipe is full, so the thread will wake up anyway
+			pass
+
+	def __run(self):
+		selector = selectors.DefaultSelector()
+		selector.register(self.__wakeupRead, selectors.EVENT_READ)
+		while True:
+			try:
+				events = selector.select()
+			except Exception as ex: # pragma: no cover - should never happen, but mustn't kill the thread
+				log.debug('Output reader failed to select: %r', ex)
+				time.sleep(0.05)
+				continue
+
+			for key, mask in events:
+				if key.fd == self.__wakeupRead:
+					try:
+						while os.read(self.__wakeupRead, 1024): pass
+					except BlockingIOError:
+						pass
+					continue
+				capture = key.data
+				try:
+					data = os.read(key.fd, self.READ_CHUNK_SIZE)
+				except BlockingIOError:
+					continue
+				except OSError as ex: # pragma: no cover
+					log.debug('Output reader failed to read from %r: %r', capture, ex)
+					data = b''
+				if data:
+					try:
+						capture._append(data)
+					except Exception as ex: # pragma: no cover - e.g. disk full while spilling
+						log.warning('Failed to capture output for %s: %r', capture.path, ex)
+					continue
+				selector.unregister(key.fd)
+				os.close(key.fd)
+				capture._close()
+
+			with self.__lock:
+				pending, self.__pending = self.__pending, []
+			for fd, capture in pending:
+				selector.register(fd, selectors.EVENT_READ, capture)
+
+if hasattr(os, 'register_at_fork'):
+	os.register_at_fork(after_in_child=OutputReader._resetAfterFork)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# PySys System Test Framework, Copyright (C) 2006-2023 M.B. Grieve
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+
+"""
+Non-public API - for internal use only, may change at any time.
+
+A single background thread that detects when any of the Unix processes started by PySys terminate, records their
+exit status immediately, and wakes up any threads waiting for them.
+
+On Linux 5.3+ each process is watched using a pidfd, so all the processes in the PySys process are watched by a single
+blocking ``epoll`` call regardless of how many there are. Where pidfds are not available, the reaper thread instead
+polls the processes it is watching (which is still cheaper than every waiting thread polling separately). A SIGCHLD
+handler is not used since handlers can only be installed from the main thread, and would interfere with any handler
+installed by the test or the application under test.
+"""
+
+import os, time, logging, selectors, threading
+
+log = logging.getLogger('pysys.process')
+
+class ProcessReaper(object):
+	"""
+	Watches a set of processes, calling ``setExitStatus()`` on each as soon as it terminates.
+
+	Use `getInstance` rather than constructing this directly.
+	"""
+
+	POLL_INTERVAL_SECS = 0.05
+	"""How often processes are checked if they could not be registered with a pidfd."""
+
+	__instance = None
+	__instanceLock = threading.Lock()
+
+	@staticmethod
+	def getInstance():
+		"""
+		Returns the reaper for this process, starting its thread if needed.
+		"""
+		instance = ProcessReaper.__instance
+		if instance is not None: return instance
+		with ProcessReaper.__instanceLock:
+			if ProcessReaper.__instance is None: ProcessReaper.__instance = ProcessReaper()
+			return ProcessReaper.__instance
+
+	@staticmethod
+	def _resetAfterFork():
+		# threads do not survive a fork, so a child process must start its own reaper if it needs one
+		ProcessReaper.__instance = None
+		ProcessReaper.__instanceLock = threading.Lock()
+
+	def __init__(self):
+		self.__condition = threading.Condition()
+		self.__pending = [] # (process, pidfd) registered since the thread last woke up
+		self.__abortHandle = None
+		self.isAborting = False
+
+		self.__wakeupRead, self.__wakeupWrite = os.pipe()
+		os.set_blocking(self.__wakeupRead, False)
+		os.set_blocking(self.__wakeupWrite, False)
+
+		self.__thread = threading.Thread(target=self.__run, name='pysys.processreaper', daemon=True)
+		self.__thread.start()
+
+	def register(self, process, pidfd=None, abortHandle=None):
+		"""
+		Starts watching the specified process, which must be a child of this process.
+
+		:param pysys.process.Process process: The process, which must implement ``setExitStatus()``. It will be called
+			from the reaper thread, so must be thread-safe.
+		:param int pidfd: A pidfd for the process, or None if not available. The reaper takes ownership of this
+			file descriptor and will close it after the process terminates.
+		:param int abortHandle: A file descriptor that becomes readable when the runner is aborting, which
+			wakes up all waiting threads.
+		"""
+		with self.__condition:
+			self.__pending.append((process, pidfd))
+			if abortHandle is not None and self.__abortHandle is None: self.__abortHandle = abortHandle
+		self.__wakeup()
+
+	def __wakeup(self):
+		try:
+			os.write(self.__wakeupWrite, b'x')
+		except BlockingIOError: # the pipe is full, so the thread will wake up anyway
+			pass
+
+	def wait(self, processes, timeout, abortable=True):
+		"""
+		Blocks until all of the specified processes have terminated, the timeout expires, or (if abortable) the
+		runner starts aborting.
+
+		Processes that are not registered with this reaper must not be passed to this method.
+
+		:param list[pysys.process.Process] processes: The processes to wait for.
+		:param float timeout: The maximum time to wait, in seconds.
+		:param bool abortable: If True, return as soon as the runner is aborting.
+		:return: True if all the processes have terminated.
+		"""
+		with self.__condition:
+			return self.__condition.wait_for(lambda: all(p.exitStatus is not None for p in processes) or (
+				abortable and self.isAborting), timeout) and all(p.exitStatus is not None for p in processes)
+
+	def __run(self):
+		selector = selectors.DefaultSelector()
+		selector.register(self.__wakeupRead, selectors.EVENT_READ)
+		polled = set() # processes with no pidfd
+		while True:
+			try:
+				events = selector.select(self.POLL_INTERVAL_SECS if polled else None)
+			except Exception as ex: # pragma: no cover - should never happen, but mustn't kill the thread
+				log.debug('Process reaper failed to select: %r', ex)
+				time.sleep(self.POLL_INTERVAL_SECS)
+				events = []
+
+			exited, aborting = [], False
+			for key, mask in events:
+				if key.fd == self.__wakeupRead:
+					try:
+						while os.read(self.__wakeupRead, 1024): pass
+					except BlockingIOError:
+						pass
+				elif key.fd == self.__abortHandle:
+					selector.unregister(key.fd) # it stays readable forever, and we only need to know once
+					aborting = True
+				else:
+					selector.unregister(key.fd)
+					os.close(key.fd)
+					exited.append(key.data)
+
+			with self.__condition:
+				if aborting: self.isAborting = True
+				pending, self.__pending = self.__pending, []
+				if self.__abortHandle is not None and not self.isAborting and self.__abortHandle not in selector.get_map():
+					selector.register(self.__abortHandle, selectors.EVENT_READ)
+			for process, pidfd in pending:
+				if pidfd is None:
+					polled.add(process)
+					continue
+				try:
+					selector.register(pidfd, selectors.EVENT_READ, process)
+				except Exception as ex: # pragma: no cover
+					log.debug('Process reaper failed to register pidfd for %r so will poll it instead: %r', process, ex)
+					os.close(pidfd)
+					polled.add(process)
+
+			for process in list(polled): # includes processes that may have been reaped by another thread already
+				if process.exitStatus is not None or self.__setExitStatus(process) is not None:
+					polled.discard(process)
+					exited.append(process)
+
+			if not (exited or aborting): continue
+			for process in exited: self.__setExitStatus(process) # a no-op if it's already been reaped
+			with self.__condition:
+				self.__condition.notify_all()
+
+	@staticmethod
+	def __setExitStatus(process):
+		try:
+			return process.setExitStatus()
+		except Exception as ex: # pragma: no cover
+			log.debug('Process reaper failed to get exit status of %r: %r', process, ex)
+			return None
+
+if hasattr(os, 'register_at_fork'):
+	os.register_at_fork(after_in_child=ProcessReaper._resetAfterFork)
@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+# PySys System Test Framework, Copyright (C) 2006-2023 M.B. Grieve
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+
+"""
+Non-public API - for internal use only, may change at any time.
+
+Support for executing tests in a pool of worker processes (``pysys run --workers=processes``), so that
+Python-heavy test execution and validation is not serialized by the GIL of a single interpreter.
+
+The main PySys process still has one thread per worker (from the usual ``ThreadPool``), which takes the next test from
+the scheduler, sends the descriptor to its worker process, and waits for the outcome, run.log output and performance
+results to be sent back. These are then passed to the performance reporters and writers in the main process, exactly
+as if the test had executed in the main process.
+
+Each worker process loads the project and constructs its own instance of the runner class (which is not started),
+and executes each test using a ``TestContainer`` in the usual way. Runner plugins, ``BaseRunner.setup`` and writers
+are not executed in worker processes.
+"""
+
+import os, sys, time, math, signal, logging, importlib, threading
+import multiprocessing
+
+import pysys
+import pysys.launcher
+from pysys.constants import *
+from pysys.process.user import ProcessUser
+from pysys.basetest import BaseTest
+from pysys.baserunner import TestContainer, global_lock
+from pysys.internal.initlogging import _UnicodeSafeStreamWrapper, pysysLogHandler, stdoutHandler
+import pysys.utils.allocport
+from pysys.internal.testdependencies import getTestDependencies
+
+log = logging.getLogger('pysys.processworker')
+
+class _PerformanceResultRecorder(object):
+	"""
+	Used as the only performance reporter in worker processes, to record the results so they can be sent back to
+	the main process (which has the real reporters). Unit aliases and value formatting are taken from the first
+	real reporter, so that results are validated and logged to run.log exactly as they would be in the main process.
+	"""
+	def __init__(self, delegate):
+		self.unitAliases = delegate.unitAliases
+		self.valueToDisplayString = delegate.valueToDisplayString
+		self.results = []
+
+	def reportResult(self, testobj, value, resultKey, unit, **kwargs):
+		self.results.append((value, resultKey, unit, kwargs))
+
+class _WorkerTestContainer(TestContainer):
+	def _purgeOutputDir(self, outsubdir):
+		# with multiple cycles the main process purges the output directory, since other cycles of the same test
+		# may be executing in other worker processes
+		if self.runner.cycle <= 1: super()._purgeOutputDir(outsubdir)
+
+def workerMain(conn, config):
+	"""
+	The main function of a worker process, which receives ``(descriptor, cycle)`` tuples from the connection to the
+	main process and sends back a dictionary with the result of executing each one, until it receives ``None``.
+	"""
+	pysysLogHandler.setLogHandlersForCurrentThread([logging.NullHandler()]) # anything this thread logs outside a test is not wanted
+	stdoutHandler.setLevel(config['stdoutLevel'])
+	for name, level in config['logLevels'].items():
+		logging.getLogger(name).setLevel(level)
+
+	os.chdir(config['cwd'])
+	from pysys.config.project import Project, _XMLProjectParser
+	_XMLProjectParser._startTimestamp = config['startTimestamp']
+	project = Project.findAndLoadProject(outdir=config['outsubdir'])
+	if config['defaultAbortOnError'] is not None: project.defaultAbortOnError = config['defaultAbortOnError']
+
+	module, classname = config['runnerClass']
+	runner = getattr(importlib.import_module(module), classname)(*config['runnerArgs'])
+	pysys.utils.allocport._partitionPortPool(config['workerIndex'], config['workerCount']+1)
+
+	# the main process is responsible for writers and for handling signals; it requests an abort using SIGTERM
+	runner.writers = []
+	signal.signal(signal.SIGINT, signal.SIG_IGN)
+	signal.signal(signal.SIGTERM, lambda sig, frame: runner.runnerAbort())
+
+	recordDependencies = bool(project.getProperty('testDependenciesFile', ''))
+
+	reporters = runner._createPerformanceReporters()
+	recorder = _PerformanceResultRecorder(reporters[0])
+	runner.performanceReporters = [recorder]
+	runner._initialEnviron = os.environ.copy()
+	runner._initialCwd = os.getcwd()
+
+	try:
+		while True:
+			request = conn.recv()
+			if request is None: break
+			descriptor, cycle = request
+			del recorder.results[:]
+			del runner.runnerErrors[:]
+
+			container = _WorkerTestContainer(descriptor, cycle, runner)
+			container()
+			testObj = container.testObj
+			conn.send({
+				'outcomeState': testObj._getOutcomeState() if testObj is not None else ([OUTCOMES.index(BLOCKED)], 'Failed to create test object', (None, None)),
+				'testStart': container.testStart,
+				'testTime': container.testTime,
+				'runLogOutput': container.testFileHandlerStdoutBuffer.getvalue(),
+				'outsubdir': container.outsubdir,
+				'kbrdInt': container.kbrdInt,
+				'performanceResults': list(recorder.results),
+				'runnerErrors': list(runner.runnerErrors),
+				'testDependencies': getTestDependencies(testObj) if (recordDependencies and testObj is not None) else set(),
+			})
+			del container, testObj
+	except (EOFError, KeyboardInterrupt): # main process has gone away
+		pass
+	finally:
+		try: # runner.setup() was not called, so only do the standard cleanup (of processes and cleanup functions)
+			ProcessUser.cleanup(runner)
+		except Exception as ex: # pragma: no cover
+			sys.stderr.write('Failed to cleanup PySys worker process: %s\n'%ex)
+
+class ProcessWorkerPool(object):
+	"""
+	Manages the worker processes, each of which is used by one thread of the main process's ``ThreadPool``.
+
+	Processes are started on demand, and restarted if a previous one terminated unexpectedly.
+
+	:param pysys.baserunner.BaseRunner runner: The runner in the main process, which must already be set up.
+	:param int workerCount: The number of worker processes (which must equal the number of threads).
+	:param dict extraOptions: The extra runner options from the command line.
+	"""
+	def __init__(self, runner, workerCount, extraOptions):
+		self.runner = runner
+		self.workerCount = workerCount
+		# using spawn since it is not safe to fork a process with many threads
+		self.__context = multiprocessing.get_context('spawn')
+		self.__lock = threading.Lock()
+		self.__threadLocals = threading.local()
+		self.__processes = [None]*workerCount # index -> (process, connection)
+		self.__nextIndex = 0
+
+		xargs = dict(runner.xargs)
+		xargs['__extraRunnerOptions'] = dict(extraOptions, workers='threads', processWorker=True, sort=None, shard=None)
+		self.__config = {
+			'cwd': runner._initialCwd,
+			'outsubdir': runner.outsubdir,
+			'startTimestamp': runner.project.startTimestamp,
+			'defaultAbortOnError': getattr(runner.project, 'defaultAbortOnError', None), # set if overridden on the command line
+			'runnerClass': (type(runner).__module__, type(runner).__name__),
+			'runnerArgs': (runner.record, runner.purge, runner.cycle, None, runner.threads, runner.outsubdir, [], xargs),
+			'stdoutLevel': stdoutHandler.level,
+			'logLevels': {name: logger.level for name, logger in
+				list(logging.Logger.manager.loggerDict.items())+[('', logging.getLogger())]
+				if isinstance(logger, logging.Logger) and logger.level != logging.NOTSET},
+			'workerCount': workerCount,
+		}
+
+	def __startWorker(self, index):
+		parentConn, childConn = self.__context.Pipe()
+		config = dict(self.__config, workerIndex=index)
+		process = self.__context.Process(target=workerMain, args=(childConn, config), name='pysys-worker-%d'%(index+1), daemon=True)
+		process.start()
+		childConn.close()
+		log.debug('Started worker process %d with pid %s', index+1, process.pid)
+		return process, parentConn
+
+	def executeTest(self, descriptor, cycle):
+		"""
+		Executes the specified test in the worker process for the current thread, starting it if necessary.
+
+		:return: The result dictionary sent back from the worker, or None if the worker terminated before the test
+			completed (in which case it will be restarted for the next test).
+		"""
+		index = getattr(self.__threadLocals, 'index', None)
+		if index is None:
+			with self.__lock:
+				index = self.__threadLocals.index = self.__nextIndex
+				self.__nextIndex += 1
+		worker = self.__processes[index]
+		if worker is None or not worker[0].is_alive():
+			worker = self.__processes[index] = self.__startWorker(index)
+		process, conn = worker
+		try:
+			conn.send((descriptor, cycle))
+			return conn.recv()
+		except (EOFError, OSError) as ex:
+			process.join(5)
+			log.debug('Worker process %d failed while executing %s: %r', index+1, descriptor.id, ex)
+			conn.close()
+			self.__processes[index] = None
+			return None
+
+	def abort(self):
+		"""
+		Asks all worker processes to abort the tests they are executing.
+
+		Like `pysys.baserunner.BaseRunner.runnerAbort` this may be called from a signal handler so must not take locks.
+		"""
+		for worker in list(self.__processes):
+			if worker is None: continue
+			try:
+				if IS_WINDOWS: # pragma: no cover
+					worker[0].terminate()
+				else:
+					os.kill(worker[0].pid, signal.SIGTERM)
+			except Exception as ex: # pragma: no cover - e.g. if it already terminated
+				log.debug('Failed to signal worker process %s: %r', worker[0].pid, ex)
+
+	def close(self):
+		"""
+		Stops all worker processes. Must be called once no more tests will be executed.
+		"""
+		for i, worker in enumerate(self.__processes):
+			if worker is None: continue
+			process, conn = worker
+			try:
+				conn.send(None)
+			except Exception: # it may already have terminated
+				pass
+			process.join(TIMEOUTS['WaitForProcessStop'])
+			if process.is_alive(): # pragma: no cover
+				log.warning('Worker process %d did not stop cleanly; terminating it', i+1)
+				process.terminate()
+				process.join()
+			conn.close()
+			self.__processes[i] = None
+
+class ProcessTestContainer(TestContainer):
+	"""
+	Used in the main process instead of a `pysys.baserunner.TestContainer`, to execute a test in a worker process
+	and make its results available for reporting in the main process.
+
+	The ``testObj`` is a `pysys.basetest.BaseTest` (rather than the real test class, which is only loaded in the
+	worker) whose outcome, output directory, cycle and start time match the test that was executed.
+
+	:meta private:
+	"""
+	def __init__(self, descriptor, cycle, runner, pool):
+		super().__init__(descriptor, cycle, runner)
+		self.pool = pool
+		self.__testDependencies = set()
+
+	def _getTestDependencies(self):
+		return self.__testDependencies
+
+	def __call__(self, *args, **kwargs):
+		self.testStart = time.time()
+		self.outsubdir = self._getOutputDir()
+		if self.runner.cycle > 1:
+			if not self.runner.validateOnly:
+				try:
+					self._purgeOutputDir(self.outsubdir)
+				except Exception as ex: # the worker will give a warning about any files that could not be deleted
+					log.debug('Failed to clean test output directory %s before starting test: %r', self.outsubdir, ex)
+			self.outsubdir = os.path.join(self.outsubdir, 'cycle%d' % (self.cycle+1))
+
+		with global_lock:
+			BaseTest._currentTestCycle = (self.cycle+1) if (self.runner.cycle > 1) else 0 # as for TestContainer
+			try:
+				self.testObj = BaseTest(self.descriptor, self.outsubdir, self.runner)
+			finally:
+				del BaseTest._currentTestCycle
+			TestContainer._inProgressTests.add(self.testObj)
+		try:
+			result = None if ProcessUser.isRunnerAborting else self.pool.executeTest(self.descriptor, self.cycle)
+		finally:
+			TestContainer._inProgressTests.discard(self.testObj)
+
+		# log messages from reporting the results should go to the same places as the test's own output
+		defaultLogHandlersForCurrentThread = pysysLogHandler.getLogHandlersForCurrentThread()
+		handlers = [logging.StreamHandler(_UnicodeSafeStreamWrapper(self.testFileHandlerStdoutBuffer, writebytes=False, encoding='utf-8'))]
+		handlers[0].setFormatter(self.runner.project.formatters.stdout)
+		handlers[0].setLevel(stdoutHandler.level)
+		if os.path.isdir(self.outsubdir):
+			runLogEncoding = self.runner.getDefaultFileEncoding('run.log') or PREFERRED_ENCODING
+			handlers.append(logging.StreamHandler(_UnicodeSafeStreamWrapper(
+				open(os.path.join(self.outsubdir, 'run.log'), 'a', encoding=runLogEncoding), writebytes=False, encoding=runLogEncoding)))
+			handlers[1].setFormatter(self.runner.project.formatters.runlog)
+			handlers[1].setLevel(logging.DEBUG if stdoutHandler.level == logging.DEBUG else logging.INFO)
+		pysysLogHandler.setLogHandlersForCurrentThread(handlers)
+		try:
+			if result is None:
+				self.kbrdInt = ProcessUser.isRunnerAborting
+				if self.kbrdInt:
+					self.testObj.addOutcome(BLOCKED, 'Test interrupted by runner abort', abortOnError=False)
+				else:
+					log.error('Worker process terminated unexpectedly while executing test %s', self.descriptor.id)
+					self.testObj.addOutcome(BLOCKED, 'Worker process terminated unexpectedly while executing this test', abortOnError=False)
+				self.testTime = math.floor(100*(time.time() - self.testStart))/100.0
+				return self
+
+			self.testObj._setOutcomeState(result['outcomeState'])
+			self.testStart = self.testObj.testStartTime = result['testStart']
+			self.testTime = result['testTime']
+			self.outsubdir = result['outsubdir']
+			self.kbrdInt = result['kbrdInt']
+			self.testFileHandlerStdoutBuffer.write(result['runLogOutput'])
+			self.runner.runnerErrors.extend(result['runnerErrors'])
+			self.__testDependencies = result['testDependencies']
+
+			# results were already validated and logged by the worker, so just need to pass them to the real reporters
+			for value, resultKey, unit, resultKwargs in result['performanceResults']:
+				try:
+					for p in self.runner.performanceReporters:
+						p.reportResult(self.testObj, value, resultKey, unit, **resultKwargs)
+				except Exception as ex:
+					log.exception('Failed to report performance result "%s" from %s: ', resultKey, self.descriptor.id)
+					self.testObj.addOutcome(BLOCKED, 'Failed to report performance result: %s'%ex, abortOnError=False)
+			return self
+		finally:
+			pysysLogHandler.setLogHandlersForCurrentThread(defaultLogHandlersForCurrentThread)
+			for h in handlers[1:]: h.stream.close()
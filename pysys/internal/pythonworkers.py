@@ -0,0 +1,326 @@
+#!/usr/bin/env python
+# PySys System Test Framework, Copyright (C) 2006-2023 M.B. Grieve
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+
+"""
+Non-public API - for internal use only, may change at any time.
+
+Implements ``startPython(reuseInterpreter=True)`` on Unix, which runs Python scripts and modules in child processes
+forked from a long-lived Python worker server (see `pysys.internal.pythonworkerserver`) that has already started up
+the interpreter and imported commonly used modules, rather than starting a new interpreter for each process.
+
+Since some environment variables (such as ``PYTHONPATH`` and ``LANG``) are only read when the interpreter starts up, a
+separate server is started for each distinct set of these variables. Each child process is not a child of the PySys
+process, so the server reports the pid and exit status of each child back to PySys over its socket.
+"""
+
+import os, sys, json, socket, struct, signal, selectors, subprocess, threading, collections, logging
+
+from pysys import process_lock
+from pysys.constants import *
+from pysys.exceptions import *
+import pysys.process.helper
+import pysys.process.user as processuser
+from pysys.internal.outputcapture import OutputReader
+
+log = logging.getLogger('pysys.process')
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(__file__), 'pythonworkerserver.py')
+# executes the server script without putting its directory on the sys.path
+SERVER_BOOTSTRAP = "import sys, runpy; runpy.run_path(sys.argv[1], run_name='__pysys_worker_server__')"
+
+def canReuseInterpreter(arguments):
+	"""
+	Returns True if the specified Python arguments can be executed by a worker server, i.e. if they consist of a
+	script path, ``-m module`` or ``-c command`` followed by arguments for the script (but no other interpreter options).
+	"""
+	if not arguments: return False
+	if arguments[0] in ['-m', '-c']: return len(arguments) >= 2
+	return not str(arguments[0]).startswith('-')
+
+def _getStartupEnvirons(environs):
+	# the environment variables that affect how the interpreter starts up, so cannot be changed for each child
+	return tuple(sorted((k, v) for k, v in environs.items() if k.startswith(('PYTHON', 'LC_')) or k in [
+		'LANG', 'LD_LIBRARY_PATH', 'DYLD_LIBRARY_PATH', 'DYLD_FALLBACK_LIBRARY_PATH']))
+
+class PythonWorkerProcessImpl(pysys.process.helper.ProcessImpl):
+	"""
+	A Python process that is executed by forking a Python worker server rather than by starting a new interpreter.
+
+	Has the same behaviour as `pysys.process.helper.ProcessImpl` (including the exit status, ``stop()``, ``write()``
+	and timeouts) except that the interpreter startup options cannot be specified, and the process is not a child of
+	this process. The command must be ``sys.executable``.
+	"""
+	def __init__(self, **kwargs):
+		pysys.process.helper.ProcessImpl.__init__(self, **kwargs)
+		self._workerExitStatus = None # set by the worker pool when the server reports that the process has terminated
+
+	def startBackgroundProcess(self):
+		stdin_r, stdin_w = os.pipe()
+		capturePipes = {path: os.pipe() for path in self._capturedOutputs}
+		childFds = [stdin_r]
+		try:
+			for path in [self.stdout, self.stderr]:
+				childFds.append(capturePipes[path][1] if path in capturePipes else os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC))
+
+			# the pool's wait method has the same signature as the ProcessReaper used for other processes
+			self._reaper = PythonWorkerPool.getInstance()
+			self.pid = self._reaper.start(self, childFds)
+		except BaseException:
+			os.close(stdin_w)
+			for capture_r, capture_w in capturePipes.values(): os.close(capture_r)
+			raise
+		finally:
+			for fd in set(childFds): os.close(fd)
+			for capture_r, capture_w in capturePipes.values():
+				if capture_w not in childFds: os.close(capture_w)
+
+		self._stdin = stdin_w
+		for path, (capture_r, capture_w) in capturePipes.items():
+			self._capturedOutputs[path].register()
+			OutputReader.getInstance().register(capture_r, self._capturedOutputs[path])
+
+	def _pollExitStatus(self):
+		return self._workerExitStatus
+
+class PythonWorkerPool(object):
+	"""
+	Manages the Python worker servers used by this process, and provides a ``wait`` method for their child processes.
+
+	Use `getInstance` rather than constructing this directly.
+	"""
+
+	MAX_IDLE_SERVERS = 4
+	"""The maximum number of servers to keep running when they have no running child processes."""
+
+	START_TIMEOUT_SECS = 60.0
+
+	__instance = None
+	__instanceLock = threading.Lock()
+
+	@staticmethod
+	def getInstance():
+		"""
+		Returns the pool for this process.
+		"""
+		instance = PythonWorkerPool.__instance
+		if instance is not None: return instance
+		with PythonWorkerPool.__instanceLock:
+			if PythonWorkerPool.__instance is None: PythonWorkerPool.__instance = PythonWorkerPool()
+			return PythonWorkerPool.__instance
+
+	@staticmethod
+	def _resetAfterFork():
+		PythonWorkerPool.__instance = None
+		PythonWorkerPool.__instanceLock = threading.Lock()
+
+	def __init__(self):
+		self.__condition = threading.Condition() # notified when a process terminates
+		self.__serversLock = threading.Lock()
+		self.__servers = collections.OrderedDict() # key=startup environs, value=_WorkerServer; least recently used first
+		self.isAborting = False
+
+	def start(self, process, fds):
+		"""
+		Starts the specified process in a worker server.
+
+		:param PythonWorkerProcessImpl process: The process.
+		:param list[int] fds: The stdin, stdout and stderr file descriptors for the process, which are not closed by
+			this method.
+		:return: The pid of the new process.
+		:raises pysys.exceptions.ProcessError: If the process could not be started.
+		"""
+		key = _getStartupEnvirons(process.environs)
+		with self.__serversLock:
+			server = self.__servers.pop(key, None)
+			if server is None or server.isClosed:
+				server = _WorkerServer(self, process.environs)
+				log.debug('Started Python worker server %s for %s', server, process)
+			self.__servers[key] = server
+
+			idle = [k for k, s in self.__servers.items() if s.isIdle() and k != key]
+			for k in idle[:max(0, len(idle)-self.MAX_IDLE_SERVERS+1)]:
+				self.__servers.pop(k).close()
+		return server.start(process, fds)
+
+	def wait(self, processes, timeout, abortable=True):
+		"""
+		Blocks until all of the specified processes have terminated, the timeout expires, or (if abortable) the
+		runner starts aborting.
+
+		:return: True if all the processes have terminated.
+		"""
+		with self.__condition:
+			return self.__condition.wait_for(lambda: all(p._workerExitStatus is not None for p in processes) or (
+				abortable and self.isAborting), timeout) and all(p._workerExitStatus is not None for p in processes)
+
+	def _setExitStatus(self, process, exitStatus):
+		with self.__condition:
+			process._workerExitStatus = exitStatus
+			self.__condition.notify_all()
+
+	def _setAborting(self):
+		with self.__condition:
+			self.isAborting = True
+			self.__condition.notify_all()
+
+class _WorkerServer(object):
+	"""
+	A running Python worker server process, and a thread that reads its responses.
+	"""
+	def __init__(self, pool, environs):
+		self.__pool = pool
+		self.__lock = threading.Lock()
+		self.__nextId = 0
+		self.__starting = {} # key=request id, value=[Event, pid or error message]
+		self.__running = {} # key=request id, value=process
+		self.isClosed = False
+
+		self.__sock, serverSock = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+		try:
+			with process_lock:
+				# use a new session so that the server isn't killed by a Ctrl+C intended for PySys before it has
+				# reported the exit status of its children
+				self.__server = subprocess.Popen([sys.executable, '-c', SERVER_BOOTSTRAP, SERVER_SCRIPT, str(serverSock.fileno())],
+					env=environs, pass_fds=[serverSock.fileno()], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+					stderr=subprocess.DEVNULL, start_new_session=True)
+		except Exception:
+			self.__sock.close()
+			raise
+		finally:
+			serverSock.close()
+
+		self.__sock.settimeout(PythonWorkerPool.START_TIMEOUT_SECS)
+		try:
+			ready = self.__receive()
+			if not ready or 'ready' not in ready: raise ProcessError('Python worker server failed to start')
+		except Exception:
+			self.__sock.close()
+			self.__server.kill()
+			self.__server.wait()
+			raise
+		self.__sock.settimeout(None)
+		self.__pid = ready['ready']
+
+		self.__thread = threading.Thread(target=self.__run, name='pysys.pythonworker_%s'%self.__pid, daemon=True)
+		self.__thread.start()
+
+	def __str__(self): return 'pid %s'%self.__pid
+
+	def isIdle(self):
+		with self.__lock:
+			return not self.__starting and not self.__running
+
+	def close(self):
+		"""
+		Closes the connection to the server, causing it to terminate. Should only be called when it is idle.
+		"""
+		self.isClosed = True
+		try:
+			self.__sock.shutdown(socket.SHUT_RDWR)
+		except OSError: # pragma: no cover
+			pass
+
+	def start(self, process, fds):
+		starting = [threading.Event(), None]
+		with self.__lock:
+			if self.isClosed: raise ProcessError('Python worker server has terminated')
+			self.__nextId += 1
+			requestId = self.__nextId
+			self.__starting[requestId] = starting
+			self.__running[requestId] = process
+			request = json.dumps({'id': requestId, 'arguments': process.arguments, 'workingDir': process.workingDir,
+				'environs': process.environs,
+				'newProcessGroup': not pysys.process.helper.PYSYS_DISABLE_PROCESS_GROUP_CLEANUP}).encode('utf-8')
+			try:
+				socket.send_fds(self.__sock, [struct.pack('>I', len(request))], fds)
+				self.__sock.sendall(request)
+			except Exception as ex:
+				del self.__starting[requestId], self.__running[requestId]
+				raise ProcessError('Failed to send request to Python worker server: %s'%ex)
+
+		if not starting[0].wait(PythonWorkerPool.START_TIMEOUT_SECS):
+			raise ProcessError('Python worker server did not start the process within %d seconds'%PythonWorkerPool.START_TIMEOUT_SECS)
+		if not isinstance(starting[1], int):
+			raise ProcessError('Python worker server failed to start the process: %s'%starting[1])
+		return starting[1]
+
+	def __receive(self):
+		header = self.__receiveExactly(4)
+		if header is None: return None
+		data = self.__receiveExactly(struct.unpack('>I', header)[0])
+		if data is None: return None
+		return json.loads(data.decode('utf-8'))
+
+	def __receiveExactly(self, length):
+		data = b''
+		while len(data) < length:
+			chunk = self.__sock.recv(length-len(data))
+			if not chunk: return None
+			data += chunk
+		return data
+
+	def __run(self):
+		selector = selectors.DefaultSelector()
+		selector.register(self.__sock, selectors.EVENT_READ)
+		abortHandle = processuser.ProcessUser.isRunnerAbortingHandle
+		if abortHandle is not None: selector.register(abortHandle, selectors.EVENT_READ)
+		try:
+			while True:
+				events = selector.select()
+				if any(key.fd == abortHandle for key, mask in events):
+					selector.unregister(abortHandle) # it stays readable forever, and we only need to know once
+					self.__pool._setAborting()
+					if len(events) == 1: continue
+
+				message = self.__receive()
+				if message is None: break
+				with self.__lock:
+					if 'exitStatus' in message:
+						process = self.__running.pop(message['id'])
+					else:
+						process, starting = None, self.__starting.pop(message['id'])
+						if 'error' in message: del self.__running[message['id']]
+				if process is not None:
+					self.__pool._setExitStatus(process, message['exitStatus'])
+				else:
+					starting[1] = message.get('pid', message.get('error'))
+					starting[0].set()
+		except Exception as ex: # pragma: no cover
+			log.debug('Python worker server %s connection failed: %r', self, ex)
+		finally:
+			selector.close()
+			self.isClosed = True
+			self.__sock.close()
+			with self.__lock:
+				starting, self.__starting = self.__starting, {}
+				running, self.__running = self.__running, {}
+			for s in starting.values():
+				s[1] = 'the server terminated'
+				s[0].set()
+			for requestId, process in running.items():
+				if requestId in starting: continue
+				# since the exit status can no longer be reported, make sure it doesn't keep running
+				log.warning('Python worker server terminated unexpectedly while running %s', process)
+				try:
+					os.killpg(process.pid, signal.SIGKILL)
+				except Exception:
+					pass
+				self.__pool._setExitStatus(process, -1)
+			self.__server.wait()
+
+if hasattr(os, 'register_at_fork'):
+	os.register_at_fork(after_in_child=PythonWorkerPool._resetAfterFork)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# PySys System Test Framework, Copyright (C) 2006-2023 M.B. Grieve
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+
+"""
+Non-public API - for internal use only, may change at any time.
+
+The main program of a Python worker server, which is started by `pysys.internal.pythonworkers` and forks a new
+child process to execute each Python script or module it is sent, so that the child starts with an
+already-initialized interpreter (and commonly used modules already imported) instead of paying the full cost of
+starting a new one.
+
+This file is executed (not imported) by the server process, so must not import anything beyond the Python standard
+library, and must not be on the ``sys.path`` of the scripts it executes.
+
+The server communicates with PySys over a Unix domain socket, using messages consisting of a 4-byte big-endian
+length followed by a JSON object. Each request is sent with the stdin, stdout and stderr file descriptors for the
+child process. For each request the server replies with the pid of the child (or an error), and then with its exit
+status once it has terminated.
+"""
+
+import os, sys, json, signal, socket, struct, selectors, traceback
+
+PRELOAD_MODULES = ['atexit', 'runpy', 'types', 'threading', 'io', 're', 'json', 'collections', 'argparse', 'logging',
+	'subprocess', 'shutil', 'tempfile', 'datetime', 'unittest', 'doctest', 'coverage']
+"""Modules that are imported by the server, if available, so that scripts using them start faster."""
+
+def _receiveExactly(sock, length):
+	data = b''
+	while len(data) < length:
+		chunk = sock.recv(length-len(data))
+		if not chunk: return None
+		data += chunk
+	return data
+
+def _send(sock, message):
+	data = json.dumps(message).encode('utf-8')
+	sock.sendall(struct.pack('>I', len(data))+data)
+
+def _receiveRequest(sock):
+	header, fds, flags, addr = socket.recv_fds(sock, 4, 3)
+	if len(header) < 4:
+		if header:
+			rest = _receiveExactly(sock, 4-len(header))
+			if rest is not None: header += rest
+		if len(header) < 4: # the PySys process has closed the socket
+			for fd in fds: os.close(fd)
+			return None, []
+	data = _receiveExactly(sock, struct.unpack('>I', header)[0])
+	if data is None:
+		for fd in fds: os.close(fd)
+		return None, []
+	return json.loads(data.decode('utf-8')), fds
+
+def _getExitStatus(status):
+	# the same conversion as the Unix ProcessImpl
+	if os.WIFEXITED(status): return os.WEXITSTATUS(status)
+	if os.WIFSIGNALED(status): return os.WTERMSIG(status)
+	return status
+
+def main(sockFd):
+	for module in PRELOAD_MODULES:
+		try:
+			__import__(module)
+		except Exception:
+			pass
+	import atexit, runpy, threading, types
+
+	sock = socket.socket(fileno=sockFd)
+	wakeupRead, wakeupWrite = os.pipe()
+	os.set_blocking(wakeupRead, False)
+	os.set_blocking(wakeupWrite, False)
+	signal.signal(signal.SIGCHLD, lambda sig, frame: None) # just to wake up the selector, via the wakeup fd
+	signal.set_wakeup_fd(wakeupWrite)
+	selector = selectors.DefaultSelector()
+	selector.register(sock, selectors.EVENT_READ)
+	selector.register(wakeupRead, selectors.EVENT_READ)
+
+	# the path of a script is added to the start of the sys.path when it is executed
+	basePath = sys.path[1:] if sys.path and sys.path[0] == '' else list(sys.path)
+
+	def executeRequest(request, fds): # runs in the child process, and never returns
+		status = 1
+		try:
+			try:
+				selector.close()
+				sock.close()
+				signal.set_wakeup_fd(-1)
+				os.close(wakeupRead)
+				os.close(wakeupWrite)
+				signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+				signal.signal(signal.SIGINT, signal.default_int_handler)
+
+				if request['newProcessGroup']: os.setpgrp()
+				for i, fd in enumerate(fds): os.dup2(fd, i)
+				for fd in fds: os.close(fd)
+				os.chdir(request['workingDir'])
+				os.environ.clear()
+				os.environ.update(request['environs'])
+			except Exception as ex:
+				sys.stderr.write('Failed with: %s\n'%ex)
+				status = os.EX_OSERR
+				return
+
+			args = request['arguments']
+			try:
+				if args[0] == '-m':
+					sys.argv = args[1:]
+					sys.path[:] = [os.getcwd()]+basePath
+					runpy.run_module(args[1], run_name='__main__', alter_sys=True)
+				elif args[0] == '-c':
+					sys.argv = ['-c']+args[2:]
+					sys.path[:] = ['']+basePath
+					mainModule = types.ModuleType('__main__')
+					sys.modules['__main__'] = mainModule
+					exec(compile(args[1], '<string>', 'exec'), mainModule.__dict__)
+				else:
+					sys.argv = list(args)
+					sys.path[:] = [os.path.dirname(os.path.abspath(args[0]))]+basePath
+					runpy.run_path(args[0], run_name='__main__')
+				status = 0
+			except SystemExit as ex:
+				if ex.code is None:
+					status = 0
+				elif isinstance(ex.code, int):
+					status = ex.code & 0xff
+				else:
+					sys.stderr.write('%s\n'%ex.code)
+					status = 1
+			except KeyboardInterrupt:
+				sys.stderr.flush()
+				signal.signal(signal.SIGINT, signal.SIG_DFL)
+				os.kill(os.getpid(), signal.SIGINT)
+			except BaseException:
+				sys.excepthook(*sys.exc_info())
+				status = 1
+
+			# as the interpreter would on exit
+			for t in threading.enumerate():
+				if t is not threading.main_thread() and not t.daemon: t.join()
+			atexit._run_exitfuncs()
+		except BaseException: # pragma: no cover
+			traceback.print_exc()
+		finally:
+			try:
+				sys.stdout.flush()
+				sys.stderr.flush()
+			finally:
+				os._exit(status)
+
+	children = {} # key=pid, value=request id
+	_send(sock, {'ready': os.getpid()})
+	while True:
+		for key, mask in selector.select():
+			if key.fileobj == wakeupRead:
+				try:
+					while os.read(wakeupRead, 1024): pass
+				except BlockingIOError:
+					pass
+				continue
+
+			request, fds = _receiveRequest(sock)
+			if request is None: # the PySys process has finished with this server
+				return
+			try:
+				sys.stdout.flush()
+				sys.stderr.flush()
+				pid = os.fork()
+				if pid == 0: executeRequest(request, fds) # does not return
+				children[pid] = request['id']
+				_send(sock, {'id': request['id'], 'pid': pid})
+			except Exception as ex:
+				_send(sock, {'id': request['id'], 'error': '%s: %s'%(type(ex).__name__, ex)})
+			finally:
+				for fd in fds: os.close(fd)
+
+		while children: # check for any children that have terminated
+			try:
+				pid, status = os.waitpid(-1, os.WNOHANG)
+			except ChildProcessError: # pragma: no cover
+				break
+			if pid == 0: break
+			_send(sock, {'id': children.pop(pid), 'exitStatus': _getExitStatus(status)})
+
+if __name__ == '__pysys_worker_server__':
+	main(int(sys.argv[2]))
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# PySys System Test Framework, Copyright (C) 2006-2023 M.B. Grieve
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+
+"""
+Non-public API - for internal use only, may change at any time.
+
+Implements ``pysys server``, a long-lived process that makes ``pysys run`` start much faster, and the client used by
+``pysys run`` to send it requests when the ``PYSYS_SERVER`` environment variable is set.
+
+The server imports PySys and the project's Python modules (runner, writers, plugins etc) once, and keeps the
+descriptor index (if configured) loaded in memory. For each request it forks a child process which inherits all of this
+state, and runs the requested command with the client's arguments, working directory and environment. The client
+passes its stdin, stdout and stderr file descriptors over the Unix domain socket, so the child's output goes directly
+to the client's terminal (or wherever the client's output is redirected). Since every request is handled in a fresh
+child process, requests are isolated from each other in the same way as separate ``pysys run`` processes.
+
+This module must not import anything beyond the Python standard library at module level, so that the client starts
+quickly.
+"""
+
+import os, sys, json, signal, socket, struct
+
+MAX_REQUEST_BYTES = 16*1024*1024
+
+def runClient(socketPath, args):
+	"""
+	Executes ``pysys`` with the specified command line arguments in the server listening on the specified socket.
+
+	:return: The exit status, or None if the server is not running (in which case the caller should execute the
+		command itself).
+	"""
+	sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+	try:
+		sock.connect(socketPath)
+	except OSError:
+		sock.close()
+		return None
+
+	with sock:
+		request = json.dumps({'args': args, 'argv0': sys.argv[0], 'cwd': os.getcwd(), 'env': dict(os.environ)}).encode('utf-8')
+		socket.send_fds(sock, [struct.pack('>I', len(request))+request], [0, 1, 2])
+
+		# the server sends one JSON object per line: first the pid of the child process, then the exit status
+		with sock.makefile('r', encoding='utf-8') as responses:
+			pid = json.loads(responses.readline() or 'null')
+			if pid is None:
+				sys.stderr.write('\nPYSYS FATAL ERROR: The PySys server at %s failed to start the command\n'%socketPath)
+				return 10
+
+			# since the child process is not in our process group, pass on any Ctrl+C/termination request
+			def forwardSignal(sig, frame):
+				try:
+					os.kill(pid, sig)
+				except OSError:
+					pass
+			for sig in [signal.SIGINT, signal.SIGTERM]: signal.signal(sig, forwardSignal)
+
+			exitStatus = json.loads(responses.readline() or 'null')
+		if exitStatus is None:
+			sys.stderr.write('\nPYSYS FATAL ERROR: The PySys server process executing this command terminated unexpectedly\n')
+			return 10
+		return exitStatus
+
+def serve(socketPath, prepare):
+	"""
+	Listens for requests on the specified socket until this process is terminated.
+
+	:param str socketPath: The path of the Unix domain socket to create.
+	:param callable[bool] prepare: A function that loads anything that should be shared with the child processes that
+		execute requests, or refreshes it if out of date. It is called before accepting requests, whenever the server
+		is idle, and after forking each child (with True as the argument), so that it is not on the critical path for
+		executing the next request.
+	"""
+	import logging
+	log = logging.getLogger('pysys.server')
+
+	if os.path.exists(socketPath): # remove it if it's left over from a previous server, but not if it's in use
+		probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		try:
+			probe.connect(socketPath)
+		except OSError:
+			os.remove(socketPath)
+		else:
+			probe.close()
+			raise Exception('Another PySys server is already listening on %s'%socketPath)
+
+	server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+	server.bind(socketPath)
+	server.listen(32)
+	server.settimeout(1.0) # so we can regularly reap child processes that have completed, and refresh
+	children = set()
+	signal.signal(signal.SIGTERM, lambda sig, frame: sys.exit(0)) # so the socket file is removed
+	try:
+		prepare(False)
+		log.info('PySys server is listening on %s (set PYSYS_SERVER to this path to use it; press Ctrl+C to stop)', socketPath)
+		while True:
+			try:
+				conn, _ = server.accept()
+			except socket.timeout:
+				conn = None
+			while children: # reap completed child processes
+				pid, status = os.waitpid(-1, os.WNOHANG)
+				if pid == 0: break
+				children.discard(pid)
+			if conn is None:
+				prepare(False)
+				continue
+
+			with conn:
+				try:
+					request, fds = _receiveRequest(conn)
+				except Exception as ex:
+					log.warning('Ignoring invalid request: %r', ex)
+					continue
+				try:
+					pid = os.fork()
+					if pid == 0:
+						server.close()
+						_executeRequest(conn, request, fds) # does not return
+					children.add(pid)
+				finally:
+					for fd in fds: os.close(fd)
+			prepare(True)
+	finally:
+		server.close()
+		if os.path.exists(socketPath): os.remove(socketPath)
+
+def _receiveRequest(conn):
+	conn.settimeout(10.0)
+	data, fds, flags, addr = socket.recv_fds(conn, 64*1024, 3)
+	try:
+		if len(fds) != 3: raise Exception('Expected 3 file descriptors but got %d'%len(fds))
+		if len(data) < 4: raise Exception('Truncated request')
+		length = struct.unpack('>I', data[:4])[0]
+		if length > MAX_REQUEST_BYTES: raise Exception('Request is too large')
+		data = data[4:]
+		while len(data) < length:
+			chunk = conn.recv(length-len(data))
+			if not chunk: raise Exception('Truncated request')
+			data += chunk
+		return json.loads(data.decode('utf-8')), fds
+	except Exception:
+		for fd in fds: os.close(fd)
+		raise
+
+def _executeRequest(conn, request, fds):
+	exitStatus = 10
+	try:
+		conn.settimeout(None)
+		for i, fd in enumerate(fds): os.dup2(fd, i)
+		for fd in fds: os.close(fd)
+		# the server's stdout may not be a terminal even if the client's is
+		sys.stdout.reconfigure(line_buffering=sys.stdout.isatty())
+
+		os.chdir(request['cwd'])
+		os.environ.clear()
+		os.environ.update(request['env'])
+		sys.argv = [request['argv0']]+request['args']
+		signal.signal(signal.SIGINT, signal.default_int_handler)
+		signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+		conn.sendall(json.dumps(os.getpid()).encode('utf-8')+b'\n')
+		try:
+			import pysys.launcher.console
+			pysys.launcher.console.main(request['args'])
+			exitStatus = 0
+		except SystemExit as ex:
+			exitStatus = ex.code if isinstance(ex.code, int) else (0 if ex.code is None else 1)
+			if not isinstance(ex.code, (int, type(None))): sys.stderr.write('%s\n'%ex.code)
+		except KeyboardInterrupt:
+			exitStatus = 130
+	except BaseException:
+		import traceback
+		traceback.print_exc()
+	finally:
+		try:
+			sys.stdout.flush()
+			sys.stderr.flush()
+			conn.sendall(json.dumps(exitStatus).encode('utf-8')+b'\n')
+		finally:
+			os._exit(0)
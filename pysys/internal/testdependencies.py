@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+# PySys System Test Framework, Copyright (C) 2006-2023 M.B. Grieve
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+
+"""
+Non-public API - for internal use only, may change at any time.
+
+Selection of the tests affected by a set of changed files (``pysys run --changed-since`` and ``--changed-files``),
+and the persistent map of the files outside its own directory that each test depends on (see the
+``testDependenciesFile`` project property).
+"""
+
+import os, sys, json, types, inspect, logging, threading, subprocess
+
+import pysys
+from pysys.exceptions import UserError
+from pysys.utils.fileutils import mkdir, fromLongPathSafe
+
+log = logging.getLogger('pysys.testdependencies')
+
+DIR_CONFIG_DESCRIPTOR = 'pysysdirconfig.xml'
+
+class TestDependencyMap(object):
+	"""
+	Persistent record of the files outside its own test directory that each test used in previous runs: the Python
+	modules used by the test class (e.g. shared base classes and helpers, and test plugins), and any files or
+	directories it copied from outside the test directory.
+
+	The map is stored in a JSON file, with paths relative to the directory containing the file where possible so that
+	it can be shared between machines and checkouts. Dependencies are recorded per test rather than per mode, as the
+	union of the dependencies in all modes executed by the latest run.
+
+	This class is thread-safe.
+
+	:param str path: The JSON file to load from and save to (which need not exist yet).
+	"""
+
+	FORMAT_VERSION = 1
+
+	def __init__(self, path):
+		self.path = path
+		self.__baseDir = os.path.dirname(path)
+		self.__lock = threading.Lock()
+		self.__dependencies = {} # key=test id (without mode), value=set of normalized absolute paths
+		self.__recordedThisRun = set()
+		self.__changed = False
+		if os.path.exists(path):
+			try:
+				with open(path, 'r', encoding='utf-8') as f:
+					data = json.load(f)
+				if data.get('formatVersion') == self.FORMAT_VERSION:
+					self.__dependencies = {k: {os.path.normpath(os.path.join(self.__baseDir, p)) for p in v}
+						for k, v in data['tests'].items()}
+			except Exception as ex: # it's only an optimization so don't make this fatal
+				log.warning('Ignoring test dependencies file %s which could not be read: %s', path, ex)
+
+	def __len__(self): return len(self.__dependencies)
+
+	def getDependencies(self, descriptor):
+		"""
+		Returns the set of absolute paths this test depended on when it was last executed, or None if it has not
+		been executed since the map was enabled.
+
+		:param pysys.config.descriptor.TestDescriptor descriptor: The test.
+		"""
+		return self.__dependencies.get(descriptor.idWithoutMode)
+
+	def record(self, descriptor, paths):
+		"""
+		Records the dependencies of a test that has just completed, replacing any from previous runs.
+
+		:param pysys.config.descriptor.TestDescriptor descriptor: The test.
+		:param set[str] paths: The absolute paths of the files and directories it depends on.
+		"""
+		with self.__lock:
+			key = descriptor.idWithoutMode
+			if key not in self.__recordedThisRun: # replace, rather than merging with the previous run
+				self.__recordedThisRun.add(key)
+				self.__dependencies[key] = set()
+			if not paths.issubset(self.__dependencies[key]):
+				self.__dependencies[key].update(paths)
+			self.__changed = True
+
+	def save(self):
+		"""
+		Writes the map to its file, if anything has changed.
+		"""
+		with self.__lock:
+			if not self.__changed: return
+			self.__changed = False
+			tests = {}
+			for k, paths in sorted(self.__dependencies.items()):
+				tests[k] = sorted(self.__relpath(p) for p in paths)
+		mkdir(os.path.dirname(self.path))
+		tmp = '%s.%d.tmp'%(self.path, os.getpid())
+		with open(tmp, 'w', encoding='utf-8') as f:
+			json.dump({'formatVersion': self.FORMAT_VERSION, 'tests': tests}, f, indent=1)
+		os.replace(tmp, self.path) # atomic, in case several processes are using it
+
+	def __relpath(self, path):
+		try:
+			return os.path.relpath(path, self.__baseDir).replace(os.sep, '/')
+		except ValueError: # e.g. on a different Windows drive
+			return path
+
+def getTestDependencies(testObj):
+	"""
+	Returns the set of files and directories outside the test (and output) directory that the specified test
+	depends on.
+
+	This includes the source files of the modules used by the test class (including its base classes, and anything
+	imported by the modules that define them), the test plugins, and any files copied using
+	`pysys.process.user.ProcessUser.copy` from outside the test directory. Modules from the Python installation and
+	PySys itself are ignored.
+
+	:param pysys.basetest.BaseTest testObj: The test, after it has been executed.
+	"""
+	testDir = os.path.normpath(testObj.descriptor.testDir)+os.sep
+	ignoredDirs = tuple({os.path.normpath(p)+os.sep for p in [sys.prefix, sys.base_prefix, sys.exec_prefix,
+		os.path.dirname(pysys.__file__)]})+(testDir,)
+	result = set()
+
+	def addFile(path):
+		if not path: return
+		path = os.path.normpath(os.path.abspath(fromLongPathSafe(path)))
+		if not path.startswith(ignoredDirs): result.add(path)
+
+	def addModuleOf(obj):
+		module = obj if isinstance(obj, types.ModuleType) else sys.modules.get(getattr(obj, '__module__', None) or '')
+		f = getattr(module, '__file__', None)
+		if f and f.endswith('.py'): addFile(f)
+
+	# the classes of the test and its plugins, and the modules that define them; since test modules are not imported
+	# in the usual way, find their namespace from the globals of the methods defined in each class
+	namespaces = {}
+	for cls in [c for obj in [testObj]+list(getattr(testObj, 'testPlugins', [])) for c in type(obj).__mro__]:
+		addModuleOf(cls)
+		for member in vars(cls).values():
+			if inspect.isfunction(member): namespaces[id(member.__globals__)] = member.__globals__
+	for namespace in namespaces.values():
+		addFile(namespace.get('__file__'))
+		for value in list(namespace.values()):
+			if isinstance(value, types.ModuleType) or inspect.isclass(value) or inspect.isfunction(value):
+				addModuleOf(value)
+
+	output = os.path.normpath(testObj.output)+os.sep
+	for path in getattr(testObj, '_copiedSources', []):
+		path = os.path.normpath(fromLongPathSafe(path))
+		if not (path+os.sep).startswith(output): addFile(path)
+	return result
+
+def getChangedFilesFromGit(ref, dir):
+	"""
+	Returns the absolute paths of the files changed since the specified git ref, which includes committed changes
+	since the point where the current branch diverged from the ref (the merge base), uncommitted changes to tracked
+	files, and untracked files (unless they are ignored).
+
+	:param str ref: A git commit, branch or tag, for example ``origin/main``.
+	:param str dir: A directory inside the git repository.
+	:raises UserError: If git fails, for example because the ref does not exist.
+	"""
+	def git(*args, cwd=dir):
+		try:
+			result = subprocess.run(['git']+list(args), cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+		except OSError as ex:
+			raise UserError('Cannot execute git to find changed files: %s'%ex)
+		if result.returncode != 0:
+			raise UserError('Cannot find files changed since "%s" as "git %s" failed: %s'%(ref, ' '.join(args),
+				result.stderr.decode('utf-8', errors='replace').strip()))
+		return result.stdout.decode('utf-8', errors='replace')
+
+	toplevel = git('rev-parse', '--show-toplevel').strip()
+	base = git('merge-base', ref, 'HEAD', cwd=toplevel).strip()
+	changed = git('diff', '--name-only', '--no-renames', '-z', base, '--', cwd=toplevel).split('\0')
+	changed += git('ls-files', '--others', '--exclude-standard', '--full-name', '-z', cwd=toplevel).split('\0')
+	return {os.path.normpath(os.path.join(toplevel, f)) for f in changed if f}
+
+def getChangedFilesFromList(path, dir):
+	"""
+	Returns the absolute paths of the changed files listed in the specified file, one per line. Relative paths are
+	resolved against the specified directory.
+
+	:param str path: The file containing the list, or ``-`` to read from stdin.
+	:param str dir: The directory relative paths are relative to (typically the current working directory).
+	"""
+	if path == '-':
+		lines = sys.stdin.read().splitlines()
+	else:
+		try:
+			with open(os.path.join(dir, path), 'r', encoding='utf-8') as f:
+				lines = f.read().splitlines()
+		except OSError as ex:
+			raise UserError('Cannot read the list of changed files: %s'%ex)
+	return {os.path.normpath(os.path.join(dir, line.strip())) for line in lines if line.strip()}
+
+def selectChangedTests(descriptors, changedFiles, project, dependencyMap=None):
+	"""
+	Returns the subset of the specified descriptors for tests that are affected by any of the changed files.
+
+	A test is affected if a changed file is in its test directory (other than the output directory), its input or
+	reference directory, a ``pysysdirconfig.xml`` in a parent directory, or is one of the dependencies recorded for
+	it in the dependency map. Changes to the project file affect all tests. Tests that have no recorded dependencies
+	are also selected if any changed file is under the project directory but not inside any test directory, since that
+	file could be a shared module or input file they use.
+
+	:param list[pysys.config.descriptor.TestDescriptor] descriptors: The candidate tests, in the order to return them.
+	:param set[str] changedFiles: The normalized absolute paths of the changed files.
+	:param pysys.config.project.Project project: The project.
+	:param TestDependencyMap dependencyMap: The recorded dependencies, or None if not available.
+	"""
+	if not changedFiles: return []
+	if project.projectFile and os.path.normpath(project.projectFile) in changedFiles:
+		log.info('Selected all tests since the project file has changed')
+		return list(descriptors)
+
+	def isUnder(path, dirs): return (path+os.sep).startswith(dirs)
+
+	projectDir = os.path.normpath(os.path.dirname(project.projectFile) if project.projectFile else project.testRootDir)
+	testDirs = {}
+	for d in descriptors:
+		testDir = os.path.normpath(d.testDir)
+		if testDir in testDirs: continue
+		# inputs are often in the test dir, but may be shared between tests
+		dirs = {testDir}|{os.path.normpath(os.path.join(testDir, x)) for x in [d.input, d.reference] if x}
+		dirconfigs = set()
+		parent = os.path.dirname(testDir)
+		while isUnder(parent, (projectDir+os.sep,)):
+			dirconfigs.add(os.path.join(parent, DIR_CONFIG_DESCRIPTOR))
+			parent = os.path.dirname(parent)
+		testDirs[testDir] = (tuple(x+os.sep for x in dirs), dirconfigs, os.path.normpath(os.path.join(testDir, d.output))+os.sep)
+
+	allTestDirs = tuple(x for (dirs, dirconfigs, output) in testDirs.values() for x in dirs)
+	sharedChanges = any(isUnder(f, (projectDir+os.sep,)) and not isUnder(f, allTestDirs) for f in changedFiles)
+
+	result, unknown = [], 0
+	for d in descriptors:
+		dirs, dirconfigs, output = testDirs[os.path.normpath(d.testDir)]
+		dependencies = dependencyMap.getDependencies(d) if dependencyMap is not None else None
+		if dependencies is None:
+			unknown += 1
+			if sharedChanges:
+				result.append(d)
+				continue
+		dependencies = tuple(p+os.sep for p in (dependencies or []))
+		if any((isUnder(f, dirs) and not isUnder(f, (output,))) or f in dirconfigs or isUnder(f, dependencies)
+				for f in changedFiles):
+			result.append(d)
+	log.info('Selected %d of %d tests affected by %d changed files%s', len(result), len(descriptors), len(changedFiles),
+		'' if not unknown else ' (%d tests have no recorded dependencies%s)'%(unknown, '' if dependencyMap is not None else
+			'; set the testDependenciesFile project property to record them'))
+	return result
@@ -0,0 +1,330 @@
+#!/usr/bin/env python
+# PySys System Test Framework, Copyright (C) 2006-2023 M.B. Grieve
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+
+"""
+Non-public API - for internal use only, may change at any time.
+
+Test schedulers used by the `pysys.baserunner.BaseRunner` to decide which test each worker thread should execute next,
+and the persistent history of test durations used to make those decisions.
+"""
+
+import os, time, json, heapq, itertools, logging, statistics, threading
+import queue
+
+import pysys.utils.osutils
+
+log = logging.getLogger('pysys.scheduler')
+
+class TestDurationHistory(object):
+	"""
+	Persistent record of how long each test (and mode) took to execute in previous runs, used to predict how long
+	it will take next time.
+
+	Durations are stored in a JSON file, as an exponentially-weighted moving average so that a test which
+	has recently got faster or slower is quickly reflected in the predictions.
+
+	This class is thread-safe.
+
+	:param str path: The JSON file to load from and save to (which need not exist yet).
+	"""
+
+	FORMAT_VERSION = 1
+
+	SMOOTHING = 0.5
+	"""The weight given to the latest duration when updating the moving average. """
+
+	def __init__(self, path):
+		self.path = path
+		self.__lock = threading.Lock()
+		self.__durations = {} # key=test id (including mode), value=secs
+		self.__lastRun = {} # key=test id, value=time.time() when it was last recorded
+		self.__changed = False
+		self.__estimates = {}
+		if os.path.exists(path):
+			try:
+				with open(path, 'r', encoding='utf-8') as f:
+					data = json.load(f)
+				if data.get('formatVersion') == self.FORMAT_VERSION:
+					self.__durations = {k: float(v['duration']) for k, v in data['tests'].items()}
+					self.__lastRun = {k: v.get('lastRun', 0) for k, v in data['tests'].items()}
+			except Exception as ex: # it's only an optimization so don't make this fatal
+				log.warning('Ignoring test durations file %s which could not be read: %s', path, ex)
+
+	def __len__(self): return len(self.__durations)
+
+	def getDuration(self, descriptor):
+		"""
+		Returns the historical duration for this test in this mode, or None if it has not been executed before.
+
+		:param pysys.config.descriptor.TestDescriptor descriptor: The test.
+		"""
+		return self.__durations.get(descriptor.id)
+
+	def prepareEstimates(self, descriptors):
+		"""
+		Calculates the estimated durations for tests in this run that have not been executed before, so that they are
+		available from `estimateDuration`.
+
+		The estimate is the mean duration of the same test in other modes if available, otherwise the median of the 
+		known tests in the same parent directory (which are often similar), otherwise the median of all known tests.
+
+		:param list[pysys.config.descriptor.TestDescriptor] descriptors: The tests in this run.
+		"""
+		durations = self.__durations
+		byTest, byDir = {}, {}
+		for id, d in durations.items():
+			byTest.setdefault(id.split('~')[0], []).append(d)
+		for descriptor in descriptors:
+			d = durations.get(descriptor.id)
+			if d is not None: byDir.setdefault(os.path.dirname(descriptor.testDir), []).append(d)
+		byTest = {k: statistics.mean(v) for k, v in byTest.items()}
+		byDir = {k: statistics.median(v) for k, v in byDir.items()}
+		overall = statistics.median(durations.values()) if durations else 0.0
+
+		estimates = {}
+		for descriptor in descriptors:
+			if descriptor.id in durations: continue
+			d = byTest.get(descriptor.idWithoutMode)
+			if d is None: d = byDir.get(os.path.dirname(descriptor.testDir), overall)
+			estimates[descriptor.id] = d
+		self.__estimates = estimates
+
+	def estimateDuration(self, descriptor):
+		"""
+		Returns the expected duration of this test in seconds, which is the historical duration if known, 
+		or an estimate (see `prepareEstimates`) if not.
+
+		:param pysys.config.descriptor.TestDescriptor descriptor: The test.
+		:return: The expected duration in seconds, or 0.0 if there is no history at all.
+		"""
+		d = self.__durations.get(descriptor.id)
+		if d is not None: return d
+		return self.__estimates.get(descriptor.id, 0.0)
+
+	def record(self, descriptor, durationSecs):
+		"""
+		Records the duration of a test that has just completed.
+
+		:param pysys.config.descriptor.TestDescriptor descriptor: The test.
+		:param float durationSecs: The time taken to execute the test.
+		"""
+		with self.__lock:
+			previous = self.__durations.get(descriptor.id)
+			self.__durations[descriptor.id] = durationSecs if previous is None else (
+				self.SMOOTHING*durationSecs + (1-self.SMOOTHING)*previous)
+			self.__lastRun[descriptor.id] = round(time.time())
+			self.__changed = True
+
+	def merge(self, other):
+		"""
+		Merges in the durations from another history (for example from another machine that executed a different 
+		shard of the tests), using whichever of the two histories has recorded each test most recently. 
+
+		:param TestDurationHistory other: The history to merge from. 
+		"""
+		with self.__lock:
+			for k, d in other.__durations.items():
+				if k not in self.__durations or other.__lastRun.get(k, 0) > self.__lastRun.get(k, 0):
+					self.__durations[k] = d
+					self.__lastRun[k] = other.__lastRun.get(k, 0)
+					self.__changed = True
+
+	def save(self):
+		"""
+		Writes the durations to the file, if any have changed.
+
+		The file is replaced atomically so that concurrent readers never see a partially-written file.
+		"""
+		with self.__lock:
+			if not self.__changed: return
+			data = {'formatVersion':self.FORMAT_VERSION, 'tests':{k: {'duration':round(v, 3), 'lastRun':self.__lastRun.get(k, 0)} 
+				for k, v in sorted(self.__durations.items())}}
+			self.__changed = False
+		os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+		tmp = '%s.%d.tmp'%(self.path, os.getpid())
+		with open(tmp, 'w', encoding='utf-8') as f:
+			json.dump(data, f, indent='\t')
+		os.replace(tmp, self.path)
+
+def getDefaultResourceBudgets():
+	"""
+	Returns the resource budgets to use for scheduling tests if not overridden by the project; currently these are 
+	the usable CPUs, and the physical memory (if it can be determined on this platform). 
+	"""
+	budgets = {'cpus': float(pysys.utils.osutils.getUsableCPUCount())}
+	try:
+		budgets['memMB'] = float(os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // (1024*1024))
+	except (AttributeError, ValueError, OSError): # not available on Windows
+		pass
+	return budgets
+
+def selectShard(descriptors, shard, shardCount, history=None):
+	"""
+	Deterministically partitions the tests into the specified number of shards (for example to execute on different 
+	machines), and returns the tests in the specified shard. 
+
+	Shards are balanced so that each has a similar expected duration, by assigning each test (longest first) to the 
+	shard with the smallest total so far. If there is no history (or for tests with the same expected duration) the 
+	shards are balanced by the number of tests. The result is the same on every machine provided the same descriptors 
+	and the same history file are used. 
+
+	:param list[pysys.config.descriptor.TestDescriptor] descriptors: All the tests in the run, sorted in the order 
+		they would usually be executed. 
+	:param int shard: The shard to return, starting from 1. 
+	:param int shardCount: The total number of shards. 
+	:param TestDurationHistory history: Provides the expected duration of each test, or None. 
+	:return: The descriptors for this shard, in the same order as they were passed in. 
+	"""
+	assert 1 <= shard <= shardCount, (shard, shardCount)
+	if history is not None: history.prepareEstimates(descriptors)
+	expected = [history.estimateDuration(d) if history is not None else 0.0 for d in descriptors]
+
+	shards = [(0.0, 0, i) for i in range(shardCount)] # heap of (total expected duration, number of tests, shard index)
+	selected = set()
+	for i in sorted(range(len(descriptors)), key=lambda i: -expected[i]): # stable, so ties retain their original order
+		total, count, s = shards[0]
+		if s == shard-1: selected.add(i)
+		heapq.heapreplace(shards, (total+expected[i], count+1, s))
+	return [d for i, d in enumerate(descriptors) if i in selected]
+
+def predictMakespan(durations, workers):
+	"""
+	Predicts the total elapsed time to execute jobs with the specified durations using the specified number of workers,
+	assuming each job is started by the first worker to become free, in the order given.
+
+	:param list[float] durations: The duration of each job, in dispatch order.
+	:param int workers: The number of workers.
+	:return: The predicted elapsed time in seconds.
+	"""
+	loads = [0.0]*max(1, workers)
+	for d in durations:
+		heapq.heapreplace(loads, loads[0]+d)
+	return max(loads)
+
+class TestScheduler(queue.Queue):
+	"""
+	A queue of work requests that decides which test each worker thread should execute next. 
+
+	If a duration history is provided, the tests with the longest expected duration are dispatched first, which
+	minimizes the time at the end of a multi-threaded run when only a few long-running tests are still executing. 
+	Otherwise (and for tests with the same expected duration) tests are dispatched in the order they were put. 
+
+	If resource budgets are provided, a test is only dispatched when the resources it declares in its descriptor 
+	(see `pysys.config.descriptor.TestDescriptor.resources`) are available, i.e. when adding them to the resources of 
+	the tests already executing would not exceed the budget for any resource, and none of its ``exclusive`` mutexes 
+	are held. Any test that would not fit into the budget even on its own is permitted to execute once no other test is 
+	using the resources it is over budget for, so that it does not wait forever. Tests that do not fit are skipped 
+	over in favour of later tests that do, and `requestComplete` must be called when each request has been executed 
+	to release its resources. 
+
+	Each item must be a `pysys.utils.threadpool.WorkRequest` for a ``TestContainer``, or ``None`` (which is used to wake
+	up worker threads, so is returned before anything else). 
+
+	:param TestDurationHistory history: Provides the expected duration of each test, or None. 
+	:param dict[str,float] resourceBudgets: The total amount of each resource that may be used by concurrently 
+		executing tests, or None to ignore resources. Any resource not in this dictionary is unlimited. 
+	"""
+	def __init__(self, history=None, resourceBudgets=None):
+		self.history = history
+		self.resourceBudgets = resourceBudgets
+		self.__inUse = {} # resource name -> amount currently in use
+		self.__heldMutexes = set()
+		super().__init__()
+
+	def getExpectedDuration(self, request):
+		return 0.0 if self.history is None else self.history.estimateDuration(request.callable.descriptor)
+
+	def requestComplete(self, request):
+		"""
+		Called by the thread pool (from the worker thread) when a request returned by `get` has finished executing, 
+		to release its resources. 
+		"""
+		if not self.resourceBudgets or request is None: return
+		resources = request.callable.descriptor.resources
+		if not resources: return
+		with self.mutex:
+			for k, v in resources.items():
+				if k == 'exclusive':
+					self.__heldMutexes.difference_update(v)
+				elif k in self.resourceBudgets:
+					self.__inUse[k] = self.__inUse[k]-v
+			self.__unreserve() # since a higher priority item may fit now
+			self.not_empty.notify_all()
+
+	def __fits(self, resources):
+		for k, v in resources.items():
+			if k == 'exclusive':
+				if not self.__heldMutexes.isdisjoint(v): return False
+			elif k in self.resourceBudgets:
+				inUse = self.__inUse.get(k, 0)
+				if inUse > 0 and inUse+v > self.resourceBudgets[k]+1e-9: return False
+		return True
+
+	def __allocate(self, resources):
+		for k, v in resources.items():
+			if k == 'exclusive':
+				self.__heldMutexes.update(v)
+			elif k in self.resourceBudgets:
+				self.__inUse[k] = self.__inUse.get(k, 0)+v
+
+	def __findNext(self):
+		# Removes the highest priority entry that can be dispatched now from the heap and reserves it (until the next 
+		# _get or __unreserve), returning True if there is one. Entries that don't fit are popped into a side list 
+		# and pushed back afterwards, so this is cheap when the highest priority entries fit (the common case)
+		if self.__next is not None: return True
+		heap = self.queue
+		skipped = []
+		try:
+			while heap:
+				entry = heapq.heappop(heap)
+				if entry[-1] is None or self.__fits(entry[-1].callable.descriptor.resources):
+					self.__next = entry
+					return True
+				skipped.append(entry)
+			return False
+		finally:
+			for entry in skipped: heapq.heappush(heap, entry)
+
+	def __unreserve(self):
+		# Returns the entry reserved by __findNext to the heap, since it may no longer be the best choice
+		if self.__next is not None:
+			heapq.heappush(self.queue, self.__next)
+			self.__next = None
+
+	# Queue implementation methods, which are called with the queue's mutex held
+
+	def _init(self, maxsize):
+		self.queue = []
+		self.__next = None # an entry removed from the heap by __findNext, which will be returned by the next _get
+		self.__counter = itertools.count()
+
+	def _qsize(self):
+		# the number of items that could be returned by get() without blocking
+		if not self.resourceBudgets: return len(self.queue)
+		return len(self.queue)+1 if self.__findNext() else 0
+
+	def _put(self, item):
+		self.__unreserve()
+		heapq.heappush(self.queue, (float('-inf') if item is None else -self.getExpectedDuration(item), next(self.__counter), item))
+
+	def _get(self):
+		if not self.resourceBudgets: return heapq.heappop(self.queue)[-1]
+		found = self.__findNext()
+		assert found # since the Queue only calls this when _qsize() > 0
+		item, self.__next = self.__next[-1], None
+		if item is not None: self.__allocate(item.callable.descriptor.resources)
+		return item
@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# PySys System Test Framework, Copyright (C) 2006-2023 M.B. Grieve
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+
+"""
+Non-public API - for internal use only, may change at any time.
+
+Implements ``pysys run --watch``, which keeps the project, test descriptors and compiled test modules loaded in this
+process after the first run, and then re-runs just the tests whose files have changed.
+
+On Linux, inotify (see `pysys.utils.filewatch.TreeChangeWaiter`) is used to wake up when any watched file changes, 
+after which the modification time and size of each watched file are compared with a snapshot taken before waiting, to 
+find out which files changed. On other platforms (or if inotify is unavailable, e.g. because the limit on the number of 
+inotify watches has been reached) the snapshots are instead taken periodically, which works on any file system. Only 
+the files of the selected tests are watched. 
+"""
+
+import os, sys, time, signal, logging, subprocess
+
+import pysys.utils.allocport
+
+from pysys.constants import *
+from pysys.launcher import createDescriptors
+from pysys.utils.filewatch import TreeChangeWaiter
+
+log = logging.getLogger('pysys.watcher')
+
+DIR_CONFIG_DESCRIPTOR = 'pysysdirconfig.xml'
+
+class TestWatcher(object):
+	"""
+	Watches the files of a set of tests and re-runs the affected tests when they change.
+
+	:param pysys.launcher.console_run.ConsoleLaunchHelper launcher: The launcher holding the test selection options.
+	:param type runnerClass: The runner class.
+	:param list runnerArgs: The arguments used to construct the runner. A new runner is created for each re-run,
+		with just the descriptors of the affected tests.
+
+	This must be constructed before the initial run starts, so that it can capture the process state (stdout and
+	signal handlers) that the runner changes while it is executing.
+	"""
+	POLL_INTERVAL_SECS = 0.5
+
+	def __init__(self, launcher, runnerClass, runnerArgs):
+		self.launcher = launcher
+		self.runnerClass = runnerClass
+		self.runnerArgs = runnerArgs
+		self.userOptions = self.__copyUserOptions(runnerArgs[7]) # since the runner modifies these
+		from pysys.config.project import Project
+		self.project = Project.getInstance()
+
+		self.testRoot = os.path.normpath(os.path.dirname(self.project.projectFile))
+
+		self.descriptorsByTestDir = {} # key=testDir, value=list of mode descriptors selected for that test
+		for d in runnerArgs[6]:
+			self.descriptorsByTestDir.setdefault(os.path.normpath(d.testDir), []).append(d)
+
+		self.__stdout = sys.stdout
+		self.__signalHandlers = {sig: signal.getsignal(sig) for sig in [signal.SIGINT, signal.SIGTERM]}
+
+	def watch(self, runner):
+		"""
+		Waits for changes and re-runs the affected tests until the user interrupts this process (or a run is aborted).
+
+		:param runner: The runner that performed the initial run.
+		:return: The runner used for the final run.
+		"""
+		self.__restoreProcessState()
+		while not runner.isRunnerAborting:
+			# start watching before taking the snapshot, so that no changes are missed
+			with TreeChangeWaiter(self.__getWatchedDirs(), self.__getWatchedFiles(), OSWALK_IGNORES) as waiter:
+				snapshot = self.__createSnapshot()
+				log.info('')
+				log.info('Watching %d test directories for changes (press Ctrl+C to stop) ...', len(self.descriptorsByTestDir))
+				try:
+					changed = self.__waitForChanges(snapshot, waiter)
+				except KeyboardInterrupt:
+					log.info('Stopped watching for changes')
+					break
+
+			if any(not self.__isTestFile(f) for f in changed):
+				self.__restart([f for f in changed if not self.__isTestFile(f)])
+
+			descriptors = []
+			for testDir in sorted(self.__getAffectedTestDirs(changed)):
+				descriptors.extend(self.__refreshDescriptors(testDir))
+			if not descriptors: continue
+			descriptors.sort(key=lambda d: [d.executionOrderHint, d._defaultSortKey])
+
+			log.info('Re-running %d tests after changes to: %s', len(descriptors), ', '.join(sorted(changed)))
+			log.info('')
+			args = list(self.runnerArgs)
+			args[6] = descriptors
+			args[7] = self.__copyUserOptions(self.userOptions)
+			# each runner creates a new pool of ports to allocate from; the previous runner has finished with its ports
+			pysys.utils.allocport.tcpServerPortPool = None
+			runner = self.runnerClass(*args)
+			try:
+				runner.start()
+			finally:
+				self.__restoreProcessState()
+		return runner
+
+	@staticmethod
+	def __copyUserOptions(userOptions):
+		userOptions = dict(userOptions)
+		if '__extraRunnerOptions' in userOptions:
+			userOptions['__extraRunnerOptions'] = dict(userOptions['__extraRunnerOptions'])
+		return userOptions
+
+	def __restoreProcessState(self):
+		# undo the process-wide changes the runner makes while it's executing tests, so that Ctrl+C can be used to
+		# stop watching, and output is not redirected yet again by the next runner
+		sys.stdout = self.__stdout
+		for sig, handler in self.__signalHandlers.items():
+			signal.signal(sig, handler)
+
+	def __getWatchedDirs(self):
+		""" Returns a dict of the directories to watch recursively, with the output directories to skip for each. """
+		result = {}
+		for testDir, descriptors in self.descriptorsByTestDir.items():
+			d = descriptors[0]
+			result.setdefault(testDir, set()).add(os.path.normpath(os.path.join(testDir, d.output)))
+			for extraDir in [d.input, d.reference]: # include any that are outside the test dir
+				extraDir = os.path.normpath(os.path.join(testDir, extraDir))
+				if not (extraDir+os.sep).startswith(testDir+os.sep) and os.path.isdir(extraDir):
+					result.setdefault(extraDir, set())
+		return result
+
+	def __getWatchedFiles(self):
+		""" Returns the individual files whose change requires the process to be restarted, or affects all tests under
+		a directory. """
+		result = set()
+		# dir configs (even if they don't exist yet) affect all tests underneath them
+		for testDir in self.descriptorsByTestDir:
+			parent = os.path.dirname(testDir)
+			while (parent+os.sep).startswith(self.testRoot+os.sep):
+				result.add(parent+os.sep+DIR_CONFIG_DESCRIPTOR)
+				parent = os.path.dirname(parent)
+
+		# changes to the project or to its Python extensions (e.g. plugins, runners, shared test classes) cannot be
+		# safely reloaded into this process
+		result.add(os.path.normpath(self.project.projectFile))
+		for module in list(sys.modules.values()):
+			f = getattr(module, '__file__', None)
+			if f and f.endswith('.py') and os.path.normpath(f).startswith(self.testRoot+os.sep):
+				result.add(os.path.normpath(f))
+		return result
+
+	def __createSnapshot(self):
+		""" Returns a dict of the (mtime, size) of each watched file, or None for files that do not exist. """
+		snapshot = {}
+		def visit(dir, skipDirs):
+			try:
+				entries = list(os.scandir(dir))
+			except OSError: # e.g. deleted
+				return
+			for entry in entries:
+				if entry.is_dir():
+					if entry.name not in OSWALK_IGNORES and entry.path not in skipDirs: visit(entry.path, skipDirs)
+				else:
+					try:
+						st = entry.stat()
+					except OSError:
+						continue
+					snapshot[entry.path] = (st.st_mtime_ns, st.st_size)
+		for dir, skipDirs in self.__getWatchedDirs().items():
+			visit(dir, skipDirs)
+
+		for f in self.__getWatchedFiles():
+			try:
+				st = os.stat(f)
+				snapshot[f] = (st.st_mtime_ns, st.st_size)
+			except OSError:
+				snapshot[f] = None
+		return snapshot
+
+	def __waitForChanges(self, snapshot, waiter):
+		""" Blocks until some of the watched files change, and returns the set of changed paths. """
+		while True:
+			start = time.monotonic()
+			if waiter.isEventDriven:
+				waiter.wait()
+			latest = self.__createSnapshot()
+			if not waiter.isEventDriven:
+				# scanning a very large number of files shouldn't be allowed to use all the CPU
+				time.sleep(max(self.POLL_INTERVAL_SECS, 2*(time.monotonic()-start)))
+			changed = {f for f in set(snapshot)|set(latest) if snapshot.get(f) != latest.get(f)}
+			if not changed: continue
+
+			# editors often save in several steps, so wait until the files stop changing
+			while True:
+				if waiter.isEventDriven:
+					if waiter.wait(self.POLL_INTERVAL_SECS): continue
+					latest = self.__createSnapshot()
+					break
+				time.sleep(self.POLL_INTERVAL_SECS)
+				stable = self.__createSnapshot()
+				if stable == latest: break
+				latest = stable
+			return {f for f in set(snapshot)|set(latest) if snapshot.get(f) != latest.get(f)}
+
+	def __isTestFile(self, path):
+		return os.path.basename(path) == DIR_CONFIG_DESCRIPTOR or any(
+			(path+os.sep).startswith(dir+os.sep) for dir in self.__getWatchedDirs())
+
+	def __getAffectedTestDirs(self, changed):
+		result = set()
+		for testDir, descriptors in self.descriptorsByTestDir.items():
+			d = descriptors[0]
+			watchedDirs = [testDir]+[os.path.normpath(os.path.join(testDir, x)) for x in [d.input, d.reference]]
+			for f in changed:
+				if os.path.basename(f) == DIR_CONFIG_DESCRIPTOR:
+					if (testDir+os.sep).startswith(os.path.dirname(f)+os.sep): result.add(testDir)
+				elif any((f+os.sep).startswith(x+os.sep) for x in watchedDirs):
+					result.add(testDir)
+		return result
+
+	def __refreshDescriptors(self, testDir):
+		""" Reloads the descriptor for the specified test, returning the mode descriptors to run. """
+		launcher = self.launcher
+		previousIds = {d.id for d in self.descriptorsByTestDir[testDir]}
+		try:
+			# first try to keep running the same modes as before (including any explicitly selected with TEST~MODE),
+			# falling back to the mode selection options if those modes no longer exist
+			descriptors = [d for d in createDescriptors([], launcher.type, launcher.includes, launcher.excludes,
+				launcher.trace, testDir, modeincludes=['ALL'], expandmodes=True) if d.id in previousIds]
+			if not descriptors:
+				descriptors = createDescriptors([], launcher.type, launcher.includes, launcher.excludes,
+					launcher.trace, testDir, modeincludes=launcher.modeinclude, modeexcludes=launcher.modeexclude, expandmodes=True)
+			if launcher.grep:
+				regex = re.compile(launcher.grep, flags=re.IGNORECASE)
+				descriptors = [d for d in descriptors if (regex.search(d.id) or regex.search(d.title))]
+		except Exception as ex:
+			log.warning('Cannot run test in %s: %s', testDir, ex)
+			return []
+		self.descriptorsByTestDir[testDir] = descriptors
+		return descriptors
+
+	def __restart(self, changed):
+		log.info('Restarting pysys run --watch after changes to: %s', ', '.join(sorted(changed)))
+		args = getattr(sys, 'orig_argv', None) or [sys.executable]+sys.argv
+		sys.stdout.flush()
+		sys.stderr.flush()
+		if IS_WINDOWS: # exec doesn't replace the process on Windows, so the console would return before it completes
+			sys.exit(subprocess.call(args))
+		os.execv(sys.executable, args)
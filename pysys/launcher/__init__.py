@@ -24,6 +24,7 @@ __all__ = [ "createDescriptors","console" ]
 
 import os.path, logging
 import time
+import bisect
 
 from pysys.constants import *
 from pysys.exceptions import UserError
@@ -59,6 +60,88 @@ def loadDescriptors(dir=None):
 TEST_ID_CHARS = r'-_.\w' # internal API, subject to change at any time, do not use
 MODE_CHARS = TEST_ID_CHARS+'~=' # internal API, subject to change at any time, do not use
 
+class _DescriptorSelectionIndex(object):
+	"""
+	Indexes a sorted list of descriptors so that each test spec can be resolved without scanning every descriptor. 
+	
+	:meta private: Not for use outside the framework. 
+	
+	Each index is only built the first time it is needed. 
+	"""
+	def __init__(self, descriptors):
+		self.descriptors = descriptors
+		self.__byId = {d.id: index for index, d in enumerate(descriptors)}
+		self.__byNumber = None
+		self.__reversedIds = None
+		self.__byDirName = None
+		self.__byDir = None
+
+	def findMatchingIndex(self, specId):
+		"""
+		Returns the index of the single descriptor matching the specified full id, numeric suffix or id suffix. 
+		
+		:raises UserError: If there is not exactly one match. 
+		"""
+		descriptors = self.descriptors
+		
+		# optimize the case where we specify the full id; no need to iterate
+		index = self.__byId.get(specId, None)
+		if index is not None: return index
+		
+		if specId.isdigit():
+			# ids ending with "_" followed by this number (ignoring leading zeros)
+			if self.__byNumber is None:
+				self.__byNumber = {}
+				for index, d in enumerate(descriptors):
+					underscore = d.id.rfind('_')
+					if underscore > 0: self.__byNumber.setdefault(d.id[underscore+1:].lstrip('0'), []).append(index)
+			matches = self.__byNumber.get(specId.lstrip('0'), [])
+		else:
+			# permit specifying suffix at end of testcase, which is 
+			# important to allow shell directory completion to be used if an id-prefix is 
+			# being added onto the directory id; but only do this if spec is non-numeric 
+			# since we don't want to match test_104 against spec 04
+			if self.__reversedIds is None:
+				self.__reversedIds = sorted((d.id[::-1], index) for index, d in enumerate(descriptors))
+			reversedSpec = specId[::-1]
+			matches = []
+			for i in range(bisect.bisect_left(self.__reversedIds, (reversedSpec,)), len(self.__reversedIds)):
+				if not self.__reversedIds[i][0].startswith(reversedSpec): break
+				matches.append(self.__reversedIds[i][1])
+			matches.sort()
+		
+		if len(matches) == 1: return matches[0]			
+		if len(matches) == 0: raise UserError('No tests found matching id: "%s"'%specId)
+		
+		# as a special-case, see if there's an exact match with the dirname
+		if self.__byDirName is None:
+			self.__byDirName = {}
+			for index, d in enumerate(descriptors):
+				self.__byDirName.setdefault(os.path.basename(d.testDir), []).append(index)
+		dirnameMatches = self.__byDirName.get(specId, [])
+		if len(dirnameMatches)==1: return dirnameMatches[0]
+		
+		# nb: use space not comma as the delimiter so it's easy to copy paste it
+		raise UserError('Multiple tests found matching "%s"; please specify which one you want: %s'%(specId, 
+			' '.join([descriptors[index].id for index in matches[:20] ])))
+
+	def findInDirectory(self, dirtomatch):
+		"""
+		Returns the descriptors whose testDir is the specified (absolute, normcase'd) directory or is under it. 
+		"""
+		if self.__byDir is None:
+			# map every ancestor directory of each test to the tests under it
+			self.__byDir = {}
+			for index, d in enumerate(self.descriptors):
+				self.__byDir.setdefault(os.path.normcase(d.testDir), set()).add(index)
+				testDir = parent = os.path.normcase(os.path.normpath(d.testDir))
+				while True:
+					if testDir.startswith(parent+os.sep): self.__byDir.setdefault(parent, set()).add(index)
+					nextParent = os.path.dirname(parent)
+					if nextParent == parent: break
+					parent = nextParent
+		return [self.descriptors[index] for index in sorted(self.__byDir.get(dirtomatch, ()))]
+
 def createDescriptors(testIdSpecs, type, includes, excludes, trace, dir=None, modeincludes=[], modeexcludes=[], expandmodes=True):
 	"""Create a list of descriptor objects representing a set of tests to run, filtering by various parameters, returning the list.
 	
@@ -101,7 +184,9 @@ def createDescriptors(testIdSpecs, type, includes, excludes, trace, dir=None, mo
 		else:
 			modeincludes = [MODES_PRIMARY]
 
-	modedescriptors = {} # populate this with testid:[descriptors list]
+	# populate this with testid:[selected modes list]; the per-mode descriptors themselves are only created once we 
+	# know which tests are selected, since with many modes per test that's much more expensive than the filtering
+	selectedmodes = {}
 	
 	allmodes = {} # populate this as we go; could have used a set, but instead use a dict so we can check or capitalization mismatches easily at the same time; 
 	#the key is a lowercase version of mode name, value is the canonical capitalized name
@@ -122,16 +207,12 @@ def createDescriptors(testIdSpecs, type, includes, excludes, trace, dir=None, mo
 		if not d.modes:
 			# for tests that have no modes, there is only one descriptor and it's treated as the primary mode; 
 			# user can also specify '' to indicate no mode
-			if modeincludesnone:
-				if expandmodes: d.mode = None
-				modedescriptors[d.id] = [d]
-			else:
-				modedescriptors[d.id] = []
+			selectedmodes[d.id] = [None] if modeincludesnone else []
 		else:
-			thisdescriptorlist = []
-			modedescriptors[d.id] = thisdescriptorlist # even if it ends up being empty
+			thismodelist = []
+			selectedmodes[d.id] = thismodelist # even if it ends up being empty
 			
-			# create a copy of the descriptor for each selected mode
+			# select which modes this descriptor will be expanded into
 			for m in d.modes: 
 				try:
 					canonicalmodecapitalization = allmodes[m.lower()]
@@ -159,7 +240,7 @@ def createDescriptors(testIdSpecs, type, includes, excludes, trace, dir=None, mo
 					): 
 					continue
 				
-				thisdescriptorlist.append(d._createDescriptorForMode(m))
+				thismodelist.append(m)
 
 	for m in [MODES_ALL, MODES_PRIMARY]:
 		if m.lower() in allmodes: raise UserError('The mode name "%s" is reserved, please select another mode name'%m)
@@ -199,33 +280,8 @@ def createDescriptors(testIdSpecs, type, includes, excludes, trace, dir=None, mo
 	if testIdSpecs == []:
 		tests = descriptors
 	else:
-		testids = {d.id: index for index, d in enumerate(descriptors)}
-		def findMatchingIndex(specId): # change this to return the match, rather than whether it matches
-			# optimize the case where we specify the full id; no need to iterate
-			index = testids.get(specId, None)
-			if index is not None: return index
-			
-			if specId.isdigit():
-				regex = re.compile('.+_0*'+(specId.lstrip('0') if (len(specId)>0) else specId)+'$')
-				matches = [index for index, d in enumerate(descriptors) if regex.match(d.id)]
-			else:
-				# permit specifying suffix at end of testcase, which is 
-				# important to allow shell directory completion to be used if an id-prefix is 
-				# being added onto the directory id; but only do this if spec is non-numeric 
-				# since we don't want to match test_104 against spec 04
-			
-				matches = [index for index, d in enumerate(descriptors) if d.id.endswith(specId)]
-			
-			if len(matches) == 1: return matches[0]			
-			if len(matches) == 0: raise UserError('No tests found matching id: "%s"'%specId)
-			
-			# as a special-case, see if there's an exact match with the dirname
-			dirnameMatches = [index for index, d in enumerate(descriptors) if os.path.basename(d.testDir)==specId]
-			if len(dirnameMatches)==1: return dirnameMatches[0]
-			
-			# nb: use space not comma as the delimiter so it's easy to copy paste it
-			raise UserError('Multiple tests found matching "%s"; please specify which one you want: %s'%(specId, 
-				' '.join([descriptors[index].id for index in matches[:20] ])))
+		selectionIndex = _DescriptorSelectionIndex(descriptors)
+		findMatchingIndex = selectionIndex.findMatchingIndex
 
 		for t in testIdSpecs:
 			try:
@@ -235,9 +291,7 @@ def createDescriptors(testIdSpecs, type, includes, excludes, trace, dir=None, mo
 
 				if os.path.isdir(t):
 					dirtomatch = os.path.normcase(os.path.abspath(t))
-					matches = [descriptors[i] for i in range(0,len(descriptors)) 
-						if os.path.normcase(descriptors[i].testDir)==dirtomatch 
-						or os.path.normcase(os.path.normpath(descriptors[i].testDir)).startswith(dirtomatch+os.sep)]
+					matches = selectionIndex.findInDirectory(dirtomatch)
 					if not matches: raise UserError("No tests found under directory: \"%s\""%t)
 
 				elif re.search(r'^[%s]*$'%MODE_CHARS, t): # single test id (not a range or regex)
@@ -285,7 +339,7 @@ def createDescriptors(testIdSpecs, type, includes, excludes, trace, dir=None, mo
 				if not matches: raise UserError("No test ids found matching: \"%s\""%t)
 				if '~' not in t:
 					for m in matches:
-						if not modedescriptors[m.id]:
+						if not selectedmodes[m.id]:
 							# if user explicitly specified an individual test and excluded all modes it can run in, 
 							# we shouldn't silently skip/exclude it as they clearly made a mistake
 							raise UserError('Test "%s" cannot be selected with the specified mode(s).'%m.id)
@@ -299,62 +353,37 @@ def createDescriptors(testIdSpecs, type, includes, excludes, trace, dir=None, mo
 
 	# trim down the list based on the type
 	if type:
-		index = 0
-		while index != len(tests):
-			if type != tests[index].type:
-				tests.pop(index)
-			else:
-				index = index + 1
+		tests = [t for t in tests if t.type == type]
 			
 	# trim down the list based on the include and exclude groups
 	if len(excludes) != 0:
-		index = 0
-		while index != len(tests):
-			remove = False
-
-			for exclude in excludes:
-				if exclude in tests[index].groups:
-					remove = True
-					break
-
-			if remove:
-				tests.pop(index)
-			else:
-				index = index +1
+		excludes = set(excludes)
+		tests = [t for t in tests if excludes.isdisjoint(t.groups)]
 				
 	if includes != []:
-		index = 0
-		while index != len(tests):
-			keep = False
-				
-			for include in includes:
-				if include in tests[index].groups:
-					keep = True
-					break
-
-			if not keep:
-				tests.pop(index)
-			else:
-				index = index +1
+		includes = set(includes)
+		tests = [t for t in tests if not includes.isdisjoint(t.groups)]
 
 	# trim down the list based on the traceability
 	if trace:
-		index = 0
-		while index != len(tests):
-			if trace not in tests[index].traceability :
-				tests.pop(index)
-			else:
-				index = index + 1
+		tests = [t for t in tests if trace in t.traceability]
 
 	# expand based on modes (unless we're printing without any mode filters in which case expandmodes=False)
 	if expandmodes: 
 		expandedtests = []
+		expandedids = set()
 		for t in tests:
 			if hasattr(t, 'mode'): 
-				# if mode if set it has no modes or has a test id~mode that was explicitly specified in a testspec, so does not need expanding
+				# if mode is set it has a test id~mode that was explicitly specified in a testspec, so does not need expanding
 				expandedtests.append(t)
-			else:
-				expandedtests.extend(modedescriptors[t.id])
+			elif t.id not in expandedids: # no need to expand a test again if it was matched by more than one testspec
+				expandedids.add(t.id)
+				for m in selectedmodes[t.id]:
+					if m is None: # tests with no modes are not copied
+						t.mode = None
+						expandedtests.append(t)
+					else:
+						expandedtests.append(t._createDescriptorForMode(m))
 		tests = expandedtests
 	
 	# de dup
@@ -29,6 +29,8 @@ from pysys.launcher.console_print import ConsolePrintHelper, printTest
 from pysys.launcher.console_makeproject import makeProject
 from pysys.launcher.console_make import *
 from pysys.launcher.console_run import ConsoleLaunchHelper, runTest
+from pysys.launcher.console_merge import ConsoleMergeHelper, mergeResults
+from pysys.launcher.console_server import ConsoleServerHelper, startServer
 
 
 def printUsage(returncode=0):
@@ -42,6 +44,8 @@ def printUsage(returncode=0):
 	sys.stdout.write("       print | ls  - print a list of tests under the current working directory\n")
 	sys.stdout.write("       run         - run a set of tests under the current working directory\n")
 	sys.stdout.write("       clean       - clean the output subdirectories of tests under the current working directory\n")
+	sys.stdout.write("       merge       - combine the results of several test runs, such as the shards from pysys run --shard\n")
+	sys.stdout.write("       server      - start a server process that makes later pysys run commands start faster\n")
 	sys.stdout.write("\n")
 	sys.stdout.write("    For more information on the options available to each command, use the -h | --help option, e.g.\n")
 	sys.stdout.write("       %s run --help\n" % _PYSYS_SCRIPT_NAME)
@@ -67,6 +71,10 @@ def main(args):
 			printTest(args[1:])
 		elif mode == "clean":
 			cleanTest(args[1:])
+		elif mode == "merge":
+			mergeResults(args[1:])
+		elif mode == "server":
+			startServer(args[1:])
 		elif mode == "debug": # undocumented
 			sys.stdout.write(f"Using PySys {__version__} from {os.path.normpath(os.path.dirname(pysys.__file__))}\n")
 			sys.stdout.write(f"Using Python {sys.version_info[0]}.{sys.version_info[1]}.{sys.version_info[2]} from {os.path.normpath(sys.executable)}\n")
@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+# PySys System Test Framework, Copyright (C) 2006-2023 M.B. Grieve
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+
+"""
+:meta private: Not part of the PySys API.
+"""
+
+from __future__ import print_function
+import os.path, stat, getopt, logging, traceback, sys, glob, shutil, io
+import json, collections
+from xml.dom.minidom import parse
+
+from pysys import log
+from pysys import __version__
+from pysys.constants import *
+from pysys.exceptions import UserError
+from pysys.utils.fileutils import mkdir, toLongPathSafe
+from pysys.perf.api import PerformanceRunData, CSVPerformanceFile
+from pysys.perf.reporters import JSONPerformanceReporter
+from pysys.internal.testscheduler import TestDurationHistory
+
+class ConsoleMergeHelper(object):
+	"""
+	Combines the output files from several test runs (typically shards of the same run executed on different machines
+	using ``pysys run --shard``) into a single set of output files.
+	"""
+
+	KINDS = collections.OrderedDict([
+		('jsonResults', 'JSON test results'),
+		('xmlResults', 'XML test results'),
+		('csvResults', 'CSV test results'),
+		('junitResults', 'JUnit XML test results directory'),
+		('csvPerformance', 'CSV performance results'),
+		('jsonPerformance', 'JSON performance results'),
+		('testDurations', 'test durations history'),
+	])
+
+	def __init__(self, workingDir, name=""):
+		self.workingDir = workingDir
+		self.arguments = []
+		self.outputDir = None
+		self.name = name
+		self.optionString = 'ho:v:'
+		self.optionList = ["help", "outdir=", "verbosity="]
+
+	def printUsage(self):
+		_PYSYS_SCRIPT_NAME = os.path.basename(sys.argv[0]) if '__main__' not in sys.argv[0] else 'pysys.py'
+		print("\nPySys System Test Framework (version %s): Test results merger" % __version__)
+		print("\nUsage: %s %s [option]* -o OUTDIR PATH+" % (_PYSYS_SCRIPT_NAME, self.name))
+		print("")
+		print("Combines the results written by several test runs (for example each shard of a run executed using ")
+		print("pysys run --shard on a different machine) into a single set of files in OUTDIR. Each PATH can be: ")
+		print("   - a file written by the JSONResultsWriter, XMLResultsWriter or CSVResultsWriter")
+		print("   - a directory written by the JUnitXMLResultsWriter")
+		print("   - a .csv or .json performance summary file (results with the same key are aggregated)")
+		print("   - a test durations history file from pysys run --sort duration or --shard")
+		print("Each merged file has the same name as the first PATH of that type. Glob patterns may be used in PATH.")
+		print("")
+		print("   where [option] includes:")
+		print("       -o | --outdir    STRING     the directory to write the merged files to (required)")
+		print("       -v | --verbosity STRING     set the verbosity level (CRIT, WARN, INFO, DEBUG)")
+		print("       -h | --help                 print this message")
+		sys.exit()
+
+	def parseArgs(self, args):
+		try:
+			optlist, self.arguments = getopt.gnu_getopt(args, self.optionString, self.optionList)
+		except Exception:
+			log.warning("Error parsing command line arguments: %s" % (sys.exc_info()[1]))
+			sys.exit(1)
+
+		from pysys.internal.initlogging import pysysLogHandler, stdoutHandler
+		for option, value in optlist:
+			if option in ("-h", "--help"):
+				self.printUsage()
+
+			elif option in ("-v", "--verbosity"):
+				if value.upper() == "DEBUG":
+					verbosity = logging.DEBUG
+				elif value.upper() == "INFO":
+					verbosity = logging.INFO
+				elif value.upper() == "WARN":
+					verbosity = logging.WARN
+				elif value.upper() == "CRIT":
+					verbosity = logging.CRITICAL
+				else:
+					log.warning('Invalid log level "%s"'%value)
+					sys.exit(1)
+
+				log.setLevel(verbosity)
+				if verbosity == logging.DEBUG: stdoutHandler.setLevel(verbosity)
+
+				# refresh handler levels
+				pysysLogHandler.setLogHandlersForCurrentThread([stdoutHandler])
+
+			elif option in ("-o", "--outdir"):
+				self.outputDir = os.path.normpath(os.path.join(self.workingDir, value))
+
+			else:
+				print("Unknown option: %s"%option)
+				sys.exit(1)
+
+		if not self.outputDir: raise UserError('The --outdir option must be specified')
+		if not self.arguments: raise UserError('No files to merge were specified')
+
+	@staticmethod
+	def getKind(path):
+		"""
+		Returns the kind of results file this is (a key from `KINDS`), or raises an exception if not supported.
+		"""
+		if os.path.isdir(path):
+			if glob.glob(os.path.join(glob.escape(path), 'TEST-*.xml')): return 'junitResults'
+		elif path.endswith('.json'):
+			with io.open(toLongPathSafe(path), encoding='utf-8') as f:
+				data = json.load(f)
+			if 'formatVersion' in data and 'tests' in data: return 'testDurations'
+			if 'artifacts' in data: return 'jsonResults' # only written by the JSONResultsWriter
+			if 'results' in data: return 'jsonPerformance'
+		elif path.endswith('.csv'):
+			with io.open(toLongPathSafe(path), encoding='utf-8') as f:
+				header = f.readline()
+			if header.startswith('#') and 'resultKey' in header: return 'csvPerformance'
+			if header.startswith('id, title, cycle'): return 'csvResults'
+		elif path.endswith('.xml'):
+			if parse(toLongPathSafe(path)).documentElement.tagName == 'pysyslog': return 'xmlResults'
+		raise UserError('Cannot merge "%s" as it is not a recognized type of test results file'%path)
+
+	def merge(self):
+		paths = []
+		for arg in self.arguments:
+			matches = sorted(glob.glob(os.path.join(self.workingDir, arg)))
+			if not matches: raise UserError('Cannot find any files matching: %s'%arg)
+			paths.extend(os.path.normpath(p) for p in matches)
+
+		byKind = collections.OrderedDict()
+		for p in paths:
+			byKind.setdefault(self.getKind(p), []).append(p)
+
+		mkdir(self.outputDir)
+		for kind, kindPaths in byKind.items():
+			dest = os.path.join(self.outputDir, os.path.basename(kindPaths[0]))
+			if os.path.normpath(dest) in kindPaths: raise UserError('The output directory must not contain the files to be merged: %s'%dest)
+			getattr(self, '_merge_'+kind)(kindPaths, dest)
+			log.info('Merged %d %s into: %s', len(kindPaths), self.KINDS[kind]+('' if len(kindPaths)==1 else ' files'), dest)
+
+	@staticmethod
+	def mergeRunDetails(runDetailsList):
+		"""
+		Combines the runDetails dictionaries from several runs, with a "; "-separated list of the unique values for
+		any keys that differ between runs (the same approach as `pysys.perf.api.PerformanceRunData.aggregate`).
+		"""
+		details = collections.OrderedDict()
+		for runDetails in runDetailsList:
+			for k, v in runDetails.items():
+				values = details.setdefault(k, [])
+				if v not in values: values.append(v)
+		return collections.OrderedDict((k, '; '.join(sorted(v))) for k, v in details.items())
+
+	def _merge_jsonResults(self, paths, dest):
+		runs = []
+		for p in paths:
+			with io.open(toLongPathSafe(p), encoding='utf-8') as f:
+				runs.append(json.load(f))
+		artifacts = collections.OrderedDict()
+		for run in runs:
+			for category, artifactPaths in run.get('artifacts', {}).items():
+				artifacts.setdefault(category, []).extend(artifactPaths)
+
+		# same layout as the JSONResultsWriter
+		with io.open(toLongPathSafe(dest), 'w', encoding='utf-8') as f:
+			f.write('{"runDetails": ')
+			json.dump(self.mergeRunDetails(run['runDetails'] for run in runs), f)
+			f.write(', "results":[\n')
+			f.write(',\n'.join(json.dumps(result) for run in runs for result in run['results']))
+			f.write('\n],"artifacts": ')
+			json.dump(artifacts, f)
+			f.write('}\n')
+
+		outcomes = collections.Counter(result['outcome'] for run in runs for result in run['results'])
+		log.info('Merged test outcomes: %s', ', '.join('%d %s'%(outcomes[str(o)], o) for o in OUTCOMES if outcomes[str(o)]) or 'none')
+
+	def _merge_xmlResults(self, paths, dest):
+		documents = [parse(toLongPathSafe(p)) for p in paths]
+		merged = documents[0]
+		root = merged.documentElement
+		resultsByCycle = {e.getAttribute('cycle'): e for e in root.getElementsByTagName('results')}
+		completed, total, complete = 0, 0, True
+		for document in documents:
+			counts = document.documentElement.getAttribute('completed').split('/')
+			completed, total = completed+int(counts[0]), total+int(counts[-1])
+			complete = complete and document.documentElement.getAttribute('status') == 'complete'
+			if document is merged: continue
+			for results in document.documentElement.getElementsByTagName('results'):
+				cycle = results.getAttribute('cycle')
+				if cycle not in resultsByCycle:
+					resultsByCycle[cycle] = root.appendChild(merged.importNode(results, True))
+				else:
+					for result in results.getElementsByTagName('result'):
+						resultsByCycle[cycle].appendChild(merged.importNode(result, True))
+		root.setAttribute('completed', '%d/%d'%(completed, total))
+		root.setAttribute('status', 'complete' if complete else 'running')
+
+		def removeWhitespace(node): # so that the pretty-printed output has the same layout as the original
+			for child in list(node.childNodes):
+				if child.nodeType == child.TEXT_NODE and not child.data.strip():
+					node.removeChild(child)
+				else:
+					removeWhitespace(child)
+		removeWhitespace(merged)
+		with io.open(toLongPathSafe(dest), 'wb') as f:
+			f.write(merged.toprettyxml(indent='	', encoding='utf-8', newl=os.linesep))
+
+	def _merge_csvResults(self, paths, dest):
+		with io.open(toLongPathSafe(dest), 'w', encoding='utf-8') as out:
+			for i, p in enumerate(paths):
+				with io.open(toLongPathSafe(p), encoding='utf-8') as f:
+					header = f.readline()
+					if i == 0: out.write(header)
+					for line in f:
+						if line.strip(): out.write(line)
+			out.write('\n\n\n')
+
+	def _merge_junitResults(self, paths, dest):
+		mkdir(dest)
+		for p in paths:
+			for f in sorted(glob.glob(os.path.join(glob.escape(p), 'TEST-*.xml'))):
+				target = os.path.join(dest, os.path.basename(f))
+				if os.path.exists(target): log.warning('Overwriting %s with the result from %s', target, p)
+				shutil.copyfile(toLongPathSafe(f), toLongPathSafe(target))
+
+	def _merge_csvPerformance(self, paths, dest):
+		agg = PerformanceRunData.aggregate([CSVPerformanceFile.load(p) for p in paths])
+		result = CSVPerformanceFile('', name=dest)
+		result.runDetails, result.results = agg.runDetails, agg.results
+		result.dump(dest)
+
+	def _merge_jsonPerformance(self, paths, dest):
+		agg = PerformanceRunData.aggregate([JSONPerformanceReporter.tryDeserializePerformanceFile(p) for p in paths])
+		# same layout as the JSONPerformanceReporter
+		with io.open(toLongPathSafe(dest), 'w', encoding='utf-8') as f:
+			f.write('{"runDetails": ')
+			json.dump(agg.runDetails, f)
+			f.write(', "results":[\n')
+			f.write(',\n'.join(json.dumps(result) for result in agg.results))
+			f.write('\n]}\n')
+
+	def _merge_testDurations(self, paths, dest):
+		if os.path.exists(dest): os.remove(dest)
+		merged = TestDurationHistory(dest)
+		for p in paths:
+			merged.merge(TestDurationHistory(p))
+		merged.save()
+
+def mergeResults(args):
+	try:
+		merger = ConsoleMergeHelper(os.getcwd(), "merge")
+		merger.parseArgs(args)
+		merger.merge()
+	except Exception as e:
+		sys.stderr.write('\nERROR: %s\n' % e)
+		if not isinstance(e, UserError): traceback.print_exc()
+		sys.exit(10)
@@ -30,6 +30,7 @@ from pysys.constants import *
 from pysys.launcher import createDescriptors, MODE_CHARS
 from pysys.exceptions import UserError
 from pysys.config.project import Project
+from pysys.config.descriptor import DescriptorLoader
 from pysys.utils.logutils import ColorLogFormatter
 
 class ConsolePrintHelper(object):
@@ -51,8 +52,9 @@ class ConsolePrintHelper(object):
 		self.name = name
 		self.sort = None
 		self.grep = None
-		self.optionString = 'hfgdrm:a:t:i:e:s:G:DTPFv'
-		self.optionList = ["help","full","groups","modes","requirements","dir", "title", "testfile", "mode=","type=","trace=","include=","exclude=", "json", "sort=", "grep=", "verbose"] 
+		self.stream = False
+		self.optionString = 'hfgdrm:a:t:i:e:s:G:DTPFvIS'
+		self.optionList = ["help","full","groups","modes","requirements","dir", "title", "testfile", "ids", "mode=","type=","trace=","include=","exclude=", "json", "sort=", "grep=", "verbose", "stream"] 
 		
 
 	def printUsage(self):
@@ -71,6 +73,10 @@ class ConsolePrintHelper(object):
 		print("       -D | --dir                  print the absolute path for each test directory")
 		print("       -P | --dir                  print the absolute path for each test directory")
 		print("       -F | --testfile             print the file containing the test logic (e.g. pysystest.py)")
+		print("       -I | --ids                  print only the test ids")
+		print("       -S | --stream               print each test as soon as it is loaded, without sorting or aligning")
+		print("                                   (faster for shell completion and IDEs; cannot be used with [tests],")
+		print("                                   --mode, --sort, --json, --groups, --modes or --requirements)")
 		print("")
 		print("       -g | --groups               print all test groups")
 		print("       -d | --modes                print all modes")
@@ -129,6 +135,12 @@ class ConsolePrintHelper(object):
 			elif option in ('-F', '--testfile'):
 				self.printOnly.append('testfile')
 
+			elif option in ('-I', '--ids'):
+				self.printOnly.append('id')
+
+			elif option in ('-S', '--stream'):
+				self.stream = True
+
 			elif option in ("-v", "--verbose"):
 				verbose = True
 
@@ -173,7 +185,7 @@ class ConsolePrintHelper(object):
 				sys.exit(1)
 
 		if verbose or self.grep:
-			if not self.sort:
+			if not self.sort and not self.stream:
 				self.sort = 'dirAndTitle'
 			self.printOnly.append('title')
 			if 'dir' not in self.printOnly: # don't add both
@@ -181,6 +193,8 @@ class ConsolePrintHelper(object):
 
 	def printTests(self):
 			Project.findAndLoadProject()
+			
+			if self.stream: return self.streamTests()
 	
 			# nb: mode filtering happens later
 			descriptors = createDescriptors(self.arguments, self.type, self.includes, self.excludes, self.trace, self.workingDir, expandmodes=True if self.modefilter else False, modeincludes=self.modefilter)
@@ -249,29 +263,79 @@ class ConsolePrintHelper(object):
 				if len(descriptor.id) > maxsize: maxsize = len(descriptor.id)
 			maxsize = maxsize + 2
 			
-			colorFormatter = ColorLogFormatter({})
-			colorFormatter.initColoringLibrary() # have to explicitly call this to get it installed to sys.stdout (on windows), not stdoutHandler.stream.getUnderlyingStream (=stderr)
-			def addColor(category, s):
-				if not category: return s
-				return colorFormatter.formatArg(category, s) 
-		
+			printDescriptor = self.__createDescriptorPrinter()
 			for descriptor in descriptors:
-				padding = " " * (maxsize - len(descriptor.id))
-				if self.full:
-					print("="*80)
-					print(str(descriptor))
-				else:
-					if (not self.printOnly) or 'title' in self.printOnly:
-						title = descriptor.title
-						if self.grep:
-							title = re.sub(regex, lambda m: addColor(LOG_FAILURES, m.group(0)), title)
-						elif len(self.printOnly)>1:
-							title = addColor(LOG_TEST_DETAILS, title)
-						print("%s%s| %s" % (descriptor.id, padding, title))
-					if 'dir' in self.printOnly:
-						print("%s%s" % ('   ' if len(self.printOnly)>1 else '', os.path.abspath(descriptor.testDir)))
-					if 'testfile' in self.printOnly:
-						print("%s%s" % ('   ' if len(self.printOnly)>1 else '', os.path.normpath(os.path.join(descriptor.testDir, descriptor._getTestFile()))))
+				printDescriptor(descriptor, maxsize)
+
+	def streamTests(self):
+		"""
+		Prints each test as soon as its descriptor is loaded, skipping the mode expansion, execution order hints and 
+		sorting that createDescriptors does. 
+		"""
+		unsupported = [option for (option, value) in [('[tests]', self.arguments), ('--mode', self.modefilter), 
+			('--sort', self.sort), ('--json', self.json), ('--groups', self.groups), ('--modes', self.modes), 
+			('--requirements', self.requirements)] if value]
+		if unsupported: raise UserError('Cannot use --stream with %s'%', '.join(unsupported))
+		
+		regex = re.compile(self.grep, flags=re.IGNORECASE) if self.grep else None
+		excludes, includes = set(self.excludes), set(self.includes)
+		printDescriptor = self.__createDescriptorPrinter()
+		
+		count = [0]
+		def onDescriptorLoaded(d):
+			# same filtering as createDescriptors
+			if self.type and d.type != self.type: return
+			if excludes and not excludes.isdisjoint(d.groups): return
+			if includes and includes.isdisjoint(d.groups): return
+			if self.trace and self.trace not in d.traceability: return
+			if regex and not (regex.search(d.id) or regex.search(d.title)): return
+			
+			count[0] += 1
+			printDescriptor(d, len(d.id)+2)
+			sys.stdout.flush()
+
+		project = Project.getInstance()
+		loader = project.descriptorLoaderClass(project)
+		try:
+			if type(loader).loadDescriptors is DescriptorLoader.loadDescriptors:
+				loader._loadDescriptors(self.workingDir, onDescriptorLoaded=onDescriptorLoaded)
+			else: # a custom loader might change the list after loading, so can only print them at the end
+				for d in loader.loadDescriptors(self.workingDir): onDescriptorLoaded(d)
+		except BrokenPipeError: # the reader has seen enough (e.g. piped to head), which is fine
+			os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno()) # avoid another error when stdout is flushed at exit
+			return
+		
+		if count[0] == 0:
+			raise UserError("The supplied options did not result in the selection of any tests")
+
+	def __createDescriptorPrinter(self):
+		colorFormatter = ColorLogFormatter({})
+		colorFormatter.initColoringLibrary() # have to explicitly call this to get it installed to sys.stdout (on windows), not stdoutHandler.stream.getUnderlyingStream (=stderr)
+		def addColor(category, s):
+			if not category: return s
+			return colorFormatter.formatArg(category, s) 
+		regex = re.compile(self.grep, flags=re.IGNORECASE) if self.grep else None
+	
+		def printDescriptor(descriptor, maxsize):
+			padding = " " * (maxsize - len(descriptor.id))
+			if self.full:
+				print("="*80)
+				print(str(descriptor))
+			else:
+				if (not self.printOnly) or 'title' in self.printOnly:
+					title = descriptor.title
+					if self.grep:
+						title = re.sub(regex, lambda m: addColor(LOG_FAILURES, m.group(0)), title)
+					elif len(self.printOnly)>1:
+						title = addColor(LOG_TEST_DETAILS, title)
+					print("%s%s| %s" % (descriptor.id, padding, title))
+				elif 'id' in self.printOnly:
+					print(descriptor.id)
+				if 'dir' in self.printOnly:
+					print("%s%s" % ('   ' if len(self.printOnly)>1 else '', os.path.abspath(descriptor.testDir)))
+				if 'testfile' in self.printOnly:
+					print("%s%s" % ('   ' if len(self.printOnly)>1 else '', os.path.normpath(os.path.join(descriptor.testDir, descriptor._getTestFile()))))
+		return printDescriptor
 
 
 def printTest(args):
@@ -57,12 +57,19 @@ class ConsoleLaunchHelper(object):
 		self.descriptors = []
 		self.grep = None
 		self.sort = None
+		self.workers = 'threads'
+		self.shard = None
+		self.watch = False
+		self.changedSince = None
+		self.changedFiles = None
 		self.optionString = 'hrpyv:a:t:i:e:c:o:m:n:j:b:X:gG:s:'
 		self.optionList = ["help","record","purge","verbosity=","type=","trace=","include=","exclude=","cycle=","outdir=",
 			"mode=","modeinclude=","modeexclude=","threads=", "abort=", 'validateOnly', 'vo', 'progress', 'printLogs=', 'grep=', 
-			'ci', 'sort=', 
+			'ci', 'sort=', 'workers=', 'shard=', 
 			'writer=',
 			'preserveEmptyOutputs',
+			'watch',
+			'changed-since=', 'changed-files=',
 			]
 
 
@@ -120,6 +127,8 @@ Execution options
    -v, --verbosity LEVEL       set the verbosity for most pysys logging (CRIT, WARN, INFO, DEBUG)
                    CAT=LEVEL   set the verbosity for a PySys/Python logging category e.g. -vassertions=, -vprocess=
    -y, --validateOnly, --vo    test the validate() method without re-running execute()
+       --watch                 after running the tests, keep watching their files (e.g. pysystest.py, Input/) and 
+                               re-run the affected tests whenever they change, until interrupted with Ctrl+C
    -h, --help                  print this message
  
    -Xkey[=value]               set user-defined override attributes to be set on the testcase and runner instances. The 
@@ -136,7 +145,19 @@ Advanced:
    --preserveEmptyOutputs      prevents the usual deletion of empty files and directories after a test completes
    --printLogs     STRING      indicates for which outcome types the run.log output will be printed to the stdout 
                                console; options are: all|none|failures (default is all).
-   -s, --sort      STRING      sort by: random (useful for performance testing and and reproducing test races)
+   -s, --sort      STRING      sort by: random (useful for performance testing and and reproducing test races), 
+                               or duration (run the tests that took longest in previous runs first, which 
+                               reduces the total time taken with multiple threads)
+   --workers       STRING      execute tests in: threads (the default) or processes (a separate Python process for 
+                               each of the --threads jobs, which avoids contention for the Python GIL when tests 
+                               do a lot of Python processing such as validation, but runner setup() state and 
+                               runner plugins are not available to tests)
+   --shard         NUM/NUM     execute only one shard of the selected tests, e.g. "--shard 3/8" for the third of 8 
+                               shards when splitting a test run across multiple machines. Shards are balanced using 
+                               the durations of previous runs (see --sort duration) if the same durations file is 
+                               available on each machine (the durations are recorded, but tests are only executed 
+                               longest-first if --sort duration is also specified). Use "pysys merge" to combine 
+                               the results afterwards
    -b, --abort     STRING      set the default abort on error property (true|false, overrides 
                                that specified in the project properties)
    -XcodeCoverage              enable collecting and reporting on code coverage with all coverage writers in the project
@@ -160,6 +181,12 @@ Selection and filtering options
    --modeexclude MyMode1,MyMode2,...
                                run tests excluding specified mode(s); excludes take precedence over includes
    -a, --type      STRING      set the test type to run (auto or manual, default is both)"
+       --changed-since GITREF  run only tests affected by files changed since the specified git branch or commit 
+                               (e.g. origin/main), including uncommitted and untracked files. As well as changes to 
+                               the test's own files, this uses the dependencies recorded by previous runs if the 
+                               testDependenciesFile project property is set
+       --changed-files FILE    run only tests affected by the changed files listed (one per line) in the specified 
+                               file, or "-" for stdin; an alternative to --changed-since for use without git
    -t, --trace     STRING      set the requirement id for the test run
 
 Test identifiers
@@ -369,10 +396,33 @@ To list the modes supported by the tests under the current directory, use "pysys
 
 			elif option in ("-s", "--sort"):
 				self.sort = value
-				if value not in ['random']:
-					print("The only supported sort type for pysys run is currently 'random'")
+				if value not in ['random', 'duration']:
+					print("The only supported sort types for pysys run are currently 'random' and 'duration'")
 					sys.exit(10)
 				
+			elif option == "--shard":
+				try:
+					self.shard = tuple(int(x) for x in value.split('/'))
+					if len(self.shard) != 2 or not 1 <= self.shard[0] <= self.shard[1]: raise ValueError()
+				except ValueError:
+					print("The --shard option must be of the form SHARD/SHARD_COUNT, for example 3/8")
+					sys.exit(10)
+
+			elif option == "--watch":
+				self.watch = True
+
+			elif option == "--changed-since":
+				self.changedSince = value
+
+			elif option == "--changed-files":
+				self.changedFiles = value
+
+			elif option == "--workers":
+				self.workers = value
+				if value not in ['threads', 'processes']:
+					print("The only supported worker types for pysys run are 'threads' and 'processes'")
+					sys.exit(10)
+
 			else:
 				print("Unknown option: %s"%option)
 				sys.exit(1)
@@ -393,7 +443,9 @@ To list the modes supported by the tests under the current directory, use "pysys
 			'progressWritersEnabled':self.progress,
 			'printLogs': printLogs,
 			'printLogsDefault': printLogsDefault, # to use if not provided by a CI writer or cmdline
-			'sort': self.sort
+			'sort': self.sort,
+			'workers': self.workers,
+			'shard': self.shard,
 		})
 		
 		# load project AFTER we've parsed the arguments, which opens the possibility of using cmd line config in 
@@ -413,6 +465,16 @@ To list the modes supported by the tests under the current directory, use "pysys
 			regex = re.compile(self.grep, flags=re.IGNORECASE)
 			descriptors = [d for d in descriptors if (regex.search(d.id) or regex.search(d.title))]
 		
+		if self.changedSince or self.changedFiles:
+			from pysys.internal import testdependencies
+			project = Project.getInstance()
+			changedFiles = set()
+			if self.changedSince: changedFiles |= testdependencies.getChangedFilesFromGit(self.changedSince, self.workingDir)
+			if self.changedFiles: changedFiles |= testdependencies.getChangedFilesFromList(self.changedFiles, self.workingDir)
+			dependenciesFile = project.expandProperties(project.getProperty('testDependenciesFile', ''))
+			descriptors = testdependencies.selectChangedTests(descriptors, changedFiles, project, 
+				testdependencies.TestDependencyMap(os.path.normpath(os.path.join(project.testRootDir, dependenciesFile))) if dependenciesFile else None)
+
 		return self.record, self.purge, self.cycle, None, self.threads, self.outsubdir, descriptors, self.userOptions
 
 def decideWorkerThreads(threads: str):
@@ -447,8 +509,14 @@ def runTest(args):
 		args = list(args)
 		args[4] = decideWorkerThreads(args[4])
 		
-		runner = getattr(module, cls[-1])(*args)
+		runnerClass = getattr(module, cls[-1])
+		if launcher.watch:
+			from pysys.internal.watcher import TestWatcher
+			watcher = TestWatcher(launcher, runnerClass, args)
+
+		runner = runnerClass(*args)
 		runner.start()
+		if launcher.watch: runner = watcher.watch(runner)
 	
 		for cycledict in runner.results.values():
 			for outcome in OUTCOMES:
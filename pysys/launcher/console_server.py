@@ -0,0 +1,111 @@
+# PySys System Test Framework, Copyright (C) 2006-2022 M.B. Grieve
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+
+"""
+:meta private: Not part of the PySys API.
+"""
+
+import os.path, getopt, importlib, logging, traceback, sys
+
+from pysys import log
+from pysys import __version__
+from pysys.constants import *
+from pysys.exceptions import UserError
+from pysys.config.project import Project
+
+class ConsoleServerHelper(object):
+	def __init__(self, workingDir, name=""):
+		self.workingDir = workingDir
+		self.name = name
+		self.socket = os.getenv('PYSYS_SERVER') or None
+		self.optionString = 'hs:'
+		self.optionList = ["help", "socket="]
+
+	def printUsage(self):
+		_PYSYS_SCRIPT_NAME = os.path.basename(sys.argv[0]) if '__main__' not in sys.argv[0] else 'pysys.py'
+		print("\nPySys System Test Framework (version %s): Server for faster test runs" % __version__) 
+		print("\nUsage: %s %s [option]*" % (_PYSYS_SCRIPT_NAME, self.name))
+		print("""
+Starts a long-lived server process that makes "pysys run" start much faster, which is especially useful when 
+repeatedly running one or a few tests during development. The server keeps PySys, the project's Python modules and 
+the descriptor index (if configured with the descriptorIndexFile property) loaded, and executes each "pysys run" in a 
+new child process forked from it. 
+
+To use the server, set the PYSYS_SERVER environment variable to its socket path before running "pysys run". The 
+output is written directly to the "pysys run" console. If the server is not running, "pysys run" executes the tests 
+itself as usual. The server should be started from the project directory with the same environment as 
+"pysys run", and restarted after changing the project configuration or its Python modules. 
+
+This command is not available on Windows. 
+
+   where [option] includes:
+       -s | --socket    PATH       the Unix domain socket to listen on (default is the value of PYSYS_SERVER)
+       -h | --help                 print this message
+""".rstrip())
+		sys.exit()
+
+	def parseArgs(self, args):
+		try:
+			optlist, arguments = getopt.gnu_getopt(args, self.optionString, self.optionList)
+		except Exception:
+			log.warning("Error parsing command line arguments: %s" % (sys.exc_info()[1]))
+			sys.exit(1)
+
+		for option, value in optlist:
+			if option in ("-h", "--help"):
+				self.printUsage()
+
+			elif option in ("-s", "--socket"):
+				self.socket = value
+
+			else:
+				print("Unknown option: %s"%option)
+				sys.exit(1)
+		if arguments: raise UserError('Unexpected arguments: %s'%' '.join(arguments))
+		if not self.socket: raise UserError('Please specify the socket path with --socket or the PYSYS_SERVER environment variable')
+		if IS_WINDOWS: raise UserError('The PySys server is not supported on Windows')
+
+	def serve(self):
+		from pysys.internal.server import serve
+		import pysys.utils.allocport
+		from pysys.internal.descriptorindex import DescriptorIndex
+
+		project = Project.findAndLoadProject()
+		# import the modules "pysys run" needs, so each request does not have to
+		import pysys.launcher.console, pysys.baserunner, pysys.basetest, pysys.internal.descriptorpool
+		importlib.import_module(project.runnerClassname.rsplit('.', 1)[0])
+		indexFile = project.expandProperties(project.getProperty('descriptorIndexFile', ''))
+		if indexFile: indexFile = os.path.normpath(os.path.join(project.testRootDir, indexFile))
+
+		def prepare(afterFork):
+			if indexFile: DescriptorIndex.preload(indexFile)
+			# each request needs a new random order, which is created in advance since shuffling is slow
+			if afterFork or pysys.utils.allocport._nextPortPool is None:
+				pysys.utils.allocport._nextPortPool = pysys.utils.allocport._createPortPool()
+
+		serve(os.path.abspath(self.socket), prepare)
+
+def startServer(args):
+	try:
+		server = ConsoleServerHelper(os.getcwd(), "server")
+		server.parseArgs(args)
+		server.serve()
+	except KeyboardInterrupt:
+		pass
+	except Exception as e:
+		sys.stderr.write('\nERROR: %s\n' % e)
+		if not isinstance(e, UserError): traceback.print_exc()
+		sys.exit(10)
@@ -328,7 +328,7 @@ class JoinLines(object):
 					yield lineEndingSafeCombiner(buffer)
 		self.__generatorFunction = generatorFunction
 	
-	def __repr__(self): return __str
+	def __repr__(self): return self.__str
 	def __call__(self, iterator): 
 		for x in self.__generatorFunction(iterator): yield x
 
@@ -625,8 +625,7 @@ def applyMappers(iterator, mappers):
 	# strip out any noop (None) mappers
 	if None in mappers: mappers = [m for m in mappers if m]
 	
-	# isgeneratorfunction handles both function generators, and functor classes with a __call__ method that's a generator
-	def isgeneratorfunction(m):	return inspect.isgeneratorfunction(m) or inspect.isgeneratorfunction(m.__call__)
+	isgeneratorfunction = _isGeneratorMapper
 	
 	# if there are any generator functions we need to be recursive
 	if any(isgeneratorfunction(m) for m in mappers):
@@ -657,6 +656,11 @@ def applyMappers(iterator, mappers):
 				
 				yield l
 
+def _isGeneratorMapper(m):
+	# Internal helper, not public API, do not use
+	# isgeneratorfunction handles both function generators, and functor classes with a __call__ method that's a generator
+	return inspect.isgeneratorfunction(m) or inspect.isgeneratorfunction(m.__call__)
+
 def _preserveNewlines(orig, newstring):
 	# for now ignore \r's
 	if newstring.endswith('\n'): return newstring # nothing to do
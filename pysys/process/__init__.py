@@ -74,6 +74,9 @@ class Process(object):
 	:ivar ProcessUser ~.owner: The owner object that is running this process. 
 	:ivar int ~.exitStatus: The process exit status for a completed process (for many processes 0 represents success), 
 		or None if it has not yet completed. 
+	:ivar float ~.exitTime: The time (as returned by ``time.time()``) when PySys detected that the process had 
+		terminated, or None if it has not yet completed. Since background processes are reaped as soon as they exit, 
+		this is usually very close to the actual time of termination. Added in PySys 2.3. 
 	:ivar dict[str,obj] ~.info: A mutable dictionary of user-supplied information that was passed into startProcess, 
 		for example port numbers, log file paths etc. 
 	"""
@@ -88,8 +91,7 @@ class Process(object):
 			arguments = [str(arg) for arg in arguments]
 		self.arguments = arguments
 		
-		self.environs = {}
-		for key in environs: self.environs[key] = environs[key]
+		self.environs = dict(environs)
 		self.workingDir = os.path.normpath(workingDir)
 		self.state = state
 		self.timeout = timeout
@@ -99,6 +101,7 @@ class Process(object):
 		# 'publicly' available data attributes set on execution
 		self.pid = None
 		self.exitStatus = None
+		self.exitTime = None
 		
 		# these may be further updated by the subclass
 		self.stdout = stdout
@@ -108,8 +111,17 @@ class Process(object):
 		assert os.path.isdir(self.workingDir), 'Working directory for %s does not exist: %s'%(self.displayName, self.workingDir)
 		if self.stdout: assert os.path.dirname(self.stdout)==self.workingDir or os.path.isdir(os.path.dirname(self.stdout)), 'Parent directory for stdout does not exist: %s'%self.stdout
 
-		# print process debug information
-		
+		# print process debug information (only if it will be logged, since this is expensive for large environments)
+		if log.isEnabledFor(logging.DEBUG): self.__logDebugInfo()
+
+		# private
+		self._outQueue = None
+		self._capturedOutputs = {} # key=stdout/stderr path, value=CapturedOutput, for inMemoryOutput=True
+
+		self._pollWait = time.sleep if self.owner is None else self.owner.pollWait
+
+
+	def __logDebugInfo(self):
 		debuginfo = []
 
 		if IS_WINDOWS or not hasattr(shlex, 'quote'):
@@ -122,8 +134,8 @@ class Process(object):
 		debuginfo.append("  working dir  : %s"% self.workingDir)
 		if IS_WINDOWS and len(self.workingDir) > 256-30:
 			debuginfo.append("    NB: length of working dir is %d (Windows MAX_PATH limit is 256 chars)" % len(self.workingDir))
-		debuginfo.append("  stdout       : %s"% stdout)
-		debuginfo.append("  stderr       : %s"% stderr)
+		debuginfo.append("  stdout       : %s"% self.stdout)
+		debuginfo.append("  stderr       : %s"% self.stderr)
 		keys=list(self.environs.keys())
 		keys.sort()
 		defaultenv = []
@@ -141,16 +153,10 @@ class Process(object):
 						#                         : ABC=def
 						debuginfo.append("                   #%-2d %s"%( i+1, pathelement))
 		if defaultenv: debuginfo.append("  environment  : +inherited default environment variables: %s"%( ', '.join(defaultenv)) )
-		if info: debuginfo.append("  info         : %s"% info)
+		if self.info: debuginfo.append("  info         : %s"% self.info)
 
 		log.debug("Process parameters for %s\n%s", self, '\n'.join(d for d in debuginfo))
 
-		# private
-		self._outQueue = None
-
-		self._pollWait = time.sleep if self.owner is None else self.owner.pollWait
-
-
 	def __str__(self): return self.displayName
 	def __repr__(self): return '%s (pid %s)'%(self.displayName, self.pid)
 
@@ -280,6 +286,11 @@ class Process(object):
 			if doneLongWaitLogging is False and time.monotonic()-startTime>4:
 				log.info("Waiting up to %d secs for process %r", timeout, self) # probably would be confusing to adjust this timeout based on time already waited
 				doneLongWaitLogging = True
+
+		# make sure all output written before the process terminated has been captured, unless a child process 
+		# is keeping the pipe open
+		for captured in self._capturedOutputs.values():
+			captured.waitUntilClosed(timeout=1.0)
 		
 	def _pollWaitUnlessProcessTerminated(self):
 		# Performs a short wait, but if the OS support it (e.g. Windows), abort waiting if the process is terminated
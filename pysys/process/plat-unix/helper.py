@@ -28,7 +28,6 @@ correct modules based on their current operation system.
 """
 
 import signal, time, copy, errno, threading, sys
-import select
 import queue as Queue
 
 from pysys import log
@@ -36,6 +35,8 @@ from pysys import process_lock
 from pysys.constants import *
 from pysys.exceptions import *
 from pysys.process import Process
+from pysys.internal.processreaper import ProcessReaper
+from pysys.internal.outputcapture import OutputReader
 import pysys.process.user as processuser # can't import ProcessUser class itself without circular dependency
 
 PYSYS_DISABLE_PROCESS_GROUP_CLEANUP = os.getenv('PYSYS_DISABLE_PROCESS_GROUP_CLEANUP','').lower()=='true' # undocumented option for disabling this when executed within another framework
@@ -96,15 +97,17 @@ class ProcessImpl(Process):
 
 		# private instance variables
 		self.__lock = threading.Lock() # to protect access to the fields that get updated while process is running
-		self.pidfd = None
+		self._reaper = None
+		self._stdin = None # the write end of the stdin pipe
 
 	def _writeStdin(self, data):
 		with self.__lock:
-			if not self.__stdin: return
+			if not self._stdin: return
 			if data is None:
-				os.close(self.__stdin)
+				os.close(self._stdin)
+				self._stdin = None # MUST not close this more than once, since the fd number may have been reused
 			else:
-				os.write(self.__stdin, data)	
+				os.write(self._stdin, data)	
 	
 
 	def startBackgroundProcess(self):
@@ -115,6 +118,8 @@ class ProcessImpl(Process):
 
 			try:
 				stdin_r, stdin_w = os.pipe()
+				# for inMemoryOutput=True, a pipe for each distinct stdout/stderr path, which is read by the output reader thread
+				capturePipes = {path: os.pipe() for path in self._capturedOutputs}
 				self.pid = os.fork()
 
 				if self.pid == 0: # pragma: no cover
@@ -129,8 +134,8 @@ class ProcessImpl(Process):
 					os.dup2(stdin_r, 0)
 
 					# create and duplicate stdout and stderr to open file handles
-					stdout_w = os.open(self.stdout, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
-					stderr_w = os.open(self.stderr, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+					stdout_w = capturePipes[self.stdout][1] if self.stdout in capturePipes else os.open(self.stdout, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+					stderr_w = capturePipes[self.stderr][1] if self.stderr in capturePipes else os.open(self.stderr, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
 					os.dup2(stdout_w, 1)
 					os.dup2(stderr_w, 2)
 
@@ -149,14 +154,23 @@ class ProcessImpl(Process):
 					# close the read end of the pipe in the parent
 					# and start a thread to write to the write end
 					os.close(stdin_r)
-					self.__stdin = stdin_w
+					self._stdin = stdin_w
 
+					for path, (capture_r, capture_w) in capturePipes.items():
+						os.close(capture_w)
+						self._capturedOutputs[path].register()
+						OutputReader.getInstance().register(capture_r, self._capturedOutputs[path])
+
+					pidfd = None
 					try:
 						if hasattr(os, 'pidfd_open'): # only in Python 3.9+ and Linux kernel 5.3+ (e.g. RHEL9)
-							self.pidfd = os.pidfd_open(self.pid)
-							if self.pidfd == -1: self.pidfd = None
+							pidfd = os.pidfd_open(self.pid)
+							if pidfd == -1: pidfd = None
 					except Exception as ex:
 						log.debug('Failed to call os.pidfd_open: %r', ex)
+					# a single thread watches all processes, waking up any waiters as soon as each one terminates
+					self._reaper = ProcessReaper.getInstance()
+					self._reaper.register(self, pidfd, abortHandle=processuser.ProcessUser.isRunnerAbortingHandle)
 			except Exception as ex:
 				if self.pid == 0: 
 					sys.stderr.write('Failed with: %s\n'%ex)
@@ -168,26 +182,41 @@ class ProcessImpl(Process):
 
 
 	def _pollWaitUnlessProcessTerminated(self):
-		# While waiting for process to terminate, modern Linux kernels (5.3+) give us a way to block for completion without polling, so we 
-		# can use a larger timeout to avoid wasting time in the Python GIL (but not so large as to stop us from checking for abort
+		# Blocks until the reaper thread records that this process has terminated (or the runner is aborting), using 
+		# a timeout so that the caller can regularly check its own timeout
 		owner = self.owner
 		ProcessUser = processuser.ProcessUser
-		if self.pidfd and ProcessUser.isRunnerAbortingHandle:
-			if owner is not None and ProcessUser.isRunnerAborting is True and owner.isCleanupInProgress is False: raise KeyboardInterrupt()
-
-			waitobjects = [ ProcessUser.isRunnerAbortingHandle, self.pidfd]
+		if self._reaper is None: # e.g. if start was interrupted
+			self._pollWait(0.05)
+			return
 
-			pollTimeoutMillis = 3000
-			if select.select(waitobjects, [], [], pollTimeoutMillis/1000.0)[0]: # if objects were signalled or got anything other than timeout/block, something was signalled so we won't be doing this again
-				with self.__lock:
-					# this is a fail-safe to ensure we do not spin calling select if some unexpected error occurred OR if we've been interrupt-terminated but are executing cleanup
-					if self.pidfd: os.close(self.pidfd)
-					self.pidfd = None
+		abortable = owner is not None and owner.isCleanupInProgress is False
+		if abortable and ProcessUser.isRunnerAborting is True: raise KeyboardInterrupt()
+		self._reaper.wait([self], timeout=3.0, abortable=abortable)
+		if abortable and ProcessUser.isRunnerAborting is True: raise KeyboardInterrupt()
 
-			if owner is not None and processuser.ProcessUser.isRunnerAborting is True and owner.isCleanupInProgress is False: raise KeyboardInterrupt()
-			return
-		
-		self._pollWait(0.05) # fallback to a fixed sleep to avoid spinning if an unexpected return code is returned
+	def _pollExitStatus(self):
+		# Returns the exit status if the process has terminated, or None if not. Called with the lock held. 
+		exitStatus = None
+		retries = 3
+		while retries > 0:	
+			try:
+				pid, status = os.waitpid(self.pid, os.WNOHANG)
+				if pid == self.pid:
+					if os.WIFEXITED(status):
+						exitStatus = os.WEXITSTATUS(status)
+					elif os.WIFSIGNALED(status):
+						exitStatus = os.WTERMSIG(status)
+					else:
+						exitStatus = status
+				retries=0
+			except OSError as e: # pragma: no cover
+				if e.errno == errno.ECHILD:
+					time.sleep(0.01)
+					retries=retries-1
+				else:
+					retries=0
+		return exitStatus
 
 	def setExitStatus(self):
 		"""Tests whether the process has terminated yet, and updates and returns the exit status if it has. 
@@ -195,35 +224,16 @@ class ProcessImpl(Process):
 		with self.__lock:
 			if self.exitStatus is not None: return self.exitStatus
 	
-			retries = 3
-			while retries > 0:	
-				try:
-					pid, status = os.waitpid(self.pid, os.WNOHANG)
-					if pid == self.pid:
-						if os.WIFEXITED(status):
-							self.exitStatus = os.WEXITSTATUS(status)
-						elif os.WIFSIGNALED(status):
-							self.exitStatus = os.WTERMSIG(status)
-						else:
-							self.exitStatus = status
-						self._outQueue = None
-					retries=0
-				except OSError as e: # pragma: no cover
-					if e.errno == errno.ECHILD:
-						time.sleep(0.01)
-						retries=retries-1
-					else:
-						retries=0
+			exitStatus = self._pollExitStatus()
 			
-			if self.exitStatus != None:
-				if self.__stdin:
-					try: os.close(self.__stdin)
+			if exitStatus != None:
+				self.exitTime = time.time() # set before exitStatus so it's available as soon as the process is seen to have exited
+				self.exitStatus = exitStatus
+				self._outQueue = None
+				if self._stdin:
+					try: os.close(self._stdin)
 					except Exception: pass # just being conservative, should never happen
-					self.__stdin = None # MUST not close this more than once
-				if self.pidfd: 
-					os.close(self.pidfd)
-					self.pidfd = None
-
+					self._stdin = None # MUST not close this more than once
 			
 			return self.exitStatus
 
@@ -287,6 +287,7 @@ class ProcessImpl(Process):
 					log.warning('Could not close process and thread handles for process %s: %s', self.pid, e) 
 				self.__stdin = self.__hThread = self.__hProcess = None
 				self._outQueue = None
+				self.exitTime = time.time()
 				self.exitStatus = exitStatus
 			
 			return self.exitStatus
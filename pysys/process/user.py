@@ -32,7 +32,9 @@ import tarfile
 from pysys import log, process_lock
 from pysys.constants import *
 from pysys.exceptions import *
-from pysys.utils.filegrep import getmatches
+from pysys.utils.filegrep import getmatches, getmultimatches, FileTailer
+from pysys.utils.filewatch import FileChangeMonitor, FileChangeWaiter
+from pysys.internal.outputcapture import CapturedOutput, getCapturedOutput
 from pysys.utils.logutils import BaseLogFormatter, stripANSIEscapeCodes
 from pysys.config.project import Project
 from pysys.utils.allocport import TCPPortOwner
@@ -166,6 +168,10 @@ class ProcessUser(object):
 		
 		self.__uniqueProcessKeys = {}
 		self.__pythonCoverageFile = 0
+		self.__fileTailers = {} # (path, encoding, encodingReplaceOnError): FileTailer
+		self.__fileChangeMonitor = None # shared by all waits on files, to avoid using an inotify instance per file
+		self.__defaultEnvironsTempDir = None # (expression, path)
+		self._copiedSources = set() # used for recording test dependencies
 		
 		self.disableCoverage = False
 		
@@ -194,6 +200,15 @@ class ProcessUser(object):
 		.. versionadded:: 2.2
 		"""
 
+		self.inMemoryOutputMaxBytes = 1024*1024
+		"""
+		The maximum number of bytes of stdout (and of stderr) to hold in memory for each process started with 
+		``startProcess(inMemoryOutput=True)``, before the output is written to its file instead. 
+		
+		.. versionadded:: 2.3
+		"""
+		self.__capturedOutputs = []
+
 	def _initThreadPoolMaxWorkers(self, pysysThreads):
 		# In theory allow this to be influenced by pysysThreads, but for now we pick a single value since regardless of the number of pysys threads 
 		# a smaller number of threads make the pooling useless for I/O bound operations like HTTP requests (the main use case) and 
@@ -286,7 +301,7 @@ class ProcessUser(object):
 		if val is True or val is False: return val
 		return val.lower()=='true'
 
-	def startPython(self, arguments, disableCoverage=False, **kwargs):
+	def startPython(self, arguments, disableCoverage=False, reuseInterpreter=False, **kwargs):
 		"""
 		Start a Python process with the specified arguments. 
 		
@@ -306,9 +321,21 @@ class ProcessUser(object):
 		:param disableCoverage: Disables code coverage for this specific 
 			process. Coverage can also be disabled by setting 
 			``self.disableCoverage==True`` on this test instance. 
+		:param bool reuseInterpreter: Set to True to run the script in a process forked from a long-lived Python 
+			worker server, which has already started the interpreter and imported commonly used standard library 
+			modules (and coverage.py, if installed). This is much faster than starting a new interpreter, so is useful 
+			for tests that run many small Python scripts. The returned process behaves in the same way as any other 
+			(including its exit status, ``stop()``, stdin and timeouts), but the script may see modules in 
+			``sys.modules`` that it did not import itself. A separate server is started for each distinct set of 
+			environment variables that affect interpreter startup (such as ``PYTHONPATH`` and ``LANG``). 
+			This is only supported on Unix, when the arguments consist of a script, ``-m module`` or ``-c command`` 
+			followed by the script's arguments, and no ``processFactory`` is specified; otherwise this parameter is 
+			ignored. 
 		:return: The process handle of the process.
 		:rtype: pysys.process.Process
 		
+		.. versionchanged:: 2.3
+			Added ``reuseInterpreter`` parameter. 
 		"""
 		args = arguments
 		if 'environs' in kwargs:
@@ -324,12 +351,19 @@ class ProcessUser(object):
 				with self.lock:
 					self.__pythonCoverageFile += 1
 				kwargs['environs']['COVERAGE_FILE'] = self.output+'/.coverage.python.%02d'%(self.__pythonCoverageFile)
+
+		if reuseInterpreter and not IS_WINDOWS and kwargs.get('processFactory') is None:
+			from pysys.internal.pythonworkers import canReuseInterpreter, PythonWorkerProcessImpl
+			if canReuseInterpreter(args):
+				kwargs['processFactory'] = PythonWorkerProcessImpl
+			else:
+				self.log.debug('Cannot use reuseInterpreter for Python arguments: %s', args)
 		return self.startProcess(sys.executable, arguments=args, **kwargs)
 
 	def startProcess(self, command, arguments, environs=None, workingDir=None, state=None, 
 			timeout=TIMEOUTS['WaitForProcess'], stdout=None, stderr=None, displayName=None, 
 			abortOnError=None, expectedExitStatus='==0', ignoreExitStatus=None, onError=None, quiet=False, stdouterr=None, 
-			background=False, info={}, processFactory=None):
+			background=False, info={}, processFactory=None, inMemoryOutput=False):
 		"""Start a process running in the foreground or background, and return 
 		the `pysys.process.Process` object.
 		
@@ -367,6 +401,8 @@ class ProcessUser(object):
 			Added info parameter. 
 		.. versionchanged:: 2.0
 			Added processFactory parameter.
+		.. versionchanged:: 2.3
+			Added inMemoryOutput parameter.
 
 		:param str command: The path to the executable to be launched (should include the full path)
 		:param list[str] arguments: A list of arguments to pass to the command. Any non-string values in the list are 
@@ -462,6 +498,17 @@ class ProcessUser(object):
 					kwargs['arguments'] = kwargs['arguments'][0]+['my_extra_arg']+kwargs['arguments'][1:]
 					return pysys.process.helper.ProcessImpl(**kwargs)
 
+		:param bool inMemoryOutput: Set to True to capture the stdout and stderr of the process in memory instead of 
+			writing them to the ``stdout``/``stderr`` files. This avoids the cost of file I/O and a cluttered output 
+			directory when running a tool that produces a lot of output many times, for example in a loop. 
+			The methods of this class that read files (such as `waitForGrep`, `assertGrep <pysys.basetest.BaseTest.assertGrep>`, 
+			`getExprFromFile`, `grep` and `logFileContents`) transparently read the in-memory output when passed 
+			the ``stdout``/``stderr`` path of the process, but other code (including the process itself or Python's 
+			``open()``) cannot see it. The output is written to the file if it grows larger than 
+			``self.inMemoryOutputMaxBytes`` (after which further output is appended to the file), or if the 
+			test does not pass, so that it is available for triaging failures. Output from a passed test is discarded. 
+			This is only supported on Unix; on Windows this parameter is ignored. 
+
 		:return: The process object.
 		:rtype: pysys.process.Process
 
@@ -506,6 +553,11 @@ class ProcessUser(object):
 		process = processFactory(command=command, arguments=arguments, environs=environs, workingDir=workingDir, 
 			state=state, timeout=timeout, stdout=stdout, stderr=stderr, 
 			displayName=displayName, expectedExitStatus=expectedExitStatus, info=info, owner=self)
+		if inMemoryOutput and not IS_WINDOWS:
+			process._capturedOutputs = {path: CapturedOutput(path, self.inMemoryOutputMaxBytes) 
+				for path in {process.stdout, process.stderr} if path and path != os.devnull}
+			with self.lock:
+				self.__capturedOutputs.extend(process._capturedOutputs.values())
 		
 		def handleErrorAndGetOutcomeSuffix(process):
 			if onError: 
@@ -631,6 +683,10 @@ class ProcessUser(object):
 			kwargs down to the super implementation, to allow for future extensions. 
 		
 		:return: A new dictionary containing the environment variables. 
+
+		.. versionchanged:: 2.3
+			The environment variables that come from the project (and the parent environment) are now computed only 
+			once per project, rather than on every call. 
 		"""
 		
 		assert not kwargs, 'Unknown keyword arguments: %s'%kwargs.keys()
@@ -643,22 +699,40 @@ class ProcessUser(object):
 			else:
 				return {}
 
+		# The project-wide part of the environment is the same for every test, so is computed once per project and 
+		# command type, and copied for each caller. The parent library path that is inherited when starting Python is 
+		# part of the key in case it is changed after the first call. 
+		isPython = command == sys.executable
+		cacheKey = (self.project, isPython, os.environ.get(LIBRARY_PATH_ENV_VAR) if isPython else None)
+		e = ProcessUser.__defaultEnvironsCache.get(cacheKey)
+		if e is None:
+			e = self.__createProjectDefaultEnvirons(isPython)
+			ProcessUser.__defaultEnvironsCache[cacheKey] = e
+		e = dict(e)
+
+		# allows setting TEMP to output dir to avoid contamination/filling up of system location; set to blank to do nothing
+		if self.project.getProperty('defaultEnvironsTempDir',''):
+			# evaluated once per instance (typically the value is self.output, which does not change)
+			if self.__defaultEnvironsTempDir is None or self.__defaultEnvironsTempDir[0] != self.project.defaultEnvironsTempDir:
+				tempDir = pysys.utils.safeeval.safeEval(self.project.defaultEnvironsTempDir, extraNamespace={'self':self})
+				self.__defaultEnvironsTempDir = (self.project.defaultEnvironsTempDir, os.path.normpath(tempDir))
+			tempDir = self.__defaultEnvironsTempDir[1]
+			self.mkdir(tempDir) # on each call (which is cheap if it exists already), in case the test has deleted it
+			if IS_WINDOWS: # pragma: no cover
+				e['TEMP'] = e['TMP'] = tempDir
+			else:
+				e['TMPDIR'] = tempDir
+		return e
+
+	__defaultEnvironsCache = {} # key=(project, isPython, parent library path), value=environs dict which must not be modified
+
+	def __createProjectDefaultEnvirons(self, isPython):
 		e = {}
 
 		for k, v in self.project.properties.items():
 			if k.startswith('defaultEnvirons.') and v:
 				e[k[k.find('.')+1:]] = v
 
-		# allows setting TEMP to output dir to avoid contamination/filling up of system location; set to blank to do nothing
-		if self.project.getProperty('defaultEnvironsTempDir',''):
-			tempDir = pysys.utils.safeeval.safeEval(self.project.defaultEnvironsTempDir, extraNamespace={'self':self})
-			
-			self.mkdir(tempDir)
-			if IS_WINDOWS: # pragma: no cover
-				e['TEMP'] = e['TMP'] = os.path.normpath(tempDir)
-			else:
-				e['TMPDIR'] = os.path.normpath(tempDir)
-	
 		inherited = [] 
 		# env vars where it is safe and useful to inherit parent values
 		# avoid anything user-specific or that might cause tests to store data 
@@ -691,7 +765,7 @@ class ProcessUser(object):
 			if getattr(self.project, 'defaultEnvironsDefaultLang',''):
 				e['LANG'] = self.project.defaultEnvironsDefaultLang
 		
-		if command == sys.executable:
+		if isPython:
 			# Ensure it's possible to run another instance of this Python, by adding it to the start of the path env vars
 			# (but only if full path to the Python executable exactly matches).
 			# Keep it as clean as possible by not passing sys.path/PYTHONPATH
@@ -909,6 +983,14 @@ class ProcessUser(object):
 		# may need to execute processes
 		if self.isRunnerAborting is True and self.isCleanupInProgress is False: raise KeyboardInterrupt()
 
+	def __pollWaitForChange(self, waiter, secs):
+		# Like pollWait, but returns as soon as the file being watched by the specified FileChangeWaiter changes (if supported)
+		if not waiter.isEventDriven or (self.isRunnerAborting is True and self.isCleanupInProgress is True):
+			# nb: once we're aborting, the abort handle remains signalled so we must not use it to wait during cleanup
+			return self.pollWait(secs)
+		waiter.wait(secs)
+		if self.isRunnerAborting is True and self.isCleanupInProgress is False: raise KeyboardInterrupt()
+
 	def waitForBackgroundProcesses(self, includes=[], excludes=[], timeout=TIMEOUTS['WaitForProcess'], abortOnError=None, checkExitStatus=True):
 		"""Wait for any running background processes to terminate, then check that all background processes 
 		completed with the expected exit status.
@@ -941,6 +1023,10 @@ class ProcessUser(object):
 		
 		running = [p for p in includes if p.state==BACKGROUND and p.running() and p not in excludes]
 		self.log.info('Waiting up to %d secs for %d background process(es) to complete', timeout, len(running))
+		reapers = {getattr(p, '_reaper', None) for p in running}
+		if len(reapers) == 1 and None not in reapers: 
+			# on Unix a single blocking call can wait for all of them, rather than waking up for each one in turn
+			reapers.pop().wait(running, timeout=timeout, abortable=not self.isCleanupInProgress)
 		for p in running:
 			try:
 				thistimeout = starttime+timeout-time.monotonic()
@@ -968,6 +1054,127 @@ class ProcessUser(object):
 				self.addOutcome(BLOCKED, ('%d processes failed: '%len(failures) if len(failures)>1 else 'Process ')+'; '.join(failures), abortOnError=abortOnError)
 		(self.log.info if (time.monotonic()-starttime>10) else self.log.debug)('All processes completed, after waiting %d secs'%(time.monotonic()-starttime))
 
+	def startProcesses(self, processes, readiness=None, timeout=TIMEOUTS['WaitForSignal'], poll=0.1, abortOnError=None):
+		"""Start a group of background processes, and wait until all of them are ready, checking the readiness of all
+		the processes in parallel.
+
+		This is much faster than calling `startProcess` and then `waitForGrep` or `waitForSocket` for each process in
+		turn, since the total time taken is the startup time of the slowest process rather than the sum of all the
+		startup times. For example, to start a cluster of servers::
+
+			servers = self.startProcesses([
+					dict(command=self.project.appHome+'/my_server.sh', arguments=['--port', str(port)],
+						stdouterr='my_server%d'%i, info={'port':port})
+					for i, port in enumerate(self.getNextAvailableTCPPort() for _ in range(20))
+				],
+				readiness=lambda process: process.info['port'])
+
+		As soon as any process terminates or fails to start, this method stops waiting and adds a single BLOCKED outcome
+		whose reason describes all the processes that failed by then, rather than waiting for the remaining processes.
+		The last few lines of the stderr (or stdout) of each process that terminated are logged. If the timeout expires
+		first, a TIMEDOUT outcome is added describing the processes that were not yet ready.
+
+		.. versionadded:: 2.3
+
+		:param list[dict[str,obj]] processes: A list of dictionaries, each containing the keyword arguments to pass to
+			`startProcess` for one process, for example ``dict(command=..., arguments=[...], stdouterr=...)``.
+			The processes are always started in the background. Each dictionary can also contain a ``readiness`` key,
+			which overrides the ``readiness`` parameter for that process.
+
+		:param readiness: The condition that indicates a process is ready, which can be:
+
+			- a ``str`` regular expression to look for in the stdout of the process (as for `waitForGrep`),
+			- an ``int`` TCP server port on localhost that must be accepting connections (as for `waitForSocket`),
+			- a callable that is passed the process and returns the condition (as a ``str`` or ``int``) for that
+			  process, or a ``bool`` (True when ready) if it is a custom check such as
+			  ``lambda process: os.path.exists(process.info['pidFile'])``. A callable that returns a bool is called
+			  every ``poll`` seconds, so should be quick,
+			- a list of any of the above, all of which must be satisfied,
+			- None if the processes can be used as soon as they are started.
+
+		:param int timeout: The total time in seconds to wait for all processes to be ready.
+		:param float poll: The time in seconds between checks of the readiness conditions.
+		:param bool abortOnError: If True abort the test on any error outcome (defaults to the defaultAbortOnError
+			project setting). This is also used for starting the processes, unless ``abortOnError`` is specified
+			for an individual process.
+
+		:return: The process objects, in the same order as ``processes``.
+		:rtype: list[pysys.process.Process]
+		"""
+		if abortOnError == None: abortOnError = self.defaultAbortOnError
+		started = []
+		for kwargs in processes:
+			kwargs = dict(kwargs)
+			processReadiness = kwargs.pop('readiness', readiness)
+			kwargs['background'] = True
+			kwargs.setdefault('abortOnError', abortOnError)
+			started.append((self.startProcess(**kwargs), processReadiness))
+
+		starttime = time.monotonic()
+		pending = {}
+		followers = [] # (tailer, follower) for grep conditions
+		try:
+			for process, processReadiness in started:
+				conditions = []
+				for condition in (processReadiness if isinstance(processReadiness, list) else [processReadiness]):
+					if condition is None: continue
+					if callable(condition):
+						value = condition(process)
+						if not isinstance(value, bool) and value is not None: condition = value
+					if isstring(condition):
+						tailer = self.__getFileTailer(process.stdout, self.getDefaultFileEncoding(process.stdout), False)
+						follower = tailer.follow(condition)
+						followers.append((tailer, follower))
+						conditions.append(('%s in %s'%(quotestring(condition), os.path.basename(process.stdout)),
+							lambda tailer=tailer, follower=follower: tailer.poll() and len(follower.getMatches()) > 0))
+					elif isinstance(condition, int) and not isinstance(condition, bool):
+						conditions.append(('socket on port %d'%condition, lambda port=condition: self.__isSocketReady(port)))
+					else:
+						conditions.append(('readiness check', lambda process=process, condition=condition: bool(condition(process))))
+				if conditions: pending[process] = conditions
+
+			if pending:
+				self.log.info('Waiting up to %d secs for %d process(es) to be ready', timeout, len(pending))
+			failures, notReady = [], [] # processes that terminated, and those that were still pending on timeout
+			while pending:
+				for process, conditions in list(pending.items()):
+					if not process.running():
+						self.logFileContents(process.stderr, tail=True) or self.logFileContents(process.stdout, tail=True)
+						failures.append('%s terminated with exit status %s while waiting for %s'%(process, process.exitStatus,
+							', '.join(description for description, check in conditions)))
+						del pending[process]
+						continue
+					conditions[:] = [(description, check) for (description, check) in conditions if not check()]
+					if not conditions:
+						log.debug('Process %s is ready after %0.1f secs', process, time.monotonic()-starttime)
+						del pending[process]
+				if failures: break # fail fast
+				if pending and time.monotonic() > starttime+timeout:
+					notReady.extend('%s was not ready (waiting for %s)'%(process, ', '.join(description for description, check in conditions))
+						for process, conditions in pending.items())
+					break
+				if pending: self.pollWait(poll)
+		finally:
+			for tailer, follower in followers: tailer.release(follower)
+
+		if failures:
+			self.addOutcome(BLOCKED, '%s after %d secs: %s'%(
+				'%d of %d processes failed to start'%(len(failures), len(started)) if len(failures) > 1 else 'Process failed to start',
+				time.monotonic()-starttime, '; '.join(failures)), abortOnError=abortOnError)
+		elif notReady:
+			self.addOutcome(TIMEDOUT, 'Timed out waiting for %d of %d processes to become ready after %d secs: %s'%(
+				len(notReady), len(started), time.monotonic()-starttime, '; '.join(notReady)), abortOnError=abortOnError)
+		elif time.monotonic()-starttime > 10:
+			self.log.info('All %d processes are ready, after waiting %d secs', len(started), time.monotonic()-starttime)
+		return [process for process, processReadiness in started]
+
+	def __isSocketReady(self, port):
+		try:
+			with socket.create_connection(('localhost', port), timeout=1.0):
+				return True
+		except OSError:
+			return False
+
 	def writeProcess(self, process, data, addNewLine=True):
 		"""Write binary data to the stdin of a process.
 
@@ -1093,22 +1300,30 @@ class ProcessUser(object):
 		log.debug("Performing wait for file creation: %s", f)
 		
 		startTime = time.monotonic()
-		while True:
-			if timeout:
-				currentTime = time.monotonic()
-				if currentTime > startTime + timeout:
+		waiter = None
+		try:
+			while True:
+				if pathexists(f):
+					log.debug("Wait for '%s' file creation completed successfully", file)
+					return
 
-					msg = "Timed out waiting for creation of file %s after %d secs" % (file, time.monotonic()-startTime)
-					if abortOnError:
-						self.abort(TIMEDOUT, msg, self.__callRecord())
-					else:
-						log.warning(msg)
-					break
-					
-			self.pollWait(0.01)
-			if pathexists(f):
-				log.debug("Wait for '%s' file creation completed successfully", file)
-				return
+				if timeout:
+					currentTime = time.monotonic()
+					if currentTime > startTime + timeout:
+
+						msg = "Timed out waiting for creation of file %s after %d secs" % (file, time.monotonic()-startTime)
+						if abortOnError:
+							self.abort(TIMEDOUT, msg, self.__callRecord())
+						else:
+							log.warning(msg)
+						break
+			
+				# only set up a waiter if the file doesn't exist already; if we'll be woken by a change we can afford a 
+				# longer maximum wait, but don't make it too long in case it's on a filesystem that doesn't generate change events
+				if waiter is None: waiter = FileChangeWaiter(f, monitor=self.__getFileChangeMonitor())
+				self.__pollWaitForChange(waiter, 0.25 if waiter.isEventDriven else 0.01)
+		finally:
+			if waiter is not None: waiter.close()
 
 	def waitForSignal(self, file, filedir=None, expr="", **waitForGrepArgs):
 		"""Old alias for `waitForGrep`; please use `waitForGrep` in new tests.
@@ -1207,7 +1422,10 @@ class ProcessUser(object):
 			
 			Added in PySys 1.6.0.
 
-		:param float poll: The time in seconds between to poll the file looking for the regular expression and to check against the condition
+		:param float poll: The time in seconds between to poll the file looking for the regular expression and to check against the condition. 
+			On Linux, inotify is used to wake up as soon as the file is changed, so this is just the maximum time between checks 
+			(except when using mappers that prevent the file being read incrementally, in which case the whole file is re-read 
+			every ``poll`` seconds). 
 				
 		:param bool abortOnError: If True abort the test on any error outcome (defaults to the defaultAbortOnError
 			project setting, which for a modern project will be True).
@@ -1302,71 +1520,116 @@ class ProcessUser(object):
 					raise TimeoutError("Timed out during waitForGrep watchdog")
 
 			return line
-		mappers = mappers+[watchdogMapper] # putting the watchdog later allows custom mappers that remove long lines if desired 
+		# Use an incremental tailer (shared by all waits on this file) so each poll only reads newly appended data, 
+		# unless there are generator mappers which can't be resumed, in which case we must re-read the whole file each time
+		errorExprs = [err+'.*' for err in errorExpr or []] # add .* to capture entire err msg for a better outcome reason
+		tailer = self.__getFileTailer(f, encoding, encodingReplaceOnError) if FileTailer.isFollowable(mappers) else None
+		if tailer is not None:
+			follower = tailer.follow(expr, ignores=ignores, flags=reFlags, mappers=mappers, errorExpr=errorExprs)
+		else:
+			mappers = mappers+[watchdogMapper] # putting the watchdog later allows custom mappers that remove long lines if desired 
 
-		while 1:
-			try:
-				if pathexists(f):
-					matches = getmatches(f, expr, encoding=encoding, ignores=ignores, flags=reFlags, mappers=mappers, encodingReplaceOnError=encodingReplaceOnError)
-
-					if pysys.utils.safeeval.safeEval("%d %s" % (len(matches), condition), extraNamespace={'self':self}):
-						timetaken = time.monotonic()-starttime
-						# Old-style/non-verbose behaviour is to log only after complete, 
-						# new/verbose style does the main logging at INFO when starting, and only logs on completion if it took a long time
-						# (this helps people debug tests that sometimes timeout and sometimes "nearly" timeout)
-						if verboseWaitForSignal:
-							(loginfo if timetaken > 30 else log.debug)("   ... found %d matches in %ss", len(matches), int(timetaken))
+		# Waking up on each change is only worthwhile when the tailer makes each poll cheap; re-reading the whole file 
+		# on every write to a busy log would be quadratic, so in that case just poll
+		waiter = FileChangeWaiter(f, monitor=self.__getFileChangeMonitor()) if tailer is not None else None
+		try:
+			while 1:
+				try:
+					if tailer is not None:
+						exists = tailer.poll(postMapper=watchdogMapper)
+					else:
+						exists = pathexists(f)
+					if exists:
+						if tailer is not None:
+							matches = follower.getMatches()
 						else:
-							# We use the phrase "grep signal" to avoid misleading anyone, whether people used waitForGrep or the older waitForSignal
-							loginfo("Wait for grep signal in %s completed successfully", file)
-						break
-					
-					if errorExpr:
-						for err in errorExpr:
-							errmatches = getmatches(f, err+'.*', encoding=encoding, ignores=ignores, flags=reFlags, mappers=mappers, encodingReplaceOnError=encodingReplaceOnError) # add .* to capture entire err msg for a better outcome reason
-							if errmatches:
-								err = errmatches[0].group(0).strip()
+							# a single pass over the file for the expr and all the errorExprs
+							matches, *errmatches = getmultimatches(f, [expr]+errorExprs, encoding=encoding, ignores=ignores, flags=reFlags, mappers=mappers, encodingReplaceOnError=encodingReplaceOnError)
+
+						if pysys.utils.safeeval.safeEval("%d %s" % (len(matches), condition), extraNamespace={'self':self}):
+							timetaken = time.monotonic()-starttime
+							# Old-style/non-verbose behaviour is to log only after complete, 
+							# new/verbose style does the main logging at INFO when starting, and only logs on completion if it took a long time
+							# (this helps people debug tests that sometimes timeout and sometimes "nearly" timeout)
+							if verboseWaitForSignal:
+								(loginfo if timetaken > 30 else log.debug)("   ... found %d matches in %ss", len(matches), int(timetaken))
+							else:
+								# We use the phrase "grep signal" to avoid misleading anyone, whether people used waitForGrep or the older waitForSignal
+								loginfo("Wait for grep signal in %s completed successfully", file)
+							break
+						
+						if errorExpr:
+							if tailer is not None:
+								errmatch = follower.getErrorMatch()
+							else:
+								errmatch = next((m[0] for m in errmatches if m), None)
+							if errmatch is not None:
+								err = errmatch.group(0).strip()
 								msg = '%s found while %s'%(quotestring(err), msg[0].lower()+msg[1:])
 								# always report outcome for this case; additionally abort if requested to
 								self.addOutcome(BLOCKED, outcomeReason=msg, abortOnError=abortOnError, callRecord=self.__callRecord())
 								return {} if namedGroupsMode else matches
-				# end of if exists
-				if time.monotonic() > starttime + timeout: raise TimeoutError()
+					# end of if exists
+					if time.monotonic() > starttime + timeout: raise TimeoutError()
 
-			except TimeoutError: # may come from the above check outside the loop, or from the check every 10k lines within the watchdog
-				msg = "%s timed out after %d secs, %s"%(msg, timeout, 
-					("with %d matches"%len(matches)) if pathexists(f) else 'file does not exist')
-				
-				if abortOnError:
-					self.abort(TIMEDOUT, msg, self.__callRecord())
-				else:
-					log.warning(msg, extra=BaseLogFormatter.tag(LOG_TIMEOUTS))
-				break
+				except TimeoutError: # may come from the above check outside the loop, or from the check every 10k lines within the watchdog
+					msg = "%s timed out after %d secs, %s"%(msg, timeout, 
+						("with %d matches"%len(matches)) if pathexists(f) else 'file does not exist')
+					
+					if abortOnError:
+						self.abort(TIMEDOUT, msg, self.__callRecord())
+					else:
+						log.warning(msg, extra=BaseLogFormatter.tag(LOG_TIMEOUTS))
+					break
 
-			if errorIf is not None:
-				errmsg = errorIf()
-				if errmsg:
-					msg = "%s aborted due to errorIf returning %s"%(msg, errmsg)
+				if errorIf is not None:
+					errmsg = errorIf()
+					if errmsg:
+						msg = "%s aborted due to errorIf returning %s"%(msg, errmsg)
+						if abortOnError:
+							self.abort(BLOCKED, msg, self.__callRecord())
+						else:
+							log.warning(msg)
+						break
+					
+				if process and not process.running():
+					msg = "%s aborted due to process %s termination"%(msg, process)
 					if abortOnError:
 						self.abort(BLOCKED, msg, self.__callRecord())
 					else:
 						log.warning(msg)
 					break
-				
-			if process and not process.running():
-				msg = "%s aborted due to process %s termination"%(msg, process)
-				if abortOnError:
-					self.abort(BLOCKED, msg, self.__callRecord())
-				else:
-					log.warning(msg)
-				break
 
-			self.pollWait(poll)
+				if waiter is not None:
+					self.__pollWaitForChange(waiter, poll)
+				else:
+					self.pollWait(poll)
+		finally:
+			if tailer is not None: tailer.release(follower)
+			if waiter is not None: waiter.close()
 		if namedGroupsMode:
 			return {} if not matches else matches[0].groupdict()
 		return matches
 
 
+	def __getFileTailer(self, file, encoding, encodingReplaceOnError):
+		# Returns the tailer for this file, so that all waits on the same file share a single cursor
+		key = (os.path.normcase(os.path.abspath(file)), encoding, encodingReplaceOnError)
+		with self.lock:
+			tailer = self.__fileTailers.get(key)
+			if tailer is None:
+				tailer = self.__fileTailers[key] = FileTailer(file, encoding=encoding, encodingReplaceOnError=encodingReplaceOnError)
+			return tailer
+
+	def __getFileChangeMonitor(self):
+		# Returns the monitor shared by all file waits in this object (from any thread), so that there's a single 
+		# inotify instance with a watch per directory, rather than one instance per file that could exhaust the 
+		# per-user limit when running many tests in parallel
+		with self.lock:
+			if self.__fileChangeMonitor is None:
+				self.__fileChangeMonitor = FileChangeMonitor(abortHandle=self.isRunnerAbortingHandle)
+			return self.__fileChangeMonitor
+
 	def addCleanupFunction(self, fn, ignoreErrors=False):
 		""" Registers a function that will be called as part of the `cleanup` of this object.
 		
@@ -1430,6 +1693,26 @@ class ProcessUser(object):
 					log.warning("Caught %s: %s", sys.exc_info()[0].__name__, sys.exc_info()[1], exc_info=1)
 					exceptions.append('Failed to stop process %s: %s'%(process, e))
 			self.processCount = {}
+
+			with self.lock:
+				monitor, self.__fileChangeMonitor = self.__fileChangeMonitor, None
+			if monitor is not None: monitor.close()
+
+			with self.lock:
+				capturedOutputs, self.__capturedOutputs = self.__capturedOutputs, []
+			if capturedOutputs:
+				# keep the output of processes started with inMemoryOutput=True only if it's needed to triage a failure
+				keep = self.getOutcome().isFailure()
+				for captured in capturedOutputs:
+					try:
+						if keep: 
+							captured.waitUntilClosed(timeout=1.0)
+							captured.spill()
+					except Exception as e:
+						log.warning("Failed to write in-memory output to %s: %s", captured.path, e)
+						exceptions.append('Failed to write in-memory output to %s: %s'%(captured.path, e))
+					finally:
+						captured.unregister()
 			
 			log.debug('ProcessUser cleanup function done.')
 		if exceptions:
@@ -1630,6 +1913,19 @@ class ProcessUser(object):
 		with self.lock:
 			return self.__outcomeLocation
 
+	def _getOutcomeState(self):
+		# Internal helper, not public API, do not use. Returns the outcomes, reason and location in a picklable form.
+		with self.lock:
+			return [OUTCOMES.index(o) for o in self.outcome], self.__outcomeReason, self.__outcomeLocation
+
+	def _setOutcomeState(self, state):
+		# Internal helper, not public API, do not use. Restores the state returned by _getOutcomeState.
+		outcomes, reason, location = state
+		with self.lock:
+			self.outcome[:] = [OUTCOMES[i] for i in outcomes]
+			self.__outcomeReason = reason
+			self.__outcomeLocation = tuple(location)
+
 	def getNextAvailableTCPPort(self, hosts=['', 'localhost'], socketAddressFamily=socket.AF_INET):
 		"""Allocate a free TCP port which can be used for starting a server on this machine.
 		
@@ -1940,7 +2236,7 @@ class ProcessUser(object):
 		assert not os.path.isdir(path), 'Cannot grep directory: %s'%path
 
 		matches = []
-		if mustExist is False and not os.path.exists(path):
+		if mustExist is False and not pathexists(path):
 			pass
 		else: 
 			with openfile(path, 'r', encoding=encoding or self.getDefaultFileEncoding(path), errors='backslashreplace' if encodingReplaceOnError else None) as f:
@@ -1962,7 +2258,8 @@ class ProcessUser(object):
 
 		if returnAll: return matches
 		if returnNoneIfMissing: return None
-		if os.path.getsize(path) == 0: # can happen due to race conditions in file system writing; maybe they need a waitForGrep
+		captured = getCapturedOutput(path)
+		if (len(captured.getvalue()) if captured is not None else os.path.getsize(path)) == 0: # can happen due to race conditions in file system writing; maybe they need a waitForGrep
 			raise Exception('Could not find expression %s in %s because file is empty'%(quotestring(expr), os.path.basename(path)))
 		raise Exception('Could not find expression %s in %s'%(quotestring(expr), os.path.basename(path)))
 
@@ -2504,6 +2801,7 @@ class ProcessUser(object):
 		origdest = dest
 		src = toLongPathSafe(os.path.join(self.output, src))
 		srcIsDir = os.path.isdir(src)
+		self._copiedSources.add(src)
 	
 		dest = toLongPathSafe(os.path.join(self.output, dest)).rstrip('/\\')
 		if origdest.endswith((os.sep, '/', '\\')) or (not srcIsDir and os.path.isdir(dest)): dest = toLongPathSafe(dest+os.sep+os.path.basename(src))
@@ -195,19 +195,39 @@ def initializePortPool():
 	:meta private: Not public API
 	"""
 
-	global tcpServerPortPool, __totalServerPorts
+	global tcpServerPortPool, __totalServerPorts, _nextPortPool
 	assert tcpServerPortPool is None, 'Cannot call initializePortPool() more than once per process'
 
-	tcpServerPortPool = getServerTCPPorts()
-	
+	tcpServerPortPool, _nextPortPool = (_nextPortPool or _createPortPool()), None
 	__totalServerPorts = len(tcpServerPortPool)
 
+_nextPortPool = None
+"""A pool created in advance by `_createPortPool` (e.g. by the ``pysys server`` process before forking), for use by the 
+next call to `initializePortPool`. """
+
+def _createPortPool():
+	ports = getServerTCPPorts()
+
 	# Randomize the port set to reduce the chance of clashes between
 	# simultaneous runs on the same machine
-	random.shuffle(tcpServerPortPool)
+	random.shuffle(ports)
 
 	# Convert to an LRU queue of ports
-	tcpServerPortPool = collections.deque(tcpServerPortPool)
+	return collections.deque(ports)
+
+def _partitionPortPool(index, count):
+	"""Restrict the pool of ports this process can allocate from to one of ``count`` disjoint subsets, so that
+	when tests are executed by multiple PySys processes in the same run (see ``pysys run --workers=processes``)
+	they never allocate the same port.
+
+	Must be called after `initializePortPool` and before any ports are allocated.
+
+	:meta private: Not public API
+	"""
+	global tcpServerPortPool, __totalServerPorts
+	assert 0 <= index < count, (index, count)
+	tcpServerPortPool = collections.deque(p for p in tcpServerPortPool if p % count == index)
+	__totalServerPorts = len(tcpServerPortPool)
 
 def portIsInUse(port, host='', socketAddressFamily=socket.AF_INET, type=socket.SOCK_STREAM, proto=0):
 	# Try to bind to the post on the specified address to see if anyone else is using it
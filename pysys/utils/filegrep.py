@@ -20,18 +20,123 @@ Regular expression grep matching in text files.
 """
 
 from __future__ import print_function
-import os.path, logging, copy
+import os.path, logging, copy, io, codecs, threading
 
 from pysys import log
 from pysys.constants import *
 from pysys.exceptions import *
 from pysys.utils.filediff import trimContents
 from pysys.utils.pycompat import openfile
-from pysys.utils.fileutils import pathexists
-from pysys.mappers import applyMappers
+from pysys.utils.fileutils import pathexists, toLongPathSafe
+from pysys.internal.outputcapture import getCapturedOutput
+from pysys.mappers import applyMappers, _isGeneratorMapper
+
+try:
+	from re import _parser as _sre_parse # Python 3.11+
+	from re._constants import LITERAL as _LITERAL, SUBPATTERN as _SUBPATTERN
+except ImportError: # pragma: no cover
+	import sre_parse as _sre_parse
+	from sre_constants import LITERAL as _LITERAL, SUBPATTERN as _SUBPATTERN
 
 log = logging.getLogger('pysys.assertions')
 
+class LineMatcher(object):
+	"""
+	A compiled set of regular expressions that can all be checked against each line of a file in a single pass, 
+	reporting which of the expressions matched. 
+	
+	To avoid the cost of evaluating every regular expression on every line, a literal string that must be present 
+	in any matching line is extracted from each expression where possible (e.g. ``"ERROR"`` from ``" ERROR .*"``), 
+	and the regular expression is only evaluated for lines containing that literal. 
+	
+	This is used by `getmatches` (and therefore `pysys.basetest.BaseTest.assertGrep` and 
+	`pysys.basetest.BaseTest.assertLineCount`), `orderedgrep` and `pysys.process.user.ProcessUser.waitForGrep`. 
+	
+	.. versionadded:: 2.3
+
+	:param list[str] exprs: The regular expressions to search for. 
+	:param list[str] ignores: Regular expressions which will cause matches to be discarded if found in the same line. 
+	:param int flags: Flags for compiling the regular expressions, e.g. ``re.IGNORECASE``. 
+	"""
+	
+	def __init__(self, exprs, ignores=None, flags=0):
+		if isinstance(ignores, str): ignores = [ignores] # it's easy to pass in a str by mistake and we definitely don't want to be ignoring lines containing any letter from that string!
+		self.exprs = list(exprs)
+		self.__regexes = [(re.compile(e, flags=flags), _requiredLiteral(e, flags)) for e in self.exprs]
+		self.__ignores = [(re.compile(i, flags=flags), _requiredLiteral(i, flags)) for i in (ignores or [])]
+		self.__indexes = range(len(self.__regexes))
+
+	def __repr__(self): return 'LineMatcher<%s>'%', '.join(repr(e) for e in self.exprs)
+
+	def search(self, line):
+		"""
+		Checks the specified line against all of the expressions. 
+		
+		:param str line: The line to check. 
+		:return: A dict mapping the index of each matching expression to its ``re.Match`` object, which is empty if 
+			nothing matched or the line is ignored. 
+		:rtype: dict[int,re.Match]
+		"""
+		result = None
+		for i in self.__indexes:
+			regex, literal = self.__regexes[i]
+			if literal and literal not in line: continue
+			m = regex.search(line)
+			if m is not None:
+				if result is None: result = {}
+				result[i] = m
+		if result is None or self.isIgnored(line): return {}
+		return result
+
+	def searchExpr(self, index, line):
+		"""
+		Checks the specified line against just one of the expressions. 
+		
+		:param int index: The index of the expression to check. 
+		:param str line: The line to check. 
+		:return: The ``re.Match`` object, or None if it did not match or the line is ignored. 
+		"""
+		regex, literal = self.__regexes[index]
+		if literal and literal not in line: return None
+		m = regex.search(line)
+		if m is None or self.isIgnored(line): return None
+		return m
+
+	def isIgnored(self, line):
+		"""
+		Returns True if the specified line matches any of the ignore expressions. 
+		"""
+		for regex, literal in self.__ignores:
+			if literal and literal not in line: continue
+			if regex.search(line) is not None: return True
+		return False
+
+def _requiredLiteral(expr, flags):
+	# Returns the longest literal substring that must occur in any string matching the specified regex, or '' if 
+	# one can't be determined. Only considers top-level literals and groups, so is always safe (if not always optimal)
+	if not isinstance(expr, str) or flags & re.IGNORECASE: return ''
+	try:
+		parsed = _sre_parse.parse(expr, flags)
+		if parsed.state.flags & re.IGNORECASE: return ''
+	except Exception: # pragma: no cover - if it's a pattern Python can't parse, let the caller's compile() report the error
+		return ''
+	
+	best = ''
+	def visit(items):
+		nonlocal best
+		run = []
+		for op, av in items:
+			if op == _LITERAL:
+				run.append(chr(av))
+				continue
+			if len(run) > len(best): best = ''.join(run)
+			run = []
+			if op == _SUBPATTERN and not (av[1] & re.IGNORECASE): # av is (group, addFlags, delFlags, pattern)
+				visit(av[-1])
+		if len(run) > len(best): best = ''.join(run)
+	visit(parsed)
+	return best
+
 def getmatches(file, regexpr, ignores=None, encoding=None, encodingReplaceOnError=False, flags=0, mappers=[], returnFirstOnly=False):
 	"""Look for matches on a regular expression in an input file, return a sequence of the matches 
 	(or if returnFirstOnly=True, just the first).
@@ -49,45 +154,365 @@ def getmatches(file, regexpr, ignores=None, encoding=None, encodingReplaceOnErro
 	
 	"""
 	matches = []
-	rexp = re.compile(regexpr, flags=flags)
+	matcher = LineMatcher([regexpr], ignores=ignores, flags=flags)
 	
 	log.debug("Looking for expression \"%s\" in input file %s" %(regexpr, file))
 
-	if isinstance(ignores, str): ignores = [ignores] # it's easy to pass in a str by mistake and we definitely don't want to be ignoring lines containing any letter from that string!
-	ignores = [re.compile(i, flags=flags) for i in (ignores or [])]
+	for l, lineMatches in _searchFile(file, matcher, encoding, encodingReplaceOnError, mappers):
+		match = lineMatches[0]
+		log.debug(("Found match for line: %s" % l).rstrip())
+		if returnFirstOnly is True: return match
+		matches.append(match)
+	
+	if returnFirstOnly is True: return None
+	return matches
+
+def getmultimatches(file, exprList, ignores=None, encoding=None, encodingReplaceOnError=False, flags=0, mappers=[]):
+	"""Look for matches on several regular expressions in an input file, in a single pass over the file, returning 
+	a list of the matches for each expression. 
+	
+	:param file: The full path to the input file
+	:param list[str] exprList: The regular expressions used to search for matches
+	:param mappers: A list of lambdas or generator functions used to pre-process the file's lines before looking for matches. 
+	:param ignores: A list of regexes which will cause matches to be discarded. These are applied *after* any mappers. 
+	:param encoding: Specifies the encoding to be used for opening the file, or None for default. 
+	:param bool encodingReplaceOnError: Set to True to replace erroneous characters that are invalid in the expected encoding (with a backslash escape) rather than throwing an exception. 
+	:return: A list containing a list of match objects for each item in exprList. 
+	:rtype: list[list[re.Match]]
+	:raises FileNotFoundException: Raised if the input file does not exist
+	
+	.. versionadded:: 2.3
+	"""
+	matches = [[] for e in exprList]
+	matcher = LineMatcher(exprList, ignores=ignores, flags=flags)
+	for l, lineMatches in _searchFile(file, matcher, encoding, encodingReplaceOnError, mappers):
+		for i, match in lineMatches.items(): matches[i].append(match)
+	return matches
 
+def _searchFile(file, matcher, encoding, encodingReplaceOnError, mappers):
+	# Generator yielding (line, {exprIndex: match}) for each line of the file that matches any of the matcher's expressions
 	if not pathexists(file):
 		raise FileNotFoundException("unable to find file \"%s\"" % (file))
-	else:
+	try:
+		with openfile(file, 'r', encoding=encoding, errors='backslashreplace' if encodingReplaceOnError else None) as f:
+			for l in applyMappers(f, mappers):
+				lineMatches = matcher.search(l)
+				if lineMatches: yield l, lineMatches
+	except UnicodeDecodeError as ex: # pragma: no cover
+		_addDecodeErrorContext(ex)
+		raise ex
+
+
+class FileTailer(object):
+	"""
+	A persistent cursor over a text file that is being appended to, which incrementally decodes and matches only the 
+	bytes that were added since the last `poll`, rather than re-reading the entire file each time. 
+	
+	This is used by `pysys.process.user.ProcessUser.waitForGrep` so that the cost of waiting on a large (and growing) log 
+	file is proportional to the amount of new data rather than to the total file size. 
+	
+	The tailer remembers the byte offset it has read up to, any partial trailing line (which is matched tentatively 
+	on each poll but only committed once its newline has been written), and the incremental decoder state. 
+	If the file is truncated or replaced (e.g. by log rotation) the tailer detects this and starts again from the 
+	beginning of the new file. 
+	
+	Several grep expressions can be evaluated against the same file by calling `follow` for each one; every new byte 
+	is then read and decoded just once regardless of how many followers are registered. 
+	
+	Stateless and simple stateful mappers (those that are called once per line) are supported; the final line is 
+	matched before it is complete using a copy of the mappers, so their state only changes once each line is complete. 
+	Generator mappers such as `pysys.mappers.JoinLines` cannot be resumed part-way through a file (and mappers that 
+	cannot be copied cannot be used for matching incomplete lines), so cannot be used with a tailer; 
+	use `isFollowable` to check. 
+	
+	This class is thread-safe. 
+	
+	.. versionadded:: 2.3
+
+	:param str file: The absolute path of the file to read. 
+	:param str encoding: The encoding to use to decode the file, or None for the default `PREFERRED_ENCODING`. 
+	:param bool encodingReplaceOnError: Set to True to replace erroneous characters that are invalid in the expected 
+		encoding (with a backslash escape) rather than throwing an exception. 
+	"""
+	
+	READ_CHUNK_SIZE = 1024*1024
+	"""The maximum number of bytes to read and decode at a time. """
+
+	MAX_IDLE_FOLLOWERS = 5
+	"""The maximum number of unused followers (with no mappers) to keep so they can be reused by a subsequent `follow` 
+	call for the same expression without needing to re-read the file from the start. """
+
+	__CHECK_BYTES = 64 # number of bytes before the offset we re-read to check the file was not truncated and rewritten
+
+	def __init__(self, file, encoding=None, encodingReplaceOnError=False):
+		self.file = file
+		self.encoding = encoding or PREFERRED_ENCODING
+		self.errors = 'backslashreplace' if encodingReplaceOnError else 'strict'
+		self.lock = threading.RLock()
+		self.__followers = []
+		self.__reset()
+
+	def __repr__(self): return 'FileTailer<%s at byte %d>'%(self.file, self.offset)
+
+	def __reset(self):
+		self.offset = 0
+		"""The byte offset that has been read (and decoded) up to. """
+		self.__identity = None
+		self.__checkBytes = b''
+		self.__decoder = self.__newDecoder()
+		self.__partial = ''
+		for follower in self.__followers: follower._reset()
+	
+	def __newDecoder(self):
+		return io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(self.encoding)(errors=self.errors), translate=True)
+
+	@staticmethod
+	def isFollowable(mappers):
+		"""
+		Returns True if the specified list of mappers can be used incrementally by a tailer, i.e. it does not contain any 
+		generator mappers, and the mappers can be copied (which is needed to match the final line before it is complete 
+		without changing the state of stateful mappers such as `pysys.mappers.IncludeLinesBetween`). 
+		"""
+		mappers = [m for m in (mappers or []) if m is not None]
+		if any(_isGeneratorMapper(m) for m in mappers): return False
 		try:
-			with openfile(file, 'r', encoding=encoding, errors='backslashreplace' if encodingReplaceOnError else None) as f:
-				for l in applyMappers(f, mappers):
-					match = rexp.search(l)
-					if match is not None: 
-						shouldignore = False
-						for i in ignores:
-							if i.search(l):
-								shouldignore = True
-								break
-						if shouldignore: continue
-						
-						log.debug(("Found match for line: %s" % l).rstrip())
-						if returnFirstOnly is True: return match
-						matches.append(match)
-		except UnicodeDecodeError as ex: # pragma: no cover
-			# help people find the cause of the problem by including some context
+			copy.deepcopy(mappers)
+		except Exception:
+			return False
+		return True
+
+	def follow(self, expr, ignores=None, errorExpr=None, flags=0, mappers=None):
+		"""
+		Returns a follower that accumulates the matches for the specified expression (and error expressions) 
+		from each `poll` of this file. 
+		
+		If there is an existing unused follower with the same parameters (and no mappers) it is reused, otherwise 
+		a new one is created and will catch up with the existing contents of the file during the next `poll`. 
+		Call `release` when the follower is no longer needed. 
+		
+		:param str expr: The regular expression to search for. 
+		:param list[str] ignores: Regular expressions identifying lines that should not be matched by ``expr`` or ``errorExpr``. 
+		:param list[str] errorExpr: Additional regular expressions for which the first match of each is recorded. 
+		:param int flags: Flags for compiling the regular expressions. 
+		:param list mappers: A list of (non-generator) mappers to apply to each line before matching. 
+		:rtype: FileTailer.Follower
+		"""
+		assert self.isFollowable(mappers), 'Generator mappers cannot be used with a FileTailer'
+		if isinstance(ignores, str): ignores = [ignores]
+		key = (expr, tuple(ignores or ()), tuple(errorExpr or ()), flags)
+		mappers = [m for m in (mappers or []) if m is not None]
+		with self.lock:
+			if not mappers:
+				for follower in self.__followers:
+					if follower.key == key and not follower.mappers:
+						self.__followers.remove(follower)
+						self.__followers.append(follower) # most recently used at the end
+						follower._users += 1
+						return follower
+			follower = FileTailer.Follower(key, mappers)
+			follower._users += 1
+			follower._catchUp = self.offset > 0
+			self.__followers.append(follower)
+			return follower
+	
+	def release(self, follower):
+		"""
+		Indicates that the caller has finished using the specified follower. 
+		
+		Followers with mappers are discarded (since the mapper state is owned by the caller) but others may be kept for 
+		reuse. 
+		"""
+		with self.lock:
+			follower._users -= 1
+			if follower._users > 0: return
+			if follower.mappers:
+				self.__followers.remove(follower)
+				return
+			idle = [f for f in self.__followers if f._users == 0 and not f.mappers]
+			for f in idle[:max(0, len(idle)-self.MAX_IDLE_FOLLOWERS)]:
+				self.__followers.remove(f)
+
+	def poll(self, postMapper=None):
+		"""
+		Reads and matches any data that has been appended to the file since the last call, and updates the matches of 
+		each follower. 
+		
+		:param callable[str]->str postMapper: An optional mapper applied to each line after the follower's own mappers, 
+			e.g. to implement watchdog checks. If it raises an exception, the tailer is reset so the next poll starts 
+			again from the beginning of the file. 
+		:return: False if the file does not currently exist, otherwise True. 
+		"""
+		with self.lock:
 			try:
-				contextchars = 20
-				problematictext = ex.object[max(0, ex.start-contextchars) : min(len(ex.object), min(ex.end, ex.start+100)+contextchars) ]
-				# repr ensures other chars like \n are escaped, but to avoid it being unreadable we avoid double-escaping of the backslash chars
-				ex.reason = ex.reason+'; text is: ... %s ...' % repr(problematictext.decode(ex.encoding, errors='backslashreplace')).replace('\\\\x','\\x')
-			except:
-				pass
-			raise ex
+				return self.__poll(postMapper)
+			except BaseException:
+				# we can't know how much of the data was processed so must start again next time
+				self.__reset()
+				raise
+
+	def __poll(self, postMapper):
+		captured = getCapturedOutput(self.file) # for processes started with inMemoryOutput=True
+		if captured is not None:
+			identity = (id(captured), 0)
+			# read only what's needed (the check bytes and new data) rather than copying the whole buffer each time, 
+			# unless we need to start again from the beginning
+			start = 0 if identity != self.__identity or any(follower._catchUp for follower in self.__followers) else self.offset-len(self.__checkBytes)
+			data, size = captured.readFrom(start)
+			if size < self.offset: # truncated, so will be read again from the beginning
+				start = 0
+				data, size = captured.readFrom(start)
+			f = _OffsetBytesIO(data, start)
+		else:
+			try:
+				f = io.open(toLongPathSafe(self.file, onlyIfNeeded=True), 'rb')
+			except FileNotFoundError:
+				return False
+			st = os.fstat(f.fileno())
+			identity, size = (st.st_dev, st.st_ino), st.st_size
+		with f:
+			if self.__identity is not None and (identity != self.__identity or size < self.offset):
+				log.debug('FileTailer detected that file was truncated or replaced so will start reading again from the beginning: %s', self.file)
+				self.__reset()
+			elif self.__checkBytes:
+				f.seek(self.offset-len(self.__checkBytes))
+				if f.read(len(self.__checkBytes)) != self.__checkBytes:
+					log.debug('FileTailer detected that file was rewritten so will start reading again from the beginning: %s', self.file)
+					self.__reset()
+			self.__identity = identity
+			
+			# Any followers added since the last poll need to see the lines that were already read
+			catchUp = [follower for follower in self.__followers if follower._catchUp]
+			if catchUp:
+				f.seek(0)
+				for lines, _ in self.__readLines(f, self.__newDecoder(), '', self.offset):
+					for follower in catchUp: follower._addLines(lines, postMapper)
+				for follower in catchUp: follower._catchUp = False
+
+			if size != self.offset:
+				f.seek(self.offset)
+				for lines, self.__partial in self.__readLines(f, self.__decoder, self.__partial, None):
+					for follower in self.__followers: follower._addLines(lines, postMapper)
+				self.offset = f.tell()
+				f.seek(max(0, self.offset-self.__CHECK_BYTES))
+				self.__checkBytes = f.read(self.offset-f.tell())
+		
+		# The final line may not have been completely written yet, so match it without committing it
+		for follower in self.__followers: follower._setPartial(self.__partial, postMapper)
+		return True
+
+	def __readLines(self, f, decoder, partial, limit):
+		"""Generator yielding ``(completeLines, partial)`` for each chunk of data read from the file."""
+		while limit is None or limit > 0:
+			data = f.read(self.READ_CHUNK_SIZE if limit is None else min(self.READ_CHUNK_SIZE, limit))
+			if not data: break
+			if limit is not None: limit -= len(data)
+			try:
+				text = partial+decoder.decode(data)
+			except UnicodeDecodeError as ex: # pragma: no cover
+				_addDecodeErrorContext(ex)
+				raise
+			lines = text.split('\n')
+			partial = lines.pop()
+			yield [l+'\n' for l in lines], partial
+
+	class Follower(object):
+		"""
+		Accumulates the matches for a grep expression from each poll of a `FileTailer`. Created by `FileTailer.follow`. 
+		
+		:ivar list[re.Match] matches: The matches for the expression from all complete lines so far. 
+		"""
+		def __init__(self, key, mappers):
+			self.key = key
+			expr, ignores, errorExpr, flags = key
+			self.mappers = mappers
+			self.__matcher = LineMatcher((expr,)+errorExpr, ignores=ignores, flags=flags) # index 0 is the main expr
+			self.__errorCount = len(errorExpr)
+			self._users = 0
+			self._catchUp = False
+			self._reset()
+		
+		def _reset(self):
+			self.matches = []
+			self.__errorMatches = [None]*self.__errorCount
+			self.__partialMatch, self.__partialErrors = None, None
 		
-		if returnFirstOnly is True: return None
-		return matches
+		def __mapLine(self, line, postMapper, mappers):
+			for m in mappers:
+				line = m(line)
+				if line is None: return None
+			if postMapper is not None: line = postMapper(line)
+			return line
 
+		def __matchLine(self, line):
+			lineMatches = self.__matcher.search(line)
+			if not lineMatches: return None, None
+			errors = {i-1: e for (i, e) in lineMatches.items() if i > 0 and self.__errorMatches[i-1] is None}
+			return lineMatches.get(0), errors
+
+		def _addLines(self, lines, postMapper):
+			for line in lines:
+				line = self.__mapLine(line, postMapper, self.mappers)
+				if line is None: continue
+				match, errors = self.__matchLine(line)
+				if match is not None:
+					log.debug(("Found match for line: %s" % line).rstrip())
+					self.matches.append(match)
+				if errors:
+					for i, e in errors.items(): self.__errorMatches[i] = e
+			
+		def _setPartial(self, line, postMapper):
+			self.__partialMatch, self.__partialErrors = None, None
+			if line:
+				# the line will be mapped again when it is complete, so use a copy of the mappers to avoid changing their state
+				line = self.__mapLine(line, postMapper, copy.deepcopy(self.mappers) if self.mappers else self.mappers)
+				if line is not None:
+					self.__partialMatch, self.__partialErrors = self.__matchLine(line)
+		
+		def getMatches(self):
+			"""
+			Returns a list of all matches for the expression, including the final line of the file even if it is 
+			not yet terminated by a newline. 
+			
+			:rtype: list[re.Match]
+			"""
+			if self.__partialMatch is None: return list(self.matches)
+			return self.matches+[self.__partialMatch]
+
+		def getErrorMatch(self):
+			"""
+			Returns the first match for the first error expression (in the order they were specified) 
+			that has been found, or None. 
+			
+			:rtype: re.Match
+			"""
+			for i, e in enumerate(self.__errorMatches):
+				if e is None and self.__partialErrors: e = self.__partialErrors.get(i)
+				if e is not None: return e
+			return None
+
+class _OffsetBytesIO(io.BytesIO):
+	"""A read-only binary stream over the part of a file's data that starts at the specified offset, with the same 
+	positions as the file. """
+	def __init__(self, data, offset):
+		io.BytesIO.__init__(self, data)
+		self.__offset = offset
+	
+	def seek(self, pos, whence=io.SEEK_SET):
+		assert whence == io.SEEK_SET and pos >= self.__offset, (pos, whence)
+		return io.BytesIO.seek(self, pos-self.__offset)+self.__offset
+	
+	def tell(self):
+		return io.BytesIO.tell(self)+self.__offset
+
+def _addDecodeErrorContext(ex):
+	# help people find the cause of the problem by including some context
+	try:
+		contextchars = 20
+		problematictext = ex.object[max(0, ex.start-contextchars) : min(len(ex.object), min(ex.end, ex.start+100)+contextchars) ]
+		# repr ensures other chars like \n are escaped, but to avoid it being unreadable we avoid double-escaping of the backslash chars
+		ex.reason = ex.reason+'; text is: ... %s ...' % repr(problematictext.decode(ex.encoding, errors='backslashreplace')).replace('\\\\x','\\x')
+	except:
+		pass
 
 def filegrep(file, expr, returnMatch=False, **kwargs): # pragma: no cover
 	"""Search for matches to a regular expression in an input file, returning true if a match occurs.
@@ -168,26 +593,20 @@ def orderedgrep(file, exprList, encoding=None, flags=0):
 	:raises FileNotFoundException: Raised if the input file does not exist
 		
 	"""
-	list = copy.deepcopy(exprList)
-	list.reverse()
-	
-	expr, exprIndex = list.pop(), 1
-	regexpr = re.compile(expr, flags=flags)
+	matcher = LineMatcher(exprList, flags=flags)
+	exprIndex = 0
 
 	if not pathexists(file):
 		raise FileNotFoundException('unable to find file "%s"' % (file)) # pragma: no cover
 	
-	
 	with openfile(file, 'r', encoding=encoding) as f:
 		for line in f:
-			if regexpr.search(line) is not None:
-				if len(list) == 0:
+			if matcher.searchExpr(exprIndex, line) is not None:
+				exprIndex += 1
+				if exprIndex == len(exprList):
 					return None # success - found them all
-				
-				expr, exprIndex = list.pop(), exprIndex+1
-				regexpr = re.compile(expr, flags=flags)
 
-	return '#%d: %s'%(exprIndex, expr) # the expression we were trying to match
+	return '#%d: %s'%(exprIndex+1, exprList[exprIndex]) # the expression we were trying to match
 
 
 def logContents(message, list): # pragma: no cover
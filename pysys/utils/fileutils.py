@@ -30,6 +30,7 @@ import io
 import stat
 
 from pysys.constants import IS_WINDOWS, PREFERRED_ENCODING
+from pysys.internal import outputcapture
 
 log = logging.getLogger('pysys.fileutils')
 
@@ -105,6 +106,7 @@ def pathexists(path):
 	
 	:param path: If None or empty, returns True.
 	"""
+	if path and outputcapture._captured and outputcapture.getCapturedOutput(path) is not None: return True
 	return path and os.path.exists(toLongPathSafe(path))
 
 def mkdir(path):
@@ -0,0 +1,430 @@
+#!/usr/bin/env python
+# PySys System Test Framework, Copyright (C) 2006-2023 M.B. Grieve
+
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+
+"""
+Event-driven waiting for changes to files, using Linux inotify where available.
+
+.. versionadded:: 2.3
+"""
+
+import os, sys, time, select, struct, logging, threading
+import ctypes, ctypes.util
+
+log = logging.getLogger('pysys.filewatch')
+
+# Constants from <sys/inotify.h>
+_IN_MODIFY      = 0x00000002
+_IN_ATTRIB      = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM  = 0x00000040
+_IN_MOVED_TO    = 0x00000080
+_IN_CREATE      = 0x00000100
+_IN_DELETE      = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF   = 0x00000800
+_IN_Q_OVERFLOW  = 0x00004000
+_IN_IGNORED     = 0x00008000
+_IN_ISDIR       = 0x40000000
+_IN_NONBLOCK    = os.O_NONBLOCK
+_IN_CLOEXEC     = getattr(os, 'O_CLOEXEC', 0o2000000)
+
+_WATCH_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF
+_EVENT_HEADER = struct.Struct('iIII') # wd, mask, cookie, len
+
+__libc = None
+__libcLock = threading.Lock()
+
+def _getInotifyLibc():
+	# Returns the ctypes libc with the inotify functions, or False if not supported on this platform
+	global __libc
+	if __libc is not None: return __libc
+	with __libcLock:
+		if __libc is not None: return __libc
+		libc = False
+		if sys.platform.startswith('linux'):
+			try:
+				libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+				libc.inotify_init1.argtypes = [ctypes.c_int]
+				libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+				libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+			except Exception as ex: # pragma: no cover
+				log.debug('inotify is not available so will fall back to polling: %r', ex)
+				libc = False
+		__libc = libc
+		return __libc
+
+class FileChangeMonitor(object):
+	"""
+	A single inotify instance that can be shared by any number of `FileChangeWaiter` objects, from any thread.
+
+	There is one inotify watch per directory containing a watched file, which is kept until the monitor is closed.
+	Sharing a monitor avoids using up the per-user limit on the number of inotify instances
+	(``fs.inotify.max_user_instances``, which is often 128) when many files are being waited for concurrently.
+
+	Whichever thread is waiting reads the events for all of them, and wakes up the others when something changes.
+
+	The monitor must be closed when no longer required; it can be used as a context manager.
+
+	:param int abortHandle: An optional file descriptor which will wake up all waiters when it becomes readable, such as
+		`pysys.process.user.ProcessUser.isRunnerAbortingHandle`. It is never read from.
+	"""
+	def __init__(self, abortHandle=None):
+		self.abortHandle = abortHandle
+		self.__lock = threading.Condition()
+		self.__fd = None
+		self.__closing = False
+		self.__reading = False # True while a thread is blocked in select/read on the inotify fd
+		self.__dirs = {} # key=directory, value=wd
+		self.__watches = {} # key=wd, value=directory
+		self.__changes = {} # key=(directory, name), value=number of relevant events, for registered files only
+		self.__registrations = {} # key=(directory, name), value=number of open waiters for that file
+		self.__resets = 0 # incremented when events may have been lost, which counts as a change to every file
+
+		libc = _getInotifyLibc()
+		if not libc: return
+		fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+		if fd < 0:
+			log.debug('inotify_init1 failed with errno %d so will fall back to polling for file changes', ctypes.get_errno())
+			return
+		self.__fd = fd
+
+	def __repr__(self): return 'FileChangeMonitor<%d directories>'%len(self.__dirs)
+
+	def _register(self, key, register=True):
+		with self.__lock:
+			count = self.__registrations.get(key, 0) + (1 if register else -1)
+			if count > 0:
+				self.__registrations[key] = count
+				self.__changes.setdefault(key, 0)
+			else:
+				self.__registrations.pop(key, None)
+				self.__changes.pop(key, None)
+
+	def _watch(self, dir):
+		# Returns True if the directory is being watched, adding a watch if needed
+		with self.__lock:
+			if self.__fd is None or self.__closing: return False
+			if dir in self.__dirs: return True
+			wd = _getInotifyLibc().inotify_add_watch(self.__fd, os.fsencode(dir), _WATCH_MASK)
+			if wd < 0:
+				log.debug('inotify_add_watch failed with errno %d so will fall back to polling for changes in %s', ctypes.get_errno(), dir)
+				return False
+			self.__dirs[dir] = wd
+			self.__watches[wd] = dir
+			return True
+
+	def _getChangeCount(self, key):
+		with self.__lock:
+			return self.__changes.get(key, 0)+self.__resets
+
+	def _wait(self, key, changeCount, timeout):
+		# Blocks until the change count for key differs from changeCount, the abort handle is signalled or the timeout 
+		# expires. Returns True if woken early
+		deadline = time.monotonic()+timeout
+		while True:
+			with self.__lock:
+				while True:
+					if self.__changes.get(key, 0)+self.__resets != changeCount or self.__fd is None or self.__closing: return True
+					timeout = deadline-time.monotonic()
+					if timeout <= 0: return False
+					if not self.__reading: break
+					# another thread is reading the events, and will notify us when it has finished
+					self.__lock.wait(timeout)
+					if self.__isAborting(): return True
+				self.__reading = True
+				handles = [self.__fd] if self.abortHandle is None else [self.__fd, self.abortHandle]
+			try:
+				ready = select.select(handles, [], [], timeout)[0]
+				if self.abortHandle is not None and self.abortHandle in ready: return True
+				if ready: self.__readEvents()
+			finally:
+				with self.__lock:
+					self.__reading = False
+					if self.__closing: self.__closeFD()
+					self.__lock.notify_all()
+
+	def __isAborting(self):
+		return self.abortHandle is not None and bool(select.select([self.abortHandle], [], [], 0)[0])
+
+	def __readEvents(self):
+		# Drains all pending events (only called by the thread that is reading), and updates the change counts
+		events = []
+		while True:
+			try:
+				data = os.read(self.__fd, 64*1024)
+			except BlockingIOError:
+				break
+			if not data: break # pragma: no cover
+			offset = 0
+			while offset < len(data):
+				wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+				offset += _EVENT_HEADER.size
+				events.append((wd, mask, data[offset:offset+length].rstrip(b'\0')))
+				offset += length
+
+		with self.__lock:
+			for wd, mask, name in events:
+				if mask & (_IN_IGNORED | _IN_DELETE_SELF | _IN_MOVE_SELF):
+					# the directory itself has gone (or moved), so stop watching it; waiters will try to watch it again
+					dir = self.__watches.pop(wd, None)
+					if dir is None: continue
+					log.debug('inotify watch of %s was removed', dir)
+					del self.__dirs[dir]
+					if not mask & _IN_IGNORED: _getInotifyLibc().inotify_rm_watch(self.__fd, wd)
+					self.__resets += 1
+				elif mask & _IN_Q_OVERFLOW:
+					self.__resets += 1
+				else:
+					key = (self.__watches.get(wd), name)
+					if key in self.__changes: self.__changes[key] += 1
+
+	def __closeFD(self):
+		if self.__fd is not None:
+			os.close(self.__fd)
+			self.__fd = None
+
+	def close(self):
+		"""
+		Releases the inotify instance. After this, waiters using this monitor will fall back to sleeping.
+		"""
+		with self.__lock:
+			self.__closing = True
+			self.__dirs.clear()
+			self.__watches.clear()
+			if not self.__reading: self.__closeFD() # else the reading thread will close it when select returns
+			self.__lock.notify_all()
+
+	def __enter__(self): return self
+	def __exit__(self, exc_type, exc_value, traceback): self.close()
+
+class FileChangeWaiter(object):
+	"""
+	Waits for a file to be created, modified, replaced or deleted, waking up as soon as the change happens rather than
+	after a fixed polling interval.
+
+	On Linux this uses inotify (via ctypes) to watch the file's parent directory, so that creation of the file and
+	replacement of it (e.g. by log rotation) are detected as well as modification. On other platforms,
+	or if inotify cannot be used (for example because the directory does not exist yet or the per-user inotify limit has
+	been reached), `isEventDriven` is False and `wait` simply sleeps for the requested time, so callers should always
+	treat the wait time as an upper bound, and continue to check the condition they are waiting for each time it
+	returns. Changes made on another machine (e.g. over NFS) may not generate events, which is another reason to
+	avoid very long waits.
+
+	Any changes since the waiter was created (or since `wait` last returned) will make the next `wait` return
+	immediately, so the condition can be safely checked between creating the waiter and calling `wait`.
+
+	When waiting for several files (or from several threads), pass a shared `FileChangeMonitor` so that only one
+	inotify instance is used; otherwise each waiter creates its own.
+
+	The waiter must be closed when no longer required; it can be used as a context manager.
+
+	This class is not thread-safe, but several threads can each use their own waiter with the same monitor.
+
+	:param str path: The file to watch (which need not exist yet).
+	:param int abortHandle: An optional file descriptor which will wake up `wait` when it becomes readable, such as
+		`pysys.process.user.ProcessUser.isRunnerAbortingHandle`. It is never read from. Ignored if a monitor is
+		specified, since the monitor's abort handle is used instead.
+	:param FileChangeMonitor monitor: The (shared) monitor to use, or None to create a new one for this waiter.
+	"""
+	def __init__(self, path, abortHandle=None, monitor=None):
+		self.path = path
+		self.__ownsMonitor = monitor is None
+		self.__monitor = FileChangeMonitor(abortHandle) if monitor is None else monitor
+
+		path = os.path.realpath(path) # so that we watch the directory where the changes will actually happen
+		self.__dir, name = os.path.split(path)
+		self.__key = (self.__dir, os.fsencode(name))
+		self.__monitor._register(self.__key)
+		self.__closed = False
+		self.__monitor._watch(self.__dir)
+		self.__changeCount = self.__monitor._getChangeCount(self.__key)
+
+	def __repr__(self): return 'FileChangeWaiter<%s>'%self.path
+
+	@property
+	def isEventDriven(self):
+		"""True if changes to this file will wake up `wait` early, or False if `wait` will sleep for the whole time. """
+		return not self.__closed and self.__monitor._watch(self.__dir)
+
+	def wait(self, timeout):
+		"""
+		Blocks until the file changes, the abort handle is signalled, or the timeout expires (whichever is first).
+
+		:param float timeout: The maximum time to wait in seconds.
+		:return: True if a change was detected (or the abort handle was signalled), or False if the timeout expired.
+		"""
+		if not self.isEventDriven:
+			time.sleep(timeout)
+			return False
+		result = self.__monitor._wait(self.__key, self.__changeCount, timeout)
+		self.__changeCount = self.__monitor._getChangeCount(self.__key)
+		return result
+
+	def close(self):
+		"""
+		Releases the resources held by this waiter. After this, `wait` will fall back to sleeping.
+		"""
+		if self.__closed: return
+		self.__closed = True
+		self.__monitor._register(self.__key, register=False)
+		if self.__ownsMonitor: self.__monitor.close()
+
+	def __enter__(self): return self
+	def __exit__(self, exc_type, exc_value, traceback): self.close()
+
+class TreeChangeWaiter(object):
+	"""
+	Waits for changes to any of the files in a set of directory trees, or to a set of individual files. 
+
+	On Linux this uses a single inotify instance with a watch on each directory in the trees (including directories 
+	created while waiting) and on the parent directory of each individual file. On other platforms, or if inotify 
+	cannot be used (for example because the per-user limit on inotify watches has been reached), `isEventDriven` is 
+	False and callers must fall back to polling for changes instead. 
+
+	The waiter must be closed when no longer required; it can be used as a context manager.
+
+	This class is not thread-safe.
+
+	:param dict[str,set[str]] dirs: The directories to watch recursively. The value for each is a set of paths of 
+		subdirectories to exclude, such as output directories, which must be in the same form as the key. 
+	:param list[str] files: Individual files to watch (which need not exist yet). 
+	:param list[str] ignoreDirNames: The names of any directories to exclude anywhere in the trees, such as ``.git``. 
+	"""
+	def __init__(self, dirs, files=[], ignoreDirNames=[]):
+		self.isEventDriven = False
+		"""True if changes will wake up `wait`, or False if the caller must poll for changes. """
+
+		self.__fd = None
+		self.__watches = {} # key=wd, value=(dir, set of file names or None for all files in a recursively watched dir)
+		self.__skipDirs = set()
+		for skip in dirs.values(): self.__skipDirs.update(skip)
+		self.__ignoreDirNames = set(ignoreDirNames)
+		self.__libc = _getInotifyLibc()
+		if not self.__libc: return
+
+		fd = self.__libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+		if fd < 0:
+			log.debug('inotify_init1 failed with errno %d so will fall back to polling for changes', ctypes.get_errno())
+			return
+		self.__fd = fd
+		try:
+			for dir in dirs: self.__addTree(dir)
+			for f in files: self.__addWatch(os.path.dirname(f), os.path.basename(f))
+		except OSError as ex:
+			log.debug('Cannot use inotify so will fall back to polling for changes: %s', ex)
+			self.close()
+			return
+		self.isEventDriven = True
+
+	def __addWatch(self, dir, name=None):
+		# Watches the specified directory, either for changes to the named file, or (if name is None) for all changes
+		wd = self.__libc.inotify_add_watch(self.__fd, os.fsencode(dir), _WATCH_MASK)
+		if wd < 0:
+			errno = ctypes.get_errno()
+			if errno in [2, 20]: return False # ENOENT/ENOTDIR: nothing to watch (yet)
+			raise OSError(errno, 'inotify_add_watch failed for %s: %s'%(dir, os.strerror(errno)))
+		if wd in self.__watches: # inotify returns the existing watch if the directory is added twice
+			existingNames = self.__watches[wd][1]
+			if existingNames is None: return True
+			if name is not None:
+				existingNames.add(os.fsencode(name))
+				return True
+		self.__watches[wd] = (dir, None if name is None else {os.fsencode(name)})
+		return True
+
+	def __addTree(self, dir):
+		if not self.__addWatch(dir): return
+		try:
+			entries = list(os.scandir(dir))
+		except OSError: # e.g. deleted already
+			return
+		for entry in entries:
+			if entry.is_dir(follow_symlinks=False) and not self.__isSkipped(entry.name, entry.path): 
+				self.__addTree(entry.path)
+
+	def __isSkipped(self, name, path):
+		return name in self.__ignoreDirNames or path in self.__skipDirs
+
+	def wait(self, timeout=None):
+		"""
+		Blocks until any of the watched files change, or the timeout expires. 
+
+		:param float timeout: The maximum time to wait in seconds, or None to wait indefinitely. 
+		:return: True if a change was detected, or False if the timeout expired.
+		"""
+		if not self.isEventDriven:
+			if timeout is not None: time.sleep(timeout)
+			return False
+		deadline = None if timeout is None else time.monotonic()+timeout
+		while True:
+			if not select.select([self.__fd], [], [], None if deadline is None else max(0, deadline-time.monotonic()))[0]: return False
+			if self.__readEvents(): return True
+			if deadline is not None and time.monotonic() >= deadline: return False
+
+	def __readEvents(self):
+		# Drains all pending events, and returns True if any of them are relevant
+		relevant = False
+		while self.__fd is not None:
+			try:
+				data = os.read(self.__fd, 64*1024)
+			except BlockingIOError:
+				break
+			if not data: break # pragma: no cover
+			offset = 0
+			while offset < len(data):
+				wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+				offset += _EVENT_HEADER.size
+				name = data[offset:offset+length].rstrip(b'\0')
+				offset += length
+				if mask & _IN_Q_OVERFLOW: 
+					relevant = True
+					continue
+				watch = self.__watches.get(wd)
+				if watch is None: continue
+				dir, names = watch
+				if mask & _IN_IGNORED: # the directory has been deleted (or moved)
+					del self.__watches[wd]
+					relevant = True
+					continue
+				if not name: continue # an event for the directory itself
+				if names is not None:
+					if name in names: relevant = True
+					continue
+				path = os.path.join(dir, os.fsdecode(name))
+				if mask & _IN_ISDIR:
+					if self.__isSkipped(os.fsdecode(name), path): continue
+					if mask & (_IN_CREATE | _IN_MOVED_TO): 
+						try:
+							self.__addTree(path)
+						except OSError as ex:
+							log.debug('Cannot use inotify so will fall back to polling for changes: %s', ex)
+							self.close()
+							return True
+				relevant = True
+		return relevant
+
+	def close(self):
+		"""
+		Releases the resources held by this waiter. After this, `isEventDriven` is False. 
+		"""
+		self.isEventDriven = False
+		if self.__fd is not None:
+			os.close(self.__fd)
+			self.__fd = None
+
+	def __enter__(self): return self
+	def __exit__(self, exc_type, exc_value, traceback): self.close()
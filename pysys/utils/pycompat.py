@@ -100,6 +100,10 @@ def openfile(path, mode='r', encoding=None, errors=None, **kwargs):
 	if encoding:
 		__log.debug('Opening file using encoding=%s: %s', encoding, path)
 	
+	from pysys.internal.outputcapture import getCapturedOutput # import here to avoid circular dependency
+	captured = getCapturedOutput(path)
+	if captured is not None: return captured.open(mode, encoding=encoding, errors=errors, **kwargs)
+
 	from pysys.utils.fileutils import toLongPathSafe # import here to avoid circular dependency
 	path = toLongPathSafe(path, onlyIfNeeded=True)
 	
@@ -30,6 +30,7 @@ import sys, time, threading, traceback
 import queue as Queue
 
 from pysys import log
+from pysys.constants import IS_WINDOWS
 from pysys.process.user import ProcessUser
 from pysys.internal.initlogging import pysysLogHandler, stdoutHandler
 
@@ -56,10 +57,12 @@ def _handle_thread_exception(request, exc_info):
 class WorkerThread(threading.Thread):
 	"""Thread to perform work requests managed by the thread pool object.
 	
-	The thread polls the thread safe queue of the thread pool instance to retrieve
+	The thread blocks on the thread safe queue of the thread pool instance to retrieve
 	work requests in the form of a callable reference with parameters. On completion 
 	of a work request the thread places the results on another thread safe queue of the 
-	thread pool and waits to get a new request. 
+	thread pool and immediately gets the next request. 
+	
+	A ``None`` item on the request queue is used to wake the thread when it has been dismissed. 
 	
 	"""
   
@@ -68,7 +71,7 @@ class WorkerThread(threading.Thread):
 		
 		:param requests_queue: Reference to the threadpool's request queue
 		:param results_queue: Reference to the threadpool's results queue
-		:param poll_timeout: The timeout when trying to obtain a request from the request queue
+		:param poll_timeout: No longer used, since the thread is woken by the pool when dismissed
 		:param kwds: Variable arguments to be passed to the threading.Thread constructor
 		
 		"""
@@ -76,8 +79,8 @@ class WorkerThread(threading.Thread):
 		log.debug("[%s] Creating thread for test execution" % self.name)
 		self.daemon = True
 		self._requests_queue = requests_queue
+		self._requestComplete = getattr(requests_queue, 'requestComplete', None)
 		self._results_queue = results_queue
-		self._poll_timeout = poll_timeout
 		self._dismissed = threading.Event()
 		self.pool = pool
 		self.start()
@@ -88,21 +91,21 @@ class WorkerThread(threading.Thread):
 			while True:
 				if self._dismissed.is_set() or ProcessUser.isRunnerAborting is True:
 					break
-				try:
-					request = self._requests_queue.get(True, self._poll_timeout)
-				except Queue.Empty:
+				request = self._requests_queue.get()
+				if request is None: # wakeup from dismissWorkers
 					continue
-				else:
-					if self._dismissed.is_set() or ProcessUser.isRunnerAborting is True: 
-						self._requests_queue.put(request)
-						break
-					try:
-						result = request.callable(*request.args, **request.kwds)
-						self._results_queue.put((request, self.name, result))
-					except:
-						request.exception = True
-						self._results_queue.put((request, self.name, sys.exc_info()))
-				time.sleep(0.1)
+				if self._dismissed.is_set() or ProcessUser.isRunnerAborting is True: 
+					if self._requestComplete is not None: self._requestComplete(request)
+					self._requests_queue.put(request)
+					break
+				try:
+					result = request.callable(*request.args, **request.kwds)
+				except:
+					request.exception = True
+					result = sys.exc_info()
+				# release any resources held by this request before reporting the result, so the next test can start
+				if self._requestComplete is not None: self._requestComplete(request)
+				self._results_queue.put((request, self.name, result))
 		finally:
 			self.pool.onWorkerTerminated()
 					
@@ -158,8 +161,10 @@ class ThreadPool(object):
 		:param resq_size: The response queue size
 		:param requests_queue: a custom queue instance which can be used to implement any desired logic 
 			for deciding which job to execute next. Must implement the get() and put() methods 
-			from the queue.Queue class.
-		:param poll_timeout: The polling timeout of worker threads when getting requests from the queue
+			from the queue.Queue class, and must return any ``None`` items that are put (which are used to wake up 
+			dismissed workers) without undue delay. If it has a ``requestComplete(request)`` method, this is called 
+			by the worker thread after each request it got from the queue has been executed (or put back). 
+		:param poll_timeout: No longer used
 		"""
 		self._requests_queue = Queue.Queue(q_size) if requests_queue is None else requests_queue
 		self._results_queue = Queue.Queue(resq_size)
@@ -179,12 +184,13 @@ class ThreadPool(object):
 
 		with self.__lock:
 			self.workersRemaining -= 1
+		self._results_queue.put(None) # wake up the main thread so it can check workersRemaining
 
 	def createWorkers(self, num_workers, poll_timeout=5):
 		"""Create additional threads on the workers stack.
 
 		:param num_workers: The number of workers to add to the stack
-		:param poll_timeout: The timeout of the threads when waiting for a request on the queue
+		:param poll_timeout: No longer used
 		
 		"""
 		for i in range(num_workers):
@@ -207,6 +213,8 @@ class ThreadPool(object):
 			worker = self.workers.pop()
 			worker.dismiss()
 			dismiss_list.append(worker)
+		for worker in dismiss_list: # wake up any workers that are blocked waiting for a new request
+			self._requests_queue.put(None)
 
 		if do_join:
 			for worker in dismiss_list:
@@ -255,7 +263,11 @@ class ThreadPool(object):
 			elif block and (self.workersRemaining==0 or not self.workers):
 				raise NoWorkersAvailable
 			try:
-				request, name, result = self._results_queue.get(block=block, timeout=2) # timeout allows us to check for interruption periodically
+				# Results are delivered as soon as they're available, and a None item is used to wake us when a worker 
+				# terminates. On Windows a timeout is needed to allow the Ctrl+C signal handler to execute. 
+				item = self._results_queue.get(block=block, timeout=2 if IS_WINDOWS else None)
+				if item is None: continue
+				request, name, result = item
 				if request.exception and request.exc_callback:
 					request.exc_callback(name, result)
 				if request.callback and not \
@@ -112,6 +112,13 @@ __pysys_parameterized_test_modes__ = {
 # tests earlier. 
 # Comment this out to inherit from parent pysysdirconfig.xml files. 
 __pysys_execution_order_hint__ = +100.0
+
+# Declare the resources this test needs while executing, so that when running with multiple threads PySys avoids 
+# executing it at the same time as other tests if together they would exceed the budget for any resource (see the 
+# testResourceBudgets project property). Numeric resources such as cpus and memMB (or your own names) are added 
+# up, and "exclusive" gives the name of a mutex that no other concurrently executing test may hold. 
+# Comment this out to inherit from parent pysysdirconfig.xml files. 
+#__pysys_resources__ = "cpus=4, memMB=2000, exclusive=db"
 	
 # By default the test class uses this pysystest.py module, but it is possible to use a different path for the test 
 # (even an absolute path). If you want to use a single Python class for lots of tests, use a class with at least one 
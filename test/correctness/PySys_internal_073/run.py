@@ -35,8 +35,14 @@ class PySysTest(BaseTest):
 
 		runPySys(self, 'verbose', ['ls', '-v'], workingDir=testsdir) 
 
+		runPySys(self, 'ids', ['print', '--ids'], workingDir=testsdir)
+		runPySys(self, 'stream', ['print', '--stream'], workingDir=testsdir)
+		runPySys(self, 'stream-ids', ['ls', '-SI', '--include', 'performance', '--exclude', 'process'], workingDir=testsdir)
+		runPySys(self, 'stream-grep', ['print', '-S', '--grep', 'PySys_internal_073'], workingDir=testsdir)
+		runPySys(self, 'stream-with-tests', ['print', '--stream', 'PySys_internal_073'], workingDir=testsdir, expectedExitStatus='!=0')
+
 	def validate(self):
-		for t in ['basic', 'thistest', 'full', 'groups', 'modes', 'printTitle', 'printDir', 'printTitleAndDir', 'printTitleAndFile', 'verbose']:
+		for t in ['basic', 'thistest', 'full', 'groups', 'modes', 'printTitle', 'printDir', 'printTitleAndDir', 'printTitleAndFile', 'verbose', 'ids', 'stream', 'stream-ids', 'stream-grep']:
 			self.assertGrep(t+'.err', expr='.*', contains=False) # no errors
 
 		self.assertGrep('basic.out', expr='PySys_internal_073 *[|] *[^ ]+')
@@ -66,3 +72,15 @@ class PySysTest(BaseTest):
 
 		self.assertGrep('verbose.out', expr='PySys_internal_073 *[|] *[^ ]+')
 		self.assertGrep('verbose.out', expr=r'[/\\]PySys_internal_073')
+
+		# streaming prints the same tests, but unsorted and without aligning the titles
+		self.assertThat('streamedTests == sortedTests', 
+			streamedTests=sorted(self.getExprFromFile('stream.out', '^(.+)$', returnAll=True)), 
+			sortedTests=sorted(re.sub('  +[|]', '  |', line) for line in self.getExprFromFile('basic.out', '^(.+)$', returnAll=True)))
+		self.assertThat('ids == expected', ids=self.getExprFromFile('ids.out', '^(.+)$', returnAll=True), 
+			expected=self.getExprFromFile('basic.out', '^([^ ]+) ', returnAll=True))
+		self.assertThat('streamedIds == expected', streamedIds=sorted(self.getExprFromFile('stream-ids.out', '^(.+)$', returnAll=True)), 
+			expected=['PySys_internal_perf_001', 'PySys_internal_perf_002', 'PySys_internal_perf_004'])
+		self.assertGrep('stream-grep.out', expr='^PySys_internal_073  [|] pysys.py - print$')
+		self.assertLineCount('stream-grep.out', expr='^[^ ]', condition='==1')
+		self.assertGrep('stream-with-tests.err', expr='Cannot use --stream with \\[tests\\]')
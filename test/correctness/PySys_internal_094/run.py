@@ -27,7 +27,7 @@ class PySysTest(BaseTest):
 
 		subtest = 'default-project' 
 		createProjectConfig(self.mkdir(self.output+'/defconfig'))
-		runPySys(self, subtest, ['run', '--record', '--printLogs', 'all', '--threads', '2', '-o', subtest], 
+		runPySys(self, subtest, ['run', '--record', '--printLogs', 'all', '--threads', '1', '-o', subtest], # single-threaded to give deterministic ordering
 			workingDir='test', ignoreExitStatus=True, environs={'TRAVIS':'true', 
 				'PYSYS_PROJECTFILE':self.output+'/defconfig/pysysproject.xml'})
 
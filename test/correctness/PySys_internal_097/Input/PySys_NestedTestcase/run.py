@@ -27,7 +27,13 @@ class PySysTest(BaseTest):
 		self.startProcess(command=sys.executable, arguments=[self.input+'/test.py'], 
 			stdout='python.out', stderr='python.err')#, ignoreExitStatus=True)
 		
-		if os.path.exists(self.output+'/mytemp'): # prevent it getting purged
+		if os.path.exists(self.output+'/mytemp'): 
+			# if the test deletes the temp dir, it is recreated when needed
+			self.deleteDir('mytemp')
+			self.getDefaultEnvirons()
+			assert os.path.exists(self.output+'/mytemp')
+
+			# prevent it getting purged
 			with openfile(self.output+'/mytemp'+'/tmpfile.txt', 'w', encoding='ascii') as f:
 				f.write(u'xxx')
 
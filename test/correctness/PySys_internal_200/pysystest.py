@@ -0,0 +1,104 @@
+__pysys_title__   = r""" waitForGrep - incremental FileTailer with truncation, rotation and shared cursors """ 
+#                        ================================================================================
+__pysys_purpose__ = r""" """ 
+	
+__pysys_created__ = "2026-10-16"
+#__pysys_skipped_reason__   = "Skipped until Bug-1234 is fixed"
+
+import os, sys, math, shutil, glob
+
+import pysys.basetest, pysys.mappers
+from pysys.constants import *
+from pysys.utils.filegrep import FileTailer
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def append(self, file, text, encoding='utf-8'):
+		with open(self.output+'/'+file, 'a', encoding=encoding, newline='') as f:
+			f.write(text)
+
+	def execute(self):
+		path = self.output+'/tailed.log'
+		tailer = FileTailer(path, encoding='utf-8')
+		tailer.READ_CHUNK_SIZE = 3 # to check that multi-byte characters split across reads are decoded correctly
+		follower = tailer.follow('Started (.*)', ignores=['IGNORED'], errorExpr=['ERROR.*'])
+		self.assertThat('exists == expected', exists=tailer.poll(), expected=False)
+
+		self.append('tailed.log', 'Started £one\r\nStarted IGNORED\nStarted tw')
+		tailer.poll()
+		self.assertThat('matches == expected', matches=[m.group(1) for m in follower.getMatches()], expected=['£one', 'tw'])
+		self.append('tailed.log', 'o\nERROR first\nERROR second IGNORED\n')
+		tailer.poll()
+		self.assertThat('matches == expected', matches=[m.group(1) for m in follower.getMatches()], expected=['£one', 'two'])
+		self.assertThat('errorMatch == expected', errorMatch=follower.getErrorMatch().group(0), expected='ERROR first')
+		readOffset = tailer.offset
+		tailer.poll()
+		self.assertThat('offset == readOffset', offset=tailer.offset, readOffset=readOffset)
+
+		# a follower added later catches up with the lines already read
+		lateFollower = tailer.follow('ERROR')
+		tailer.poll()
+		self.assertThat('len(matches) == expected', matches=lateFollower.getMatches(), expected=2)
+
+		# truncation
+		self.write_text('tailed.log', 'Started three\n', encoding='utf-8')
+		tailer.poll()
+		self.assertThat('matches == expected', matches=[m.group(1) for m in follower.getMatches()], expected=['three'])
+		self.assertThat('errorMatch == None', errorMatch=follower.getErrorMatch())
+		
+		# rewritten to a larger size between polls
+		self.write_text('tailed.log', 'Started four\nStarted five\n', encoding='utf-8')
+		tailer.poll()
+		self.assertThat('matches == expected', matches=[m.group(1) for m in follower.getMatches()], expected=['four', 'five'])
+
+		# rotation
+		os.rename(path, path+'.1')
+		self.write_text('tailed.log', 'Started six\n', encoding='utf-8')
+		tailer.poll()
+		self.assertThat('matches == expected', matches=[m.group(1) for m in follower.getMatches()], expected=['six'])
+
+		# followers without mappers are reused by subsequent waits for the same expression; those with mappers are not
+		tailer.release(follower)
+		self.assertThat('reused is True', reused=tailer.follow('Started (.*)', ignores=['IGNORED'], errorExpr=['ERROR.*']) is follower)
+		self.assertThat('reused is False', reused=tailer.follow('Started (.*)', ignores=['IGNORED'], errorExpr=['ERROR.*'], mappers=[lambda l: l]) is follower)
+
+		self.assertThat('followable is False', followable=FileTailer.isFollowable([pysys.mappers.JoinLines.PythonTraceback()]))
+		self.assertThat('followable is True', followable=FileTailer.isFollowable([pysys.mappers.IncludeLinesBetween('a', 'b'), None]))
+
+		# a partial line at a boundary of a stateful mapper must not change its state until the line is complete
+		self.write_text('boundary.log', 'Line 0\nBEGIN', encoding='utf-8')
+		boundaryTailer = FileTailer(self.output+'/boundary.log', encoding='utf-8')
+		boundaryFollower = boundaryTailer.follow('.+', mappers=[pysys.mappers.IncludeLinesBetween(startAfter='BEGIN', stopBefore='END')])
+		boundaryTailer.poll()
+		for text in ['\nLine 1\nEND', '\nLine 2\nBEGIN', '\nLine 3\n']:
+			self.append('boundary.log', text)
+			boundaryTailer.poll()
+		self.assertThat('matches == expected', matches=[m.group(0) for m in boundaryFollower.getMatches()], expected=['Line 1', 'Line 3'])
+
+		# waitForGrep, including a final line without a newline, and stateful mappers that see each line once
+		self.write_text('server.log', 'Server starting\n', encoding='utf-8')
+		self.waitForGrep('server.log', 'Server starting', encoding='utf-8')
+		self.append('server.log', 'Line 1\nLine 2\nServer ready')
+		self.waitForGrep('server.log', 'Line', condition='==2', encoding='utf-8')
+		self.waitForGrep('server.log', 'Server (starting|ready)', condition='>=2', encoding='utf-8')
+		self.append('server.log', ' for requests\nBEGIN\nLine 3\nEND\nLine 4\n')
+		self.waitForGrep('server.log', 'Server ready for requests', encoding='utf-8')
+		
+		linesSeen = []
+		def recordingMapper(line):
+			linesSeen.append(line)
+			return line
+		self.waitForGrep('server.log', 'Line', condition='==1', encoding='utf-8', 
+			mappers=[pysys.mappers.IncludeLinesBetween('BEGIN', 'END'), recordingMapper])
+		self.append('server.log', 'ERROR Something bad happened\n')
+		self.waitForGrep('server.log', 'Line 5', encoding='utf-8', errorExpr=['ERROR'], abortOnError=False, timeout=10)
+		self.assertThat('linesSeen == expected', linesSeen=linesSeen, expected=['BEGIN\n', 'Line 3\n', 'END\n'])
+
+		# generator mappers still work, though without incremental reading
+		self.waitForGrep('server.log', 'BEGIN / Line 3 / END', encoding='utf-8', 
+			mappers=[pysys.mappers.JoinLines(startAt='BEGIN', stopAfter='END')])
+
+	def validate(self):
+		self.assertThat('outcome == expected', outcome=self.getOutcome(), expected=BLOCKED)
+		self.assertThat('outcomeReason.startswith(expected)', outcomeReason=self.getOutcomeReason(), expected='"ERROR Something bad happened" found while waiting for "Line 5"')
+		self.addOutcome(PASSED, override=True)
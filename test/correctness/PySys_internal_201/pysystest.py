@@ -0,0 +1,38 @@
+__pysys_title__   = r""" Assertions - LineMatcher single-pass multi-pattern matching with literal prefilters """ 
+#                        ================================================================================
+__pysys_purpose__ = r""" """ 
+	
+__pysys_created__ = "2026-10-16"
+#__pysys_skipped_reason__   = "Skipped until Bug-1234 is fixed"
+
+import os, sys, math, shutil, glob, re
+
+import pysys.basetest, pysys.mappers
+from pysys.constants import *
+from pysys.utils.filegrep import LineMatcher, getmultimatches, _requiredLiteral
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		self.assertThat('literals == expected', literals=[_requiredLiteral(e, 0) for e in [
+			' ERROR .*', r'abc(de|f)gh(?i:XY)[.]z\d+', '(?i)abc', 'a|bcd', 'Server (starting|ready)', 'x?yz', r'c:[\\]Foo', '(?x) a b c ']], 
+			expected=[' ERROR ', 'abc', '', '', 'Server ', 'yz', 'c:\\Foo', 'abc'])
+		self.assertThat('literal == ""', literal=_requiredLiteral('abc', re.IGNORECASE))
+		
+		matcher = LineMatcher(['ERROR', 'WARN (.*)', 'x'], ignores=['ignore me'])
+		self.assertThat('matches == expected', matches={i: m.group(0) for i, m in matcher.search('WARN foo ERROR x\n').items()}, 
+			expected={0: 'ERROR', 1: 'WARN foo ERROR x', 2: 'x'})
+		self.assertThat('matches == {}', matches=matcher.search('WARN please ignore me\n'))
+		self.assertThat('matches == {}', matches=matcher.search('nothing\n'))
+		self.assertThat('match.group(1) == expected', match=matcher.searchExpr(1, 'WARN abc\n'), expected='abc')
+		self.assertThat('match is None', match=matcher.searchExpr(0, 'WARN abc\n'))
+
+		self.write_text('file.txt', 'Line 1 Error\nLine 2 WARN\nLine 3 error\nLine 4 IGNORED\n')
+		matches = getmultimatches(self.output+'/file.txt', ['Line', 'error', 'WARN', 'FATAL'], ignores=['IGNORED'], flags=re.IGNORECASE)
+		self.assertThat('counts == expected', counts=[len(m) for m in matches], expected=[3, 2, 1, 0])
+		
+	def validate(self):
+		self.assertLineCount('file.txt', 'Line [0-9]', ignores=['IGNORED'], condition='==3')
+		self.assertGrep('file.txt', 'Line [0-9] FATAL', contains=False)
+		self.assertOrderedGrep('file.txt', exprList=['Line 1', 'WARN', 'Line 4'])
+		self.assertOrderedGrep('file.txt', exprList=['Line 2', 'Line 1'], contains=False)
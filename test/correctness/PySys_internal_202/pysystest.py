@@ -0,0 +1,100 @@
+__pysys_title__   = r""" waitForGrep/waitForFile - event-driven waits using inotify """ 
+#                        ================================================================================
+__pysys_purpose__ = r""" """ 
+	
+__pysys_created__ = "2026-10-16"
+#__pysys_skipped_reason__   = "Skipped until Bug-1234 is fixed"
+
+import os, sys, math, shutil, glob, time, threading
+
+import pysys.basetest, pysys.mappers
+from pysys.constants import *
+from pysys.utils.filewatch import FileChangeMonitor, FileChangeWaiter, TreeChangeWaiter
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		with FileChangeWaiter(self.output+'/file.txt') as waiter:
+			if not waiter.isEventDriven: self.skipTest('inotify is not supported on this platform')
+
+		def writeLater(file, text, delay):
+			def write():
+				time.sleep(delay)
+				self.write_text(self.output+'/other.txt', 'ignore me') # should not wake the waiter
+				self.write_text(file, text)
+			threading.Thread(target=write).start()
+		
+		# trees of directories, excluding skipped dirs, and including dirs created while watching
+		self.mkdir('tree/Output')
+		self.mkdir('tree/.git')
+		with TreeChangeWaiter({self.output+'/tree': {self.output+'/tree/Output'}}, files=[self.output+'/watched.txt'], 
+				ignoreDirNames=['.git']) as waiter:
+			self.assertThat('waiter.isEventDriven', waiter=waiter)
+			self.write_text('tree/Output/ignored.txt', 'x')
+			self.write_text('tree/.git/ignored.txt', 'x')
+			self.write_text('unwatched.txt', 'x')
+			self.assertThat('changed is False', changed=waiter.wait(0.5))
+			self.mkdir('tree/newdir')
+			self.assertThat('changed is True', changed=waiter.wait(5))
+			self.write_text('tree/newdir/file.txt', 'x')
+			self.assertThat('changed is True', changed=waiter.wait(5))
+			self.write_text('watched.txt', 'x')
+			self.assertThat('changed is True', changed=waiter.wait(5))
+
+		# many files and threads share a single inotify instance (per ProcessUser), with a watch per directory
+		def countInotifyInstances():
+			return len([fd for fd in os.listdir('/proc/self/fd') if 'inotify' in os.path.realpath('/proc/self/fd/'+fd)])
+		instancesBefore = countInotifyInstances()
+		for i in range(3): self.mkdir('shared%d'%i)
+		with FileChangeMonitor() as monitor:
+			waiters = [FileChangeWaiter(self.output+'/shared%d/file%d.txt'%(i%3, i), monitor=monitor) for i in range(10)]
+			self.assertThat('inotifyInstances == 1', inotifyInstances=countInotifyInstances()-instancesBefore)
+			for w in waiters: w.close()
+		
+		start = time.monotonic()
+		threads = [self.startBackgroundThread('waiter%d'%i, lambda file, stopping, log: self.waitForGrep(file, 'Ready', poll=20, timeout=30), 
+			kwargsForTarget={'file':'shared%d/thread%d.txt'%(i%3, i)}) for i in range(10)]
+		time.sleep(0.5)
+		for i in range(10): self.write_text('shared%d/thread%d.txt'%(i%3, i), 'Ready')
+		for t in threads: t.join()
+		self.sharedDuration = time.monotonic()-start
+
+		# Even with a long poll interval, these should return as soon as the file changes
+		start = time.monotonic()
+		writeLater('file.txt', 'Hello world', 0.5)
+		self.waitForFile('file.txt', timeout=30)
+		self.waitForGrep('file.txt', 'Hello world', poll=20, timeout=30)
+		writeLater('file.txt', 'Server started', 0.5)
+		self.waitForGrep('file.txt', 'Server started', poll=20, timeout=30)
+		self.duration = time.monotonic()-start
+
+		# mappers that prevent incremental reading mean the whole file is re-read each time, so a chatty file must not 
+		# trigger a re-read on every write
+		def writeMany():
+			for i in range(100):
+				with open(self.output+'/chatty.log', 'a') as f: f.write('Line %d\n'%i)
+				time.sleep(0.01)
+			with open(self.output+'/chatty.log', 'a') as f: f.write('Finished\n')
+		self.write_text('chatty.log', 'Started\n')
+		rescans = []
+		def countingMapper(line):
+			if line.startswith('Started'): rescans.append(line)
+			return line
+		threading.Thread(target=writeMany).start()
+		self.waitForGrep('chatty.log', 'Finished', poll=0.5, timeout=30, mappers=[countingMapper, pysys.mappers.JoinLines.PythonTraceback()])
+		self.rescans = len(rescans)
+
+		# waiters live until cleanup, so must not be affected by other code closing a (reused) fd number twice
+		reader = self.startPython(['-c', 'import sys, time; sys.stdin.read(); time.sleep(1)'], stdouterr='reader', background=True)
+		reader.write('hello', closeStdinAfterWrite=True)
+		time.sleep(0.5) # stdin is closed asynchronously
+		writeLater('stdin-closed.txt', 'Done', 0.1)
+		self.waitForGrep('stdin-closed.txt', 'Done', poll=20, timeout=30)
+		self.waitProcess(reader, timeout=30)
+		writeLater('stdin-closed.txt', 'Done again', 0.1)
+		self.waitForGrep('stdin-closed.txt', 'Done again', poll=20, timeout=30)
+
+	def validate(self):
+		self.assertThat('duration < 10', duration=self.duration)
+		self.assertThat('sharedDuration < 10', sharedDuration=self.sharedDuration)
+		self.assertThat('rescans <= 10', rescans=self.rescans)
@@ -0,0 +1,16 @@
+__pysys_title__   = r""" My test """ 
+#                        ================================================================================
+__pysys_purpose__ = r""" """ 
+	
+__pysys_created__ = "2026-10-16"
+
+import pysys
+from pysys.constants import *
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		self.wait(0)
+		
+	def validate(self):
+		self.addOutcome(PASSED)
@@ -0,0 +1,65 @@
+__pysys_title__   = r""" pysys.py - run --sort=duration longest-first scheduling """
+#                        ================================================================================
+__pysys_purpose__ = r""" """
+
+__pysys_created__ = "2026-10-16"
+#__pysys_skipped_reason__   = "Skipped until Bug-1234 is fixed"
+
+import pysys
+from pysys.constants import *
+from pysys.internal.testscheduler import TestDurationHistory, predictMakespan
+
+import os, sys, math, shutil, glob, json, types
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		self.copy(self.input, self.output+'/test')
+		self.pysys.pysys('pysys-run-1', ['run', '-o', self.output+'/myoutdir1', '--sort=duration', '-j2'], workingDir=self.output+'/test')
+		self.pysys.pysys('pysys-run-2', ['run', '-o', self.output+'/myoutdir2', '--sort=duration', '-c2'], workingDir=self.output+'/test')
+		self.logFileContents('pysys-run-2.out', includes=['Id: .*', '.*[Pp]redicted.*'])
+
+		# estimates for tests that haven't been seen before
+		self.write_text('durations.json', json.dumps({'formatVersion':1, 'tests':{
+			'dir1/Known':{'duration':10.0},
+			'dir1/Known2':{'duration':20.0},
+			'dir2/Moded~m1':{'duration':4.0},
+			'dir2/Moded~m2':{'duration':6.0},
+			'dir3/Other':{'duration':100.0},
+		}}))
+		history = TestDurationHistory(self.output+'/durations.json')
+		def d(id, dir): return types.SimpleNamespace(id=id, idWithoutMode=id.split('~')[0], testDir='/tests/%s/%s'%(dir, id))
+		descriptors = [d('dir1/Known', 'dir1'), d('dir1/Known2', 'dir1'), d('dir1/New', 'dir1'), d('dir2/Moded~m3', 'dir2'), d('dir4/New', 'dir4')]
+		history.prepareEstimates(descriptors)
+		self.estimates = {x.id: history.estimateDuration(x) for x in descriptors}
+
+		history.record(descriptors[0], 20.0)
+		self.afterRecord = history.estimateDuration(descriptors[0])
+		history.save()
+		self.reloaded = TestDurationHistory(self.output+'/durations.json').getDuration(descriptors[0])
+
+	def validate(self):
+		durationsFile = glob.glob(self.output+'/test/__pysys_performance/testDurations_*.json')
+		self.assertThat('len(durationsFile) == 1', durationsFile=durationsFile)
+		with open(durationsFile[0], encoding='utf-8') as f: durations = json.load(f)['tests']
+		self.assertThat('sorted(durations) == expected', durations=durations, expected=['Test_A', 'Test_B', 'Test_C'])
+		self.assertThat('durations["Test_B"]["duration"] > durations["Test_C"]["duration"] > durations["Test_A"]["duration"]', durations=durations)
+
+		# first run has no history, second run dispatches the longest first
+		self.assertGrep('pysys-run-1.out', r'Predicted duration of test execution is 0.0 secs, based on historical durations for 0 of 3 tests')
+		self.assertOrderedGrep('pysys-run-2.out', exprList=['Id: *Test_B', 'Id: *Test_C', 'Id: *Test_A', 'Id: *Test_B', 'Id: *Test_C', 'Id: *Test_A'])
+		self.assertGrep('pysys-run-2.out', r'Predicted duration of test execution is 1.[0-9] secs, based on historical durations for 3 of 3 tests')
+		self.assertGrep('pysys-run-2.out', r'Test execution took [0-9.]+ secs \(predicted 1.[0-9] secs\)')
+
+		self.assertThat('estimates == expected', estimates=self.estimates, expected={
+			'dir1/Known': 10.0,
+			'dir1/Known2': 20.0,
+			'dir1/New': 15.0, # median of same dir
+			'dir2/Moded~m3': 5.0, # mean of other modes
+			'dir4/New': 10.0, # median of everything
+		})
+		self.assertThat('afterRecord == 15.0', afterRecord=self.afterRecord)
+		self.assertThat('reloaded == 15.0', reloaded=self.reloaded)
+
+		self.assertThat('makespan == 10', makespan=predictMakespan([5, 4, 3, 3, 3], 2))
+		self.assertThat('makespan == 16', makespan=predictMakespan([5, 4, 3, 3, 1], 1))
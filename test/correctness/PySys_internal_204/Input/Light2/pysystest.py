@@ -0,0 +1,19 @@
+__pysys_title__   = r""" My test """ 
+#                        ================================================================================
+__pysys_purpose__ = r""" """ 
+	
+__pysys_created__ = "2026-10-16"
+
+
+import pysys, time
+from pysys.constants import *
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		start = time.time()
+		self.wait(0.5)
+		self.write_text('times.txt', '%f,%f'%(start, time.time()))
+		
+	def validate(self):
+		self.addOutcome(PASSED)
@@ -0,0 +1,65 @@
+__pysys_title__   = r""" pysys.py - run with __pysys_resources__ budgets and exclusive mutexes """
+#                        ================================================================================
+__pysys_purpose__ = r""" """
+
+__pysys_created__ = "2026-10-16"
+#__pysys_skipped_reason__   = "Skipped until Bug-1234 is fixed"
+
+import pysys
+from pysys.constants import *
+from pysys.config.descriptor import parseResources, formatResources
+from pysys.internal.testscheduler import TestScheduler
+
+import os, sys, math, shutil, glob, itertools
+from types import SimpleNamespace
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		self.pysys.pysys('pysys-run', ['run', '-o', self.output+'/myoutdir', '-j4'], workingDir=self.input)
+		self.pysys.pysys('pysys-print', ['print', '--full', 'Db2', 'Heavy2'], workingDir=self.input)
+
+		self.times = {}
+		for f in glob.glob(self.output+'/myoutdir/*/times.txt'):
+			with open(f) as fh: self.times[os.path.basename(os.path.dirname(f))] = [float(x) for x in fh.read().split(',')]
+		self.log.info('Test execution times: %s', ', '.join('%s=%.1f-%.1f'%(k, v[0]-min(x[0] for x in self.times.values()), v[1]-min(x[0] for x in self.times.values()))
+			for k, v in sorted(self.times.items(), key=lambda kv: kv[1])))
+
+	def validate(self):
+		self.assertGrep('pysys-run.out', 'Scheduling tests within resource budgets: cpus=2, memMB=')
+		self.assertThat('sorted(testsExecuted) == expected', testsExecuted=list(self.times),
+			expected=['Db1', 'Db2', 'Heavy1', 'Heavy2', 'Huge', 'Light1', 'Light2', 'Light3'])
+
+		def overlaps(a, b): return self.times[a][0] < self.times[b][1] and self.times[b][0] < self.times[a][1]
+		for a, b in [('Heavy1', 'Heavy2'), ('Heavy1', 'Huge'), ('Heavy2', 'Huge'), ('Db1', 'Db2')]:
+			self.assertThat('not overlaps', overlaps=overlaps(a, b), testA=a, testB=b)
+
+		# but tests without resource requirements still run concurrently
+		self.assertThat('overlapping > 0', overlapping=sum(1 for a, b in itertools.combinations(self.times, 2) if overlaps(a, b)))
+
+		# descriptor values are inherited from the pysysdirconfig.xml
+		self.assertGrep('pysys-print.out', 'Test resources: *exclusive=db, memMB=1$')
+		self.assertGrep('pysys-print.out', 'Test resources: *cpus=1.5, memMB=1$')
+
+		self.assertThat('parsed == expected', parsed=parseResources(' cpus=4, memMB=2000,exclusive=db, exclusive=kafka, '),
+			expected={'cpus':4.0, 'memMB':2000.0, 'exclusive':['db', 'kafka']})
+		self.assertThat('formatted == expected', formatted=formatResources({'cpus':4.0, 'exclusive':['db', 'kafka']}),
+			expected='cpus=4, exclusive=db, exclusive=kafka')
+		# tests that don't fit are skipped over without losing their priority once resources are released
+		def request(name, **resources): return SimpleNamespace(name=name, callable=SimpleNamespace(descriptor=SimpleNamespace(resources=resources)))
+		scheduler = TestScheduler(resourceBudgets={'cpus':2})
+		for r in [request('a', cpus=2), request('b', cpus=1), request('c', exclusive=['db']), request('d', exclusive=['db']), request('e')]: 
+			scheduler.put(r)
+		dispatched = [scheduler.get_nowait() for i in range(3)]
+		self.assertThat('dispatched == expected', dispatched=[r.name for r in dispatched], expected=['a', 'c', 'e'])
+		self.assertThat('qsize == 0', qsize=scheduler.qsize())
+		for r in dispatched: scheduler.requestComplete(r)
+		self.assertThat('dispatched == expected', dispatched=[scheduler.get_nowait().name for i in range(2)], expected=['b', 'd'])
+
+		for invalid in ['cpus', 'cpus=x', 'cpus=-1', '=1']:
+			try:
+				parseResources(invalid)
+			except ValueError as ex:
+				self.log.info('Got expected exception: %s', ex)
+			else:
+				self.addOutcome(FAILED, 'Expected parse error for %r'%invalid)
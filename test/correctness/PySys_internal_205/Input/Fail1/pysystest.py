@@ -0,0 +1,18 @@
+__pysys_title__   = r""" My test """ 
+#                        ================================================================================
+__pysys_purpose__ = r""" """ 
+	
+__pysys_created__ = "2026-10-16"
+
+
+import pysys, os
+from pysys.constants import *
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		self.write_text('worker.txt', '%d,%d'%(os.getpid(), self.getNextAvailableTCPPort()))
+		self.wait(0.5)
+		
+	def validate(self):
+		self.assertThat('actual == expected', actual=1, expected=2)
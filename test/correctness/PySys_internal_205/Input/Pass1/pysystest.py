@@ -0,0 +1,19 @@
+__pysys_title__   = r""" My test """ 
+#                        ================================================================================
+__pysys_purpose__ = r""" """ 
+	
+__pysys_created__ = "2026-10-16"
+
+
+import pysys, os
+from pysys.constants import *
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		self.log.info('Hello from %s', self.descriptor.id)
+		self.write_text('worker.txt', '%d,%d'%(os.getpid(), self.getNextAvailableTCPPort()))
+		self.reportPerformanceResult(123, 'Process worker sample result', '/s')
+		
+	def validate(self):
+		self.addOutcome(PASSED)
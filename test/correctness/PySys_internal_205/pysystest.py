@@ -0,0 +1,58 @@
+__pysys_title__   = r""" pysys.py - run with --workers=processes """
+#                        ================================================================================
+__pysys_purpose__ = r""" """
+
+__pysys_created__ = "2026-10-16"
+#__pysys_skipped_reason__   = "Skipped until Bug-1234 is fixed"
+
+import pysys
+from pysys.constants import *
+
+import os, sys, math, shutil, glob
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		self.copy(self.input, self.output+'/test')
+		self.pysys.pysys('pysys-run', ['run', '-o', self.output+'/myoutdir', '--workers=processes', '-j2', '--record', '--mode=ALL'], 
+			workingDir=self.output+'/test', expectedExitStatus='==2')
+		self.pysys.pysys('pysys-run-cycles', ['run', '-o', self.output+'/myoutdir-cycles', '--workers=processes', '-j2', '-c2', '--mode=ALL', 'Moded'], 
+			workingDir=self.output+'/test')
+		self.pysys.pysys('pysys-run-invalid', ['run', '--workers=foo'], workingDir=self.output+'/test', expectedExitStatus='!=0')
+
+	def validate(self):
+		self.assertGrep('pysys-run.out', 'Tests will be executed in 2 worker processes')
+		self.assertGrep('pysys-run.out', 'Traceback', contains=False)
+
+		# outcomes and run.log output are reported in the main process
+		self.assertGrep('pysys-run.out', 'Failure outcomes: 1 FAILED')
+		self.assertGrep('pysys-run.out', 'Success outcomes: 3 PASSED')
+		self.assertGrep('pysys-run.out', 'Assert that {actual == expected} with actual=1 expected=2 ... failed')
+		self.assertGrep('pysys-run.out', 'Hello from Pass1')
+		self.assertGrep('pysys-run.out', 'Test final outcome: *PASSED')
+		self.assertGrep('myoutdir/Pass1/run.log', 'Performance result: Process worker sample result = 123 /s')
+		self.assertGrep('myoutdir/Fail1/run.log', 'Test outcome reason: *Assert that')
+		self.assertGrep('test/__pysys_junit_xml/TEST-Fail1.xml', '<failure message="FAILED: Assert that {actual == expected} with actual=1 expected=2"')
+		self.assertGrep('test/__pysys_junit_xml/TEST-Fail1.xml', 'Waiting for 0.5 seconds')
+		self.assertGrep('pysys-run-invalid.out', "The only supported worker types for pysys run are 'threads' and 'processes'")
+
+		# performance results are written by the main process's reporters
+		perfFiles = glob.glob(self.output+'/myoutdir/__pysys_performance/*/*.csv')
+		self.assertThat('len(perfFiles) == 1', perfFiles=perfFiles)
+		self.assertGrep(perfFiles[0], 'Process worker sample result,Pass1,123,/s')
+		self.assertGrep('myoutdir/Pass1/performance_results.csv', 'Process worker sample result,Pass1,123,/s')
+
+		# tests ran in separate processes, with no overlap in the ports they were allocated
+		workers = {}
+		for f in glob.glob(self.output+'/myoutdir/*/worker.txt'):
+			with open(f) as fh: workers[os.path.basename(os.path.dirname(f))] = [int(x) for x in fh.read().split(',')]
+		self.assertThat('sorted(workers) == expected', workers=workers, expected=['Fail1', 'Moded~ModeA', 'Moded~ModeB', 'Pass1'])
+		self.assertThat('os.getpid() not in pids', pids=[pid for pid, port in workers.values()])
+		self.assertThat('1 < len(set(pids)) <= 2', pids=[pid for pid, port in workers.values()])
+		for test, (pid, port) in workers.items():
+			self.assertThat('len(pidsUsingPortPartition) == 1', pidsUsingPortPartition={p for p, port2 in workers.values() if port2 % 3 == port % 3}, test=test)
+
+		# multiple cycles of the same test can run in different workers without deleting each other's output
+		for cycle in [1, 2]:
+			for mode in ['ModeA', 'ModeB']:
+				self.assertPathExists('myoutdir-cycles/Moded~%s/cycle%d/worker.txt'%(mode, cycle))
@@ -0,0 +1,78 @@
+__pysys_title__   = r""" pysys.py - run with --shard and combine the shards using pysys merge """
+#                        ================================================================================
+__pysys_purpose__ = r""" """
+
+__pysys_created__ = "2026-10-16"
+#__pysys_skipped_reason__   = "Skipped until Bug-1234 is fixed"
+
+import pysys
+from pysys.constants import *
+
+import os, sys, math, shutil, glob, json
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		# each shard runs in its own copy of the project, as if on a separate machine
+		for shard in [1, 2]:
+			shardDir = self.output+'/shard%d'%shard
+			self.copy(self.input, shardDir)
+			for i in range(1, 7):
+				self.mkdir(shardDir+'/T%d'%i)
+				self.write_text(shardDir+'/T%d/pysystest.py'%i, '\n'.join([
+					'__pysys_title__ = "Test %d"'%i,
+					'import pysys',
+					'from pysys.constants import *',
+					'class PySysTest(pysys.basetest.BaseTest):',
+					'	def execute(self):',
+					'		self.reportPerformanceResult(%d, "Sample result from T%d", "s")'%(i, i),
+					'	def validate(self):',
+					'		self.addOutcome(%s)'%('FAILED' if i == 4 else 'PASSED'),
+					'']))
+			self.pysys.pysys('pysys-run-shard%d'%shard, ['run', '-o', 'out', '--record', '--shard', '%d/2'%shard], 
+				workingDir=shardDir, expectedExitStatus='==2' if shard == 1 else '==0')
+		
+		# merging does not need a project, but run it from one of the project directories for consistency with other commands
+		self.pysys.pysys('pysys-merge', ['merge', '--outdir', '../merged', 
+			'../shard*/results/results.json', '../shard*/results/results.xml', '../shard*/results/results.csv', '../shard*/results/junit', 
+			'../shard*/results/perf.csv', '../shard*/results/perf.json', '../shard*/durations.json'], 
+			workingDir=self.output+'/shard1')
+		self.pysys.pysys('pysys-merge-invalid', ['merge', '--outdir', '../merged2', 'T1/pysystest.py'], 
+			workingDir=self.output+'/shard1', expectedExitStatus='==10')
+		self.pysys.pysys('pysys-run-invalid', ['run', '--shard', '3/2'], workingDir=self.output+'/shard1', expectedExitStatus='==10')
+
+	def validate(self):
+		# shards are balanced by duration: 1/2=T1+T4+T6, 2/2=T2+T3+T5
+		self.assertGrep('pysys-run-shard1.out', 'Selected tests for shard 1/2 from 6 tests, based on historical durations for 6 of them')
+		# without --sort duration, the durations are only used for selecting the shard, not for ordering
+		self.assertGrep('pysys-run-shard1.out', 'Predicted duration', contains=False)
+		shardTests = {}
+		for shard in [1, 2]:
+			shardTests[shard] = sorted(os.path.basename(f)[5:-4] for f in glob.glob(self.output+'/shard%d/results/junit/TEST-*.xml'%shard))
+		self.assertThat('shard1Tests == expected', shard1Tests=shardTests[1], expected=['T1', 'T4', 'T6'])
+		self.assertThat('shard2Tests == expected', shard2Tests=shardTests[2], expected=['T2', 'T3', 'T5'])
+		
+		self.assertGrep('pysys-merge.out', 'Merged test outcomes: 1 FAILED, 5 PASSED')
+		self.assertGrep('pysys-merge.out', 'Traceback', contains=False)
+		self.assertGrep('pysys-merge-invalid.err', 'Cannot merge ".*pysystest.py" as it is not a recognized type of test results file')
+		self.assertGrep('pysys-run-invalid.out', 'The --shard option must be of the form SHARD/SHARD_COUNT')
+		
+		with open(self.output+'/merged/results.json', encoding='utf-8') as f: results = json.load(f)
+		self.assertThat('testIds == expected', testIds=sorted(r['testId'] for r in results['results']), expected=['T%d'%i for i in range(1, 7)])
+		self.assertThat('runDetails["shard"] == "1/2; 2/2"', runDetails=results['runDetails'])
+
+		self.assertThat('completed == "6/6"', completed=self.getExprFromFile('merged/results.xml', 'completed="([^"]+)"'))
+		self.assertThat('resultCount == 6', resultCount=len(self.grepAll('merged/results.xml', '<result id=')))
+		self.assertThat('rowCount == 6', rowCount=len(self.grepAll('merged/results.csv', '^T[0-9],')))
+		self.assertThat('junitFiles == expected', junitFiles=sorted(os.listdir(self.output+'/merged/junit')), 
+			expected=['TEST-T%d.xml'%i for i in range(1, 7)])
+
+		for i in range(1, 7):
+			self.assertGrep('merged/perf.csv', 'Sample result from T%d,T%d,%d.0,s'%(i, i, i))
+		with open(self.output+'/merged/perf.json', encoding='utf-8') as f: perfResults = json.load(f)['results']
+		self.assertThat('len(perfResults) == 6', perfResults=perfResults)
+		
+		with open(self.output+'/merged/durations.json', encoding='utf-8') as f: durations = json.load(f)
+		self.assertThat('sorted(durations["tests"]) == expected', durations=durations, expected=['T%d'%i for i in range(1, 7)])
+		# the merged history has the (much shorter) durations recorded by the shards, not the seeded ones
+		self.assertThat('durations["tests"]["T1"]["duration"] < 10', durations=durations)
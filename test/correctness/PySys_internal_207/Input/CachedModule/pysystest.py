@@ -0,0 +1,17 @@
+__pysys_title__   = r""" My test """ 
+#                        ================================================================================
+__pysys_purpose__ = r""" """ 
+	
+__pysys_created__ = "2026-10-16"
+__pysys_modes__ = r""" lambda helper: helper.createModeCombinations(helper.inheritedModes, [{'mode':'ModeA'}, {'mode':'ModeB'}]) """
+
+import pysys, os
+from pysys.constants import *
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		self.write_text('module.txt', '%d'%id(globals()))
+		
+	def validate(self):
+		self.addOutcome(PASSED)
@@ -0,0 +1,40 @@
+__pysys_title__   = r""" pysys.py - test modules are loaded once per run """
+#                        ================================================================================
+__pysys_purpose__ = r""" """
+
+__pysys_created__ = "2026-10-16"
+#__pysys_skipped_reason__   = "Skipped until Bug-1234 is fixed"
+
+import pysys
+from pysys.constants import *
+
+import os, sys, math, shutil, glob, types
+from pysys.baserunner import TestContainer
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		self.copy(self.input, self.output+'/test')
+		self.pysys.pysys('pysys-run', ['run', '-o', self.output+'/myoutdir', '-j3', '-c3', '--mode=ALL'], workingDir=self.output+'/test')
+
+		# editing a module (as with --watch) replaces its cache entry rather than adding another
+		descriptor = types.SimpleNamespace(module='edited.py', testDir=self.output, classname='Edited')
+		self.loadedValues = []
+		for i in range(3):
+			self.write_text('edited.py', 'class Edited: value = %d # %s\n'%(i, 'x'*i))
+			self.loadedValues.append(TestContainer._loadTestClass(descriptor).value)
+		cache = TestContainer._TestContainer__testModuleCache
+		self.cacheEntries = [k for k in cache if os.path.basename(k) == 'edited.py' and os.path.dirname(k) == self.output]
+
+	def validate(self):
+		self.assertGrep('pysys-run.out', 'Success outcomes: 6 PASSED')
+		moduleFiles = glob.glob(self.output+'/myoutdir/*/cycle*/module.txt')
+		self.assertThat('len(moduleFiles) == 6', moduleFiles=moduleFiles)
+		moduleIds = set()
+		for f in moduleFiles:
+			with open(f) as fh: moduleIds.add(fh.read())
+		# the same module namespace is used for every mode and cycle
+		self.assertThat('len(moduleIds) == 1', moduleIds=sorted(moduleIds))
+
+		self.assertThat('loadedValues == [0, 1, 2]', loadedValues=self.loadedValues)
+		self.assertThat('len(cacheEntries) == 1', cacheEntries=self.cacheEntries)
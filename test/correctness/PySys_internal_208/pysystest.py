@@ -0,0 +1,44 @@
+__pysys_title__   = r""" Descriptors - descriptor index file avoids reparsing unchanged descriptors """
+#                        ================================================================================
+__pysys_purpose__ = r""" """
+
+__pysys_created__ = "2026-10-16"
+#__pysys_skipped_reason__   = "Skipped until Bug-1234 is fixed"
+
+import pysys
+from pysys.constants import *
+
+import os, sys, math, shutil, glob, pickle
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		self.copy(self.input, self.output+'/test')
+		self.pysys.pysys('pysys-run-initial', ['run', '-o', self.output+'/out1', '-v', 'descriptorindex=DEBUG'], workingDir=self.output+'/test')
+		self.pysys.pysys('pysys-run-unchanged', ['run', '-o', self.output+'/out2', '-v', 'descriptorindex=DEBUG'], workingDir=self.output+'/test')
+
+		# changing a dirconfig invalidates all the descriptors under it
+		self.write_text('test/A/pysysdirconfig.xml', '<?xml version="1.0" encoding="utf-8"?><pysysdirconfig><id-prefix>Changed_</id-prefix></pysysdirconfig>')
+		self.pysys.pysys('pysys-run-dirconfig-changed', ['run', '-o', self.output+'/out3', '-v', 'descriptorindex=DEBUG'], workingDir=self.output+'/test')
+		
+		self.copy('test/B/Test3/pysystest.py', 'test/B/Test3/pysystest.py', mappers=[lambda line: line.replace('Title of', 'Changed title of')])
+		self.deletedir('test/A/Test2')
+		self.pysys.pysys('pysys-print-changed', ['print'], workingDir=self.output+'/test')
+
+	def validate(self):
+		self.assertGrep('pysys-run-initial.out', 'Loaded 0 descriptors from the descriptor index and parsed 4 others')
+		self.assertGrep('pysys-run-initial.out', 'Success outcomes: 3 PASSED')
+		self.assertGrep('pysys-run-unchanged.out', 'Loaded 4 descriptors from the descriptor index and parsed 0 others')
+		self.assertGrep('pysys-run-unchanged.out', 'Writing descriptor index', contains=False)
+		self.assertGrep('pysys-run-unchanged.out', 'Success outcomes: 3 PASSED')
+		self.assertGrep('pysys-run-dirconfig-changed.out', 'Loaded 1 descriptors from the descriptor index and parsed 3 others')
+		self.assertGrep('pysys-run-dirconfig-changed.out', 'Id: *Changed_Test1')
+		
+		self.assertGrep('pysys-print-changed.out', 'Changed_Test1 *[|] *Title of Test1')
+		self.assertGrep('pysys-print-changed.out', 'Test3 *[|] *Changed title of Test3')
+		self.assertGrep('pysys-print-changed.out', 'Test2', contains=False)
+
+		# the index is pruned of tests that no longer exist, and of stale dirconfig entries
+		with open(self.output+'/test/__pysys_descriptor_index.pickle', 'rb') as f:
+			indexedFiles = sorted(os.path.relpath(path, self.output+'/test').replace(os.sep, '/') for (path, parent) in pickle.load(f)['entries'])
+		self.assertThat('indexedFiles == expected', indexedFiles=indexedFiles, expected=['A/Test1/pysystest.py', 'A/pysysdirconfig.xml', 'B/Test3/pysystest.py'])
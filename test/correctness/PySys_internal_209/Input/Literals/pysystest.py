@@ -0,0 +1,22 @@
+__pysys_title__   = r""" Title of Literals """ 
+#                        ================================================================================
+__pysys_authors__ = 'bsp' # single quotes
+__pysys_created__ = "2026-10-16"
+__pysys_groups__  = "tab\tseparated, second"
+
+__pysys_execution_order_hint__ = -1.5
+__pysys_modes__   = lambda helper: helper.createModeCombinations(
+	helper.inheritedModes, 
+# a comment in the middle
+	[{'mode':'ModeA', 'x':1}, {'mode':'ModeB', 'x':2}],
+)
+__pysys_user_data_myString__ = "123"
+__pysys_skipped_reason__ = None
+
+import pysys
+from pysys.constants import *
+
+__pysys_purpose__ = """ Purpose after the imports """
+
+class PySysTest(pysys.basetest.BaseTest):
+	pass
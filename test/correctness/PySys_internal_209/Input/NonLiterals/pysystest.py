@@ -0,0 +1,8 @@
+__pysys_title__   = "Title of " + "NonLiterals"
+__pysys_user_data__ = {'myString': str(5*5)}
+
+import pysys
+from pysys.constants import *
+
+class PySysTest(pysys.basetest.BaseTest):
+	pass
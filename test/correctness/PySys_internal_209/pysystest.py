@@ -0,0 +1,33 @@
+__pysys_title__   = r""" Descriptors - reading __pysys_XXX__ literals from pysystest.py without executing it """
+#                        ================================================================================
+__pysys_purpose__ = r""" """
+
+__pysys_created__ = "2026-10-16"
+#__pysys_skipped_reason__   = "Skipped until Bug-1234 is fixed"
+
+import pysys
+from pysys.constants import *
+from pysys.config.descriptor import DescriptorLoader
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		loader = DescriptorLoader(self.project)
+		self.literals = loader._parseTestDescriptor(self.input+'/Literals/pysystest.py')
+		self.nonLiterals = loader._parseTestDescriptor(self.input+'/NonLiterals/pysystest.py')
+
+	def validate(self):
+		d = self.literals
+		self.assertThat('title == expected', title=d.title, expected='Title of Literals')
+		self.assertThat('authors == expected', authors=d.authors, expected=['bsp'])
+		self.assertThat('groups == expected', groups=d.groups, expected=['tab\tseparated', 'second'])
+		self.assertThat('executionOrderHint == -1.5', executionOrderHint=d.executionOrderHint)
+		self.assertThat('modes == expected', modes=[(m, m.params) for m in d.modes], expected=[('ModeA', {'x':1}), ('ModeB', {'x':2})])
+		self.assertThat('userData == expected', userData=d.userData, expected={'myString':'123'})
+		self.assertThat('skippedReason is None', skippedReason=d.skippedReason)
+		self.assertThat('purpose == expected', purpose=d.purpose, expected='Purpose after the imports')
+
+		# values that are not literals still work, by executing the Python
+		d = self.nonLiterals
+		self.assertThat('title == expected', title=d.title, expected='Title of NonLiterals')
+		self.assertThat('userData == expected', userData=d.userData, expected={'myString':'25'})
@@ -0,0 +1,41 @@
+__pysys_title__   = r""" pysys run --watch re-runs tests affected by changes to their files """
+#                        ================================================================================
+__pysys_purpose__ = r""" """
+
+__pysys_created__ = "2026-10-16"
+
+import pysys
+from pysys.constants import *
+
+import os, sys, signal
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		if IS_WINDOWS: self.skipTest('This test uses SIGINT to stop watching, which is not available on Windows')
+		self.copy(self.input, self.output+'/test')
+		watcher = self.pysys.pysys('pysys-run-watch', ['run', '--watch', 'Test1~ModeA', 'Test2', '-o', self.output+'/out'], 
+			workingDir=self.output+'/test', background=True)
+		self.waitForGrep('pysys-run-watch.out', 'Watching 2 test directories for changes', process=watcher)
+
+		# a changed test is re-run in the same modes as before
+		self.copy('test/Test1/pysystest.py', 'test/Test1/pysystest.py', mappers=[lambda line: line.replace('addOutcome(PASSED)', 'addOutcome(FAILED, "Simulated failure")')])
+		self.waitForGrep('pysys-run-watch.out', 'Watching 2 test directories for changes', condition='>=2', process=watcher)
+
+		# new files in the test dir (e.g. under Input/) also count as changes
+		self.mkdir('test/Test2/Input')
+		self.write_text('test/Test2/Input/newfile.txt', 'Hello')
+		self.waitForGrep('pysys-run-watch.out', 'Watching 2 test directories for changes', condition='>=3', process=watcher)
+
+		watcher.signal(signal.SIGINT)
+		self.waitProcess(watcher, timeout=TIMEOUTS['WaitForProcessStop'])
+		self.assertThat('watcherExitStatus == 0', watcherExitStatus=watcher.exitStatus) # since the last run passed
+
+	def validate(self):
+		self.assertGrep('pysys-run-watch.out', 'Success outcomes: 2 PASSED')
+		self.assertGrep('pysys-run-watch.out', 'Re-running 1 tests after changes to: .*Test1.pysystest.py')
+		self.assertGrep('pysys-run-watch.out', 'Test outcome reason: Simulated failure')
+		self.assertGrep('pysys-run-watch.out', 'Re-running 1 tests after changes to: .*Test2.Input.newfile.txt')
+		self.assertGrep('pysys-run-watch.out', 'Id: *Test1~ModeB', contains=False)
+		self.assertGrep('pysys-run-watch.out', 'Stopped watching for changes')
+		self.assertGrep('pysys-run-watch.out', 'Traceback', contains=False)
@@ -0,0 +1,17 @@
+__pysys_title__   = r""" Title of Test1 """ 
+#                        ================================================================================
+__pysys_purpose__ = r""" """ 
+	
+__pysys_created__ = "2026-10-16"
+
+import pysys
+from pysys.constants import *
+import myhelpers
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		self.write_text('value.txt', myhelpers.getExpectedValue())
+		
+	def validate(self):
+		self.addOutcome(PASSED)
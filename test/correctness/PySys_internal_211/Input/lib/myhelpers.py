@@ -0,0 +1,2 @@
+def getExpectedValue():
+	return 'Hello'
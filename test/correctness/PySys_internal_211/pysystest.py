@@ -0,0 +1,67 @@
+__pysys_title__   = r""" pysys run --changed-since and --changed-files select only the tests affected by the changes """
+#                        ================================================================================
+__pysys_purpose__ = r""" """
+
+__pysys_created__ = "2026-10-16"
+
+import pysys
+from pysys.constants import *
+
+import os, sys, json, shutil
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		git = shutil.which('git')
+		if not git: self.skipTest('git is not available')
+
+		self.copy(self.input, self.output+'/test')
+		self.pysys.pysys('pysys-run-all', ['run', '-o', self.output+'/out-all'], workingDir=self.output+'/test')
+
+		def runChanged(name, changedFiles):
+			self.write_text(name+'.txt', '\n'.join(changedFiles))
+			self.pysys.pysys(name, ['run', '-o', self.output+'/out-'+name, '--changed-files', self.output+'/'+name+'.txt'], 
+				workingDir=self.output+'/test')
+
+		runChanged('changed-module', ['lib/myhelpers.py'])
+		runChanged('changed-copied-file', ['shared/data.txt'])
+		runChanged('changed-dirconfig', ['Group/pysysdirconfig.xml'])
+		runChanged('changed-test-input', ['Test4/Input/newfile.txt', 'Test4/Output/linux/ignored.txt'])
+		runChanged('changed-output-only', ['Test4/Output/linux/ignored.txt', '../outside-project.txt'])
+		runChanged('changed-project', ['pysysproject.xml'])
+
+		def gitCommand(name, args):
+			self.startProcess(git, ['-c', 'user.name=pysys', '-c', 'user.email=pysys@example.com']+args, 
+				workingDir=self.output+'/test', stdouterr=name, environs=self.createEnvirons(addToExePath=os.path.dirname(git)))
+		gitCommand('git-init', ['init', '-q'])
+		gitCommand('git-add', ['add', '.'])
+		gitCommand('git-commit', ['commit', '-q', '-m', 'Initial'])
+		self.write_text('test/lib/myhelpers.py', "def getExpectedValue():\n\treturn 'Goodbye'\n")
+		self.write_text('test/Group/Test3/untracked.txt', "Hello")
+		self.pysys.pysys('changed-since-git', ['run', '-o', self.output+'/out-changed-since-git', '--changed-since', 'HEAD'], 
+			workingDir=self.output+'/test')
+
+		self.pysys.pysys('changed-since-bad-ref', ['run', '--changed-since', 'no-such-ref'], workingDir=self.output+'/test', expectedExitStatus='==10')
+
+	def validate(self):
+		with open(self.output+'/test/__pysys_cache/testDependencies.json', encoding='utf-8') as f:
+			dependencies = json.load(f)['tests']
+		self.assertThat('dependencies == expected', dependencies=dependencies, expected={
+			'Test1': ['../lib/myhelpers.py'],
+			'Test2': ['../shared/data.txt'],
+			'Test3': [],
+			'Test4': [],
+		})
+
+		def assertSelected(name, expectedIds):
+			self.assertThat('selectedIds == expected', selectedIds=self.getExprFromFile(name+'.out', 'Id: *([^ \n]+)', returnAll=True), 
+				expected=expectedIds, name=name)
+		assertSelected('changed-module', ['Test1'])
+		assertSelected('changed-copied-file', ['Test2'])
+		assertSelected('changed-dirconfig', ['Test3'])
+		assertSelected('changed-test-input', ['Test4'])
+		assertSelected('changed-output-only', [])
+		assertSelected('changed-project', ['Test3', 'Test1', 'Test2', 'Test4'])
+		assertSelected('changed-since-git', ['Test3', 'Test1'])
+		self.assertGrep('changed-module.out', 'Selected 1 of 4 tests affected by 1 changed files')
+		self.assertGrep('changed-since-bad-ref.err', 'Cannot find files changed since "no-such-ref" as "git merge-base no-such-ref HEAD" failed: .+')
@@ -0,0 +1,16 @@
+__pysys_title__   = r""" Title of Test1 """ 
+#                        ================================================================================
+__pysys_purpose__ = r""" """ 
+	
+__pysys_created__ = "2026-10-16"
+
+import pysys
+from pysys.constants import *
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		self.log.info('Executing in process %d with PYSYS_SERVER_TEST_VAR=%s', os.getpid(), os.getenv('PYSYS_SERVER_TEST_VAR'))
+		
+	def validate(self):
+		self.addOutcome(PASSED)
@@ -0,0 +1,16 @@
+__pysys_title__   = r""" Title of Test2 """ 
+#                        ================================================================================
+__pysys_purpose__ = r""" """ 
+	
+__pysys_created__ = "2026-10-16"
+
+import pysys
+from pysys.constants import *
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		pass
+		
+	def validate(self):
+		self.addOutcome(FAILED, 'Simulated failure')
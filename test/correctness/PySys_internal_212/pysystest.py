@@ -0,0 +1,52 @@
+__pysys_title__   = r""" pysys server executes pysys run commands when PYSYS_SERVER is set """
+#                        ================================================================================
+__pysys_purpose__ = r""" """
+
+__pysys_created__ = "2026-10-16"
+
+import pysys
+from pysys.constants import *
+
+import os, signal, tempfile
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		if IS_WINDOWS: self.skipTest('The PySys server is not supported on Windows')
+		self.copy(self.input, self.output+'/test')
+
+		# Unix domain socket paths have a short maximum length, so don't put it in the (possibly long) output dir
+		socketPath = os.path.join(tempfile.gettempdir(), 'pysys-test-%d.sock'%os.getpid())
+		server = self.pysys.pysys('pysys-server', ['server', '--socket', socketPath], workingDir=self.output+'/test', background=True)
+		self.waitForGrep('pysys-server.out', 'PySys server is listening on', process=server)
+		self.serverPid = server.pid
+
+		environs = {'PYSYS_SERVER': socketPath, 'PYSYS_SERVER_TEST_VAR': 'hello'}
+		self.clientPid = self.pysys.pysys('pysys-run-passed', ['run', '-o', self.output+'/out-passed', 'Test1'], 
+			workingDir=self.output+'/test', environs=environs).pid
+		self.pysys.pysys('pysys-run-failed', ['run', '-o', self.output+'/out-failed', 'Test2'], 
+			workingDir=self.output+'/test', environs=environs, expectedExitStatus='==2')
+		self.pysys.pysys('pysys-run-bad-args', ['run', '--not-an-option'], 
+			workingDir=self.output+'/test', environs=environs, expectedExitStatus='==1')
+
+		server.signal(signal.SIGTERM)
+		self.waitProcess(server, timeout=TIMEOUTS['WaitForProcessStop'])
+		self.assertPathExists(socketPath, exists=False)
+
+		# when the server isn't running, pysys run works as usual
+		self.pysys.pysys('pysys-run-no-server', ['run', '-o', self.output+'/out-no-server', 'Test1'], 
+			workingDir=self.output+'/test', environs=environs)
+
+	def validate(self):
+		self.assertGrep('pysys-run-passed.out', 'Executing in process ([0-9]+) with PYSYS_SERVER_TEST_VAR=hello')
+		self.assertGrep('pysys-run-passed.out', 'THERE WERE NO FAILURES')
+		self.assertGrep('pysys-run-failed.out', 'Test outcome reason: Simulated failure')
+		self.assertGrep('pysys-run-bad-args.out', 'Error parsing command line arguments')
+		self.assertGrep('pysys-run-no-server.out', 'THERE WERE NO FAILURES')
+
+		# the tests were executed by (a child of) the server, writing directly to the client's output
+		testPid = int(self.getExprFromFile('pysys-run-passed.out', 'Executing in process ([0-9]+)'))
+		self.assertThat('testPid not in {clientPid, serverPid}', testPid=testPid, clientPid=self.clientPid, serverPid=self.serverPid)
+		self.assertGrep('pysys-server.out', 'Test outcome', contains=False)
+		for f in ['pysys-server.err', 'pysys-run-passed.err', 'pysys-run-failed.err']:
+			self.assertGrep(f, 'Traceback', contains=False)
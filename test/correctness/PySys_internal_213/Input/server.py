@@ -0,0 +1,17 @@
+import sys, time, socket
+
+behaviour, delay = sys.argv[1], float(sys.argv[2])
+time.sleep(delay)
+if behaviour == 'exit':
+	print('Failed to start', flush=True)
+	sys.exit(3)
+if behaviour == 'hang':
+	time.sleep(10*60)
+if behaviour == 'socket':
+	server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+	server.bind(('localhost', int(sys.argv[3])))
+	server.listen(5)
+if behaviour == 'file':
+	with open(sys.argv[3], 'w') as f: f.write('started')
+print('Server is ready', flush=True)
+time.sleep(10*60)
@@ -0,0 +1,60 @@
+__pysys_title__   = r""" startProcesses - concurrent startup with readiness checks """
+#                        ================================================================================
+__pysys_purpose__ = r""" """
+
+__pysys_created__ = "2026-10-16"
+
+import pysys
+from pysys.constants import *
+
+import os, time
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def server(self, name, behaviour, delay, *args, **kwargs):
+		return dict(command=sys.executable, arguments=[self.input+'/server.py', behaviour, delay]+list(args), 
+			environs=self.createEnvirons(command=sys.executable), stdouterr=name, **kwargs)
+
+	def execute(self):
+		# all become ready after the same delay, so should take about as long as one of them
+		start = time.monotonic()
+		port = self.getNextAvailableTCPPort()
+		processes = self.startProcesses([
+				self.server('grep1', 'grep', 1.5),
+				self.server('grep2', 'grep', 1.5),
+				self.server('socket', 'socket', 1.5, port, readiness=port),
+				self.server('file', 'file', 1.5, self.output+'/started.txt', readiness=lambda process: os.path.exists(self.output+'/started.txt')),
+			], readiness='Server is ready')
+		self.successDuration = time.monotonic()-start
+		self.processNames = [os.path.basename(p.stdout) for p in processes]
+		self.assertThat('all(process.running() for process in processes)', processes=processes)
+
+		# fail fast as soon as one process terminates
+		start = time.monotonic()
+		self.startProcesses([
+				self.server('exit', 'exit', 0.5),
+				self.server('hang', 'hang', 0),
+				self.server('ready', 'grep', 0),
+			], readiness=['Server is ready'], timeout=60, abortOnError=False)
+		self.failFastDuration = time.monotonic()-start
+		self.failFastOutcome = (self.getOutcome(), self.getOutcomeReason())
+		del self.outcome[:]
+
+		self.startProcesses([self.server('hang2', 'hang', 0), self.server('ready2', 'grep', 0)], readiness='Server is ready', timeout=1, abortOnError=False)
+		self.timeoutOutcome = (self.getOutcome(), self.getOutcomeReason())
+		del self.outcome[:]
+
+	def validate(self):
+		self.assertThat('successDuration < 4.5', successDuration=self.successDuration) # would be 6 if done serially
+		self.assertThat('processNames == expected', processNames=self.processNames, 
+			expected=['grep1.out', 'grep2.out', 'socket.out', 'file.out'])
+
+		self.assertThat('failFastDuration < 30', failFastDuration=self.failFastDuration)
+		self.assertThat('failFastOutcome == expected', failFastOutcome=self.failFastOutcome[0], expected=BLOCKED)
+		self.assertThat('re.match(expected, failFastOutcomeReason)', failFastOutcomeReason=self.failFastOutcome[1], 
+			expected=r'Process failed to start after [0-9]+ secs: \S+<exit> terminated with exit status 3 while waiting for "Server is ready" in exit.out$')
+		self.assertGrep('run.log', 'Failed to start') # logs the output of the failed process
+
+		self.assertThat('timeoutOutcome == expected', timeoutOutcome=self.timeoutOutcome[0], expected=TIMEDOUT)
+		self.assertThat('re.match(expected, timeoutOutcomeReason)', timeoutOutcomeReason=self.timeoutOutcome[1], 
+			expected=r'Timed out waiting for 1 of 2 processes to become ready after [0-9]+ secs: \S+<hang2> was not ready \(waiting for "Server is ready" in hang2.out\)$')
@@ -0,0 +1,14 @@
+__pysys_title__   = r""" FailingTest """
+#                        ================================================================================
+
+import pysys
+from pysys.constants import *
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		self.startPython([self.project.testRootDir+'/chatty.py', '3'], stdouterr='chatty', inMemoryOutput=True)
+		
+	def validate(self):
+		self.assertGrep('chatty.out', 'Line 2 of output', contains=False)
+		self.assertThat('not os.path.exists(path)', path=self.output+'/chatty.out') # not on disk yet
@@ -0,0 +1,12 @@
+import sys, time
+count = int(sys.argv[1])
+for i in range(count):
+	print('Line %d of output'%i)
+sys.stderr.write('Some error output\n')
+if len(sys.argv) > 2: 
+	sys.stdout.flush()
+	time.sleep(float(sys.argv[2]))
+	print('Finished after sleeping')
+if len(sys.argv) > 3: # keep running after the last line is written
+	sys.stdout.flush()
+	time.sleep(float(sys.argv[3]))
@@ -0,0 +1,75 @@
+__pysys_title__   = r""" startProcess inMemoryOutput=True captures output in memory, spilling to disk on overflow or failure """
+#                        ================================================================================
+__pysys_purpose__ = r""" """
+
+__pysys_created__ = "2026-10-16"
+
+import pysys
+from pysys.constants import *
+from pysys.utils.filegrep import FileTailer
+from pysys.internal.outputcapture import CapturedOutput
+
+import os
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		if IS_WINDOWS: self.skipTest('inMemoryOutput is not supported on Windows')
+		chatty = self.input+'/nested/chatty.py'
+		for i in range(10):
+			process = self.startPython([chatty, '100'], stdouterr='loop', inMemoryOutput=True)
+			self.assertGrep(process.stdout, 'Line 99 of output')
+		self.assertThat('lineNumber == "42"', lineNumber=self.getExprFromFile('loop.out', 'Line ([0-9]+) of output', returnAll=True)[42])
+		self.assertLineCount('loop.out', 'Line', condition='==100')
+		self.assertGrep('loop.err', 'Some error output')
+		self.assertPathExists('loop.out')
+		self.assertThat('not os.path.exists(path)', path=self.output+'/loop.out')
+		self.assertThat('not os.path.exists(path)', path=self.output+'/loop.err')
+		self.logFileContents('loop.err')
+
+		background = self.startPython([chatty, '3', '0.5'], stdouterr='background', background=True, inMemoryOutput=True)
+		self.waitForGrep('background.out', 'Line 2 of output', process=background)
+		self.waitForGrep('background.out', 'Finished after sleeping', process=background)
+		self.waitProcess(background, timeout=TIMEOUTS['WaitForProcess'])
+		self.assertThat('not os.path.exists(path)', path=self.output+'/background.out')
+
+		# the tailer used by waitForGrep reads only the new output each time
+		captured = CapturedOutput(self.output+'/tailed.out', maxBytes=1000)
+		captured.register()
+		tailer = FileTailer(captured.path, encoding='utf-8')
+		follower = tailer.follow('Line')
+		for i in range(5):
+			captured._append(('Line %d\n'%i).encode('utf-8'))
+			tailer.poll()
+		self.assertThat('readFrom == expected', readFrom=captured.readFrom(tailer.offset-7), expected=(b'Line 4\n', 35))
+		lateFollower = tailer.follow('Line [34]')
+		captured._append(b'Line 5\n')
+		tailer.poll()
+		self.assertThat('matches == expected', matches=[m.group(0) for m in follower.getMatches()], expected=['Line']*6)
+		self.assertThat('lateMatches == expected', lateMatches=len(lateFollower.getMatches()), expected=2)
+		captured.unregister()
+
+		# output larger than the limit is written to disk
+		self.inMemoryOutputMaxBytes = 1000
+		self.startPython([chatty, '1000'], stdouterr='overflow', inMemoryOutput=True)
+		self.assertThat('os.path.exists(path)', path=self.output+'/overflow.out')
+		self.assertLineCount('overflow.out', 'Line', condition='==1000')
+		self.assertThat('not os.path.exists(path)', path=self.output+'/overflow.err') # small enough to stay in memory
+
+		# output written after spilling is visible while the process is still running
+		spilled = self.startPython([chatty, '1000', '0.5', '60'], stdouterr='spilled', background=True, inMemoryOutput=True)
+		self.waitForGrep('spilled.out', 'Finished after sleeping', process=spilled)
+		self.assertThat('spilledStillRunning', spilledStillRunning=spilled.running())
+		self.stopProcess(spilled)
+
+		self.copy(self.input+'/nested', 'nested')
+		self.pysys.pysys('pysys-run', ['run', '-o', self.output+'/nested-output', '--record'], workingDir='nested', expectedExitStatus='==2')
+
+	def validate(self):
+		self.assertGrep('run.log', 'Some error output') # logFileContents
+		# the output of a failed test is written to disk, but not a passed test's
+		self.assertPathExists('nested-output/FailingTest/chatty.out')
+		self.assertPathExists('nested-output/FailingTest/chatty.err')
+		self.assertGrep('nested-output/FailingTest/chatty.out', 'Line 2 of output')
+		self.assertPathExists('nested-output/PassingTest/chatty.out', exists=False)
+		self.assertGrep('pysys-run.out', 'Traceback', contains=False)
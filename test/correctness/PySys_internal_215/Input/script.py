@@ -0,0 +1,21 @@
+import os, sys
+print('argv=%s'%sys.argv[1:])
+print('cwd=%s'%os.getcwd())
+print('MY_VAR=%s'%os.getenv('MY_VAR'))
+print('pid=%d'%os.getpid())
+print('ppid=%d'%os.getppid())
+print('path0=%s'%sys.path[0])
+print('__name__=%s'%__name__)
+sys.stderr.write('Some stderr output\n')
+if len(sys.argv) > 1 and sys.argv[1] == 'stdin':
+	print('stdin=%s'%sys.stdin.readline().strip())
+if len(sys.argv) > 1 and sys.argv[1] == 'sleep':
+	import time
+	sys.stdout.flush()
+	time.sleep(60)
+if len(sys.argv) > 1 and sys.argv[1] == 'error':
+	raise Exception('Simulated error')
+if len(sys.argv) > 1 and sys.argv[1] == 'mypackage':
+	import mypackage
+	print('mypackage=%s'%mypackage.VALUE)
+sys.exit(int(os.getenv('MY_EXIT_STATUS', '0')))
@@ -0,0 +1,72 @@
+__pysys_title__   = r""" startPython reuseInterpreter=True executes scripts in a forked Python worker server """
+#                        ================================================================================
+__pysys_purpose__ = r""" """
+
+__pysys_created__ = "2026-10-16"
+
+import pysys
+from pysys.constants import *
+
+import os, signal
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		if IS_WINDOWS: self.skipTest('reuseInterpreter is not supported on Windows')
+		script = self.input+'/script.py'
+
+		self.startPython([script, 'a', 'b c'], stdouterr='new', environs=self.createEnvirons({'MY_VAR':'x'}))
+		for i in range(3):
+			self.startPython([script, 'a', 'b c'], stdouterr='reused%d'%i, environs=self.createEnvirons({'MY_VAR':'x'}), reuseInterpreter=True)
+		self.startPython([script, 'a'], stdouterr='exitstatus', environs=self.createEnvirons({'MY_EXIT_STATUS':'3'}), 
+			expectedExitStatus='==3', reuseInterpreter=True)
+		self.startPython([script, 'error'], stdouterr='error', expectedExitStatus='==1', reuseInterpreter=True)
+		self.startPython(['-m', 'mypackage'], stdouterr='module', expectedExitStatus='!=0', workingDir=self.input, reuseInterpreter=True)
+		self.startPython(['-c', 'import sys; print("argv=%s"%sys.argv)', 'x'], stdouterr='command', reuseInterpreter=True)
+		# PYTHONPATH can only be set when the interpreter starts, so needs a different server
+		self.startPython([script, 'mypackage'], stdouterr='pythonpath', environs=self.createEnvirons({'PYTHONPATH':self.input}), reuseInterpreter=True)
+
+		stdin = self.startPython([script, 'stdin'], stdouterr='stdin', background=True, reuseInterpreter=True)
+		stdin.write('hello', closeStdinAfterWrite=True)
+		self.waitProcess(stdin, timeout=TIMEOUTS['WaitForProcess'])
+
+		self.startPython([script, 'a'], stdouterr='inmemory', inMemoryOutput=True, reuseInterpreter=True)
+		self.assertGrep('inmemory.out', 'argv=')
+
+		sleepers = [self.startPython([script, 'sleep'], stdouterr='sleep%d'%i, background=True, reuseInterpreter=True) for i in range(3)]
+		for p in sleepers: self.waitForGrep(p.stdout, 'ppid=', process=p)
+		self.sleepersRunning = [p.running() for p in sleepers]
+		sleepers[0].stop()
+		self.sleeperExitStatus = sleepers[0].exitStatus
+		for p in sleepers[1:]: p.signal(signal.SIGTERM)
+		self.waitForBackgroundProcesses(includes=sleepers[1:], checkExitStatus=False)
+		self.backgroundExitStatuses = [p.exitStatus for p in sleepers[1:]]
+
+		self.startPython([script, 'sleep'], stdouterr='timeout', timeout=1, abortOnError=False, reuseInterpreter=True)
+		self.timeoutOutcome = self.getOutcome()
+		del self.outcome[:]
+
+	def validate(self):
+		for i in range(3):
+			self.assertDiff('reused%d.out'%i, self.output+'/new.out', includes=['argv=', 'cwd=', 'MY_VAR=', 'path0=', '__name__='])
+			self.assertDiff('reused%d.err'%i, self.output+'/new.err')
+
+		# the reused processes are children of the same worker server, not of this process
+		ppids = {self.getExprFromFile('reused%d.out'%i, 'ppid=(.*)') for i in range(3)}
+		self.assertThat('len(ppids) == 1', ppids=ppids)
+		self.assertThat('ppid != str(os.getpid())', ppid=ppids.pop(), os=os)
+		self.assertThat('newPid != reusedPid', newPid=self.getExprFromFile('reused0.out', 'pid=(.*)'), reusedPid=self.getExprFromFile('reused1.out', 'pid=(.*)'))
+
+		self.assertGrep('error.err', 'Exception: Simulated error')
+		self.assertGrep('error.err', 'Traceback')
+		self.assertGrep('module.err', 'is a package and cannot be directly executed')
+		self.assertGrep('command.out', r"argv=\['-c', 'x'\]")
+		self.assertGrep('pythonpath.out', 'mypackage=imported')
+		self.assertThat('pythonPathPpid != reusedPpid', pythonPathPpid=self.getExprFromFile('pythonpath.out', 'ppid=(.*)'), 
+			reusedPpid=self.getExprFromFile('reused0.out', 'ppid=(.*)'))
+		self.assertGrep('stdin.out', 'stdin=hello')
+
+		self.assertThat('sleepersRunning == [True, True, True]', sleepersRunning=self.sleepersRunning)
+		self.assertThat('sleeperExitStatus == signal.SIGTERM', sleeperExitStatus=self.sleeperExitStatus, signal=signal)
+		self.assertThat('backgroundExitStatuses == [signal.SIGTERM, signal.SIGTERM]', backgroundExitStatuses=self.backgroundExitStatuses, signal=signal)
+		self.assertThat('timeoutOutcome == expected', timeoutOutcome=self.timeoutOutcome, expected=TIMEDOUT)
@@ -0,0 +1,30 @@
+__pysys_title__   = r""" Process - exitTime is recorded as soon as each background process exits """
+#                        ================================================================================
+__pysys_purpose__ = r""" """
+
+__pysys_created__ = "2026-10-17"
+
+import pysys
+from pysys.constants import *
+
+import sys, time
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	def execute(self):
+		self.startTime = time.time()
+		self.sleepers = [self.startProcess(sys.executable, ['-c', 'import time; time.sleep(%s)'%secs], 
+			stdouterr='sleep%s'%secs, background=True) for secs in [2.0, 0.2]]
+		self.runningExitTimes = [p.exitTime for p in self.sleepers]
+		self.waitForBackgroundProcesses()
+		self.endTime = time.time()
+
+		self.foreground = self.startProcess(sys.executable, ['-c', 'pass'], stdouterr='foreground')
+
+	def validate(self):
+		self.assertThat('runningExitTimes == [None, None]', runningExitTimes=self.runningExitTimes)
+		longExitTime, shortExitTime = [p.exitTime for p in self.sleepers]
+		self.assertThat('startTime < shortExitTime < longExitTime <= endTime', startTime=self.startTime, shortExitTime=shortExitTime, longExitTime=longExitTime, endTime=self.endTime)
+		# the short process must have been reaped when it exited, not when we finished waiting for the long one
+		self.assertThat('longExitTime - shortExitTime > 1.0', longExitTime=longExitTime, shortExitTime=shortExitTime)
+		self.assertThat('foregroundExitTime >= endTime', foregroundExitTime=self.foreground.exitTime, endTime=self.endTime)
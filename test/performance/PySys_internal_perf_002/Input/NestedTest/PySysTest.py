@@ -4,10 +4,14 @@ from pysys.constants import *
 from pysys.basetest import BaseTest
 from pysys.exceptions import *
 from pysys.config.descriptor import DescriptorLoader, TestDescriptor
-import io, time
+from pysys.config.project import Project
+import io, os, time
 
 class PySysTest(BaseTest):
 	def execute(self):
+		if self.descriptorFile.startswith('Directory'):
+			return self.loadDirectory()
+
 		loader = DescriptorLoader(project=self.project)
 				
 		if self.descriptorFile != 'CreateEmptyDescriptor':
@@ -39,5 +43,26 @@ class PySysTest(BaseTest):
 
 		self.log.info('%s descriptor load rate is: %f /sec', self.descriptorFile, (iterations)/(time.time()-starttime))
 
+	def loadDirectory(self, testCount=6000):
+		with io.open(self.descriptor.testDir+'/../PythonLarge.py', 'rb') as inputfile:
+			fileContents = inputfile.read()
+		for i in range(testCount):
+			testDir = self.mkdir(self.output+'/tests/Test%05d'%i)
+			with io.open(testDir+'/pysystest.py', 'wb') as f:
+				f.write(fileContents.replace(b'@TEST_ID@', b'Test%05d'%i))
+		self.write_text('tests/pysysproject.xml', '<pysysproject><property name="pysysDescriptorLoaderProcessThreshold" value="%d"/></pysysproject>'%(
+			1 if self.descriptorFile == 'DirectoryProcessPool' else 0))
+		loader = DescriptorLoader(project=Project(self.output+'/tests', 'pysysproject.xml', outdir=self.output+'/tests-output'))
+
+		starttime = time.time()
+		endtime  = starttime+float(self.testDurationSecs)
+		iterations = 0
+		while iterations == 0 or time.time()<endtime:
+			iterations += 1
+			descriptors = loader.loadDescriptors(self.output+'/tests')
+			assert len(descriptors) == testCount, len(descriptors)
+
+		self.log.info('%s descriptor load rate is: %f /sec', self.descriptorFile, (iterations*testCount)/(time.time()-starttime))
+
 	def validate(self):
 		self.addOutcome(INSPECT, 'See performance results')
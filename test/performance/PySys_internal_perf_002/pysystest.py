@@ -18,6 +18,9 @@ __pysys_modes__            = """
 				'PythonSmall', 
 				'XmlLarge', 
 				'XmlSmall', 
+				# loading a whole directory of PythonLarge tests, with and without a pool of parsing processes
+				'DirectorySingleProcess', 
+				'DirectoryProcessPool', 
 				# 'CreateEmptyDescriptor',
 			]],
 			)
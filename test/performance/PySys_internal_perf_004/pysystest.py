@@ -0,0 +1,62 @@
+__pysys_title__   = r""" Test Loading - memory used by the descriptors of tests with many modes """
+#                        ================================================================================
+__pysys_purpose__ = r"""
+Measures the memory held by the loaded descriptors of a directory of tests that each define the same modes using 
+createModeCombinations, and by the descriptors created for every mode of those tests (as for ``pysys run --mode ALL``). 
+""" 
+	
+__pysys_created__ = "2026-10-16"
+__pysys_groups__           = "testLoading, performance, disableCoverage; inherit=true"
+
+import gc, io, tracemalloc
+
+import pysys
+from pysys.constants import *
+from pysys.basetest import BaseTest
+from pysys.config.descriptor import DescriptorLoader
+from pysys.config.project import Project
+from pysys.perf.api import PerformanceUnit
+
+class PySysTest(BaseTest):
+
+	testCount = '200'
+
+	def execute(self):
+		self.testCount = int(self.testCount)
+		for i in range(self.testCount):
+			self.mkdir(f'tests/Test{i:05d}')
+			self.write_text(f'tests/Test{i:05d}/pysystest.py', '\n'.join([
+				f'__pysys_title__ = "Test {i}"',
+				'__pysys_groups__ = "performance, memory"',
+				'__pysys_modes__ = lambda helper: helper.createModeCombinations(',
+				"	helper.makeAllPrimary({'Compressed%d'%n: {'compressionLevel': n, 'args': ['--compress', str(n)]} for n in range(8)}),",
+				"	[{'mode':'Server%d'%n, 'serverPort': 8000+n} for n in range(8)],",
+				'	)',
+				'',
+			]))
+		self.write_text('tests/pysysproject.xml', '<pysysproject/>')
+		loader = DescriptorLoader(project=Project(self.output+'/tests', 'pysysproject.xml', outdir=self.output+'/tests-output'))
+
+		gc.collect()
+		tracemalloc.start()
+		try:
+			descriptors = loader.loadDescriptors(self.output+'/tests')
+			gc.collect()
+			self.testDescriptorBytes = tracemalloc.get_traced_memory()[0]
+
+			modeDescriptors = [d._createDescriptorForMode(m) for d in descriptors for m in d.modes]
+			gc.collect()
+			self.modeDescriptorBytes = tracemalloc.get_traced_memory()[0]-self.testDescriptorBytes
+		finally:
+			tracemalloc.stop()
+		self.modeCount = len(modeDescriptors)
+		self.log.info('Loaded %d tests with %d modes', len(descriptors), self.modeCount)
+
+	def validate(self):
+		self.assertThat('modeCount == expected', modeCount=self.modeCount, expected=self.testCount*8*8)
+
+		resultDetails = {'PythonVersion':'%s.%s'%sys.version_info[0:2], 'PySysVersion':pysys.__version__, 'TestCount':self.testCount}
+		self.reportPerformanceResult(self.testDescriptorBytes/self.testCount, 
+			'DescriptorLoader memory per test with 64 modes', unit=PerformanceUnit('bytes', biggerIsBetter=False), resultDetails=resultDetails)
+		self.reportPerformanceResult(self.modeDescriptorBytes/self.modeCount, 
+			'DescriptorLoader memory per mode descriptor', unit=PerformanceUnit('bytes', biggerIsBetter=False), resultDetails=resultDetails)
@@ -0,0 +1,47 @@
+__pysys_title__   = r""" Process Module - waiting for many short-lived background processes """
+#                        ================================================================================
+__pysys_purpose__ = r"""
+Measures the rate at which a test can start many short-lived background processes and wait for them all to complete 
+using waitForBackgroundProcesses, and how soon after a process terminates a waitProcess call returns. 
+""" 
+	
+__pysys_created__ = "2026-10-16"
+__pysys_groups__           = "process, performance, disableCoverage; inherit=true"
+
+import pysys
+from pysys.constants import *
+from pysys.perf.api import PerformanceUnit
+
+import time, shutil
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	backgroundProcessCount = '200'
+
+	def execute(self):
+		if IS_WINDOWS: self.skipTest('This test uses Unix commands')
+		self.backgroundProcessCount = int(self.backgroundProcessCount)
+		true, sleep = shutil.which('true'), shutil.which('sleep')
+
+		start = time.monotonic()
+		for i in range(self.backgroundProcessCount):
+			self.startProcess(true, [], stdouterr='true-%d'%i, background=True, quiet=True)
+		self.waitForBackgroundProcesses()
+		self.processesPerSec = self.backgroundProcessCount/(time.monotonic()-start)
+
+		latencies = []
+		for i in range(10):
+			process = self.startProcess(sleep, ['0.2'], stdouterr='sleep-%d'%i, background=True, quiet=True)
+			start = time.monotonic()
+			self.waitProcess(process, timeout=TIMEOUTS['WaitForProcess'])
+			latencies.append(time.monotonic()-start-0.2)
+		self.waitLatency = sorted(latencies)[len(latencies)//2]
+
+	def validate(self):
+		self.assertThat('len(processList) == expected', processList=self.processList, expected=self.backgroundProcessCount+10)
+
+		resultDetails = {'PythonVersion':'%s.%s'%sys.version_info[0:2], 'PySysVersion':pysys.__version__, 'ProcessCount':self.backgroundProcessCount}
+		self.reportPerformanceResult(self.processesPerSec, 
+			'Rate of starting and waiting for short-lived background processes', '/s', resultDetails=resultDetails)
+		self.reportPerformanceResult(self.waitLatency*1000.0, 
+			'Median latency of waitProcess after a process terminates', unit=PerformanceUnit('ms', biggerIsBetter=False), resultDetails=resultDetails)
@@ -0,0 +1,45 @@
+__pysys_title__   = r""" Process Module - Python overhead of preparing to start a process """
+#                        ================================================================================
+__pysys_purpose__ = r"""
+Measures the cost of the work done in Python for each startProcess/startPython call before the process is actually 
+started - creating the default environment and constructing the process object - which matters for tests that 
+start many short-lived processes. 
+""" 
+	
+__pysys_created__ = "2026-10-16"
+__pysys_groups__           = "process, performance, disableCoverage; inherit=true"
+
+import pysys
+from pysys.constants import *
+from pysys.perf.api import PerformanceUnit
+
+import time
+import pysys.process.helper
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	iterations = '20000'
+
+	def execute(self):
+		self.iterations = int(self.iterations)
+
+		start = time.monotonic()
+		for i in range(self.iterations):
+			environs = self.createEnvirons(overrides={'MY_VAR':str(i)}, command=sys.executable)
+		self.createEnvironsTime = (time.monotonic()-start)/self.iterations
+		self.assertThat('environs["MY_VAR"] == expected', environs=environs, expected=str(self.iterations-1))
+
+		start = time.monotonic()
+		for i in range(self.iterations):
+			process = pysys.process.helper.ProcessImpl(command=sys.executable, arguments=['-c', 'pass'], 
+				environs=self.getDefaultEnvirons(command=sys.executable), workingDir=self.output, state=FOREGROUND, timeout=60, 
+				stdout=self.output+'/python.out', stderr=self.output+'/python.err', displayName='python', expectedExitStatus='==0', 
+				info={}, owner=self)
+		self.processConstructionTime = (time.monotonic()-start)/self.iterations
+
+	def validate(self):
+		resultDetails = {'PythonVersion':'%s.%s'%sys.version_info[0:2], 'PySysVersion':pysys.__version__}
+		self.reportPerformanceResult(self.createEnvironsTime*1000.0*1000.0*1000.0, 
+			'Time to create a default Python environment with createEnvirons', unit=PerformanceUnit.NANO_SECONDS, resultDetails=resultDetails)
+		self.reportPerformanceResult(self.processConstructionTime*1000.0*1000.0*1000.0, 
+			'Time to create the environment and process object for startProcess', unit=PerformanceUnit.NANO_SECONDS, resultDetails=resultDetails)
@@ -0,0 +1,40 @@
+__pysys_title__   = r""" Process Module - running short Python scripts with and without reuseInterpreter """
+#                        ================================================================================
+__pysys_purpose__ = r"""
+Measures the rate at which a test can run a trivial Python script in the foreground using startPython, both by 
+starting a new interpreter each time and with reuseInterpreter=True. 
+""" 
+	
+__pysys_created__ = "2026-10-16"
+__pysys_groups__           = "process, performance, disableCoverage; inherit=true"
+
+import pysys
+from pysys.constants import *
+
+import time
+
+class PySysTest(pysys.basetest.BaseTest):
+
+	iterations = '50'
+
+	def execute(self):
+		if IS_WINDOWS: self.skipTest('reuseInterpreter is not supported on Windows')
+		self.iterations = int(self.iterations)
+		self.write_text('script.py', 'import sys, json, argparse\nprint("Hello world")\n')
+
+		self.rates = {}
+		for reuseInterpreter in [False, True]:
+			self.startPython([self.output+'/script.py'], stdouterr='warmup', reuseInterpreter=reuseInterpreter, quiet=True)
+			start = time.monotonic()
+			for i in range(self.iterations):
+				self.startPython([self.output+'/script.py'], stdouterr='script-%s-%d'%(reuseInterpreter, i), 
+					reuseInterpreter=reuseInterpreter, quiet=True)
+			self.rates[reuseInterpreter] = self.iterations/(time.monotonic()-start)
+
+	def validate(self):
+		self.assertGrep('script-True-0.out', 'Hello world')
+		resultDetails = {'PythonVersion':'%s.%s'%sys.version_info[0:2], 'PySysVersion':pysys.__version__}
+		self.reportPerformanceResult(self.rates[False], 
+			'Rate of running a short Python script with startPython', '/s', resultDetails=resultDetails)
+		self.reportPerformanceResult(self.rates[True], 
+			'Rate of running a short Python script with startPython reuseInterpreter=True', '/s', resultDetails=resultDetails)